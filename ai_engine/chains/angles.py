@@ -8,6 +8,7 @@ from langchain.output_parsers import PydanticOutputParser
 from langchain.schema.runnable import Runnable
 from ai_engine.schemas import AngleResult
 from ai_engine.retries import llm_retry
+from ai_engine.chains.structured import structured_output
 
 
 
@@ -37,7 +38,7 @@ def _build_chain() -> Runnable:
         openai_api_key=ai_engine.OPENAI_API_KEY,
     )
 
-    return prompt | chat | parser
+    return prompt | structured_output(chat, AngleResult, name="angles")
 
 @llm_retry
 def run(article: str) -> AngleResult:
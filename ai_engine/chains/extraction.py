@@ -6,8 +6,9 @@ from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
 from langchain.output_parsers import PydanticOutputParser
 from langchain.schema.runnable import Runnable
-from ai_engine.schemas import ExtractionResult
+from ai_engine.schemas import ExtractionResult, NamedEntitiesResult
 from ai_engine.retries import llm_retry
+from ai_engine.pre_extraction import PreExtraction, pre_extract
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -20,7 +21,8 @@ def _load_template() -> str:
 
 
 def _build_chain(model_name: str = ai_engine.OPENAI_MODEL) -> Runnable:
-    parser = PydanticOutputParser(pydantic_object=ExtractionResult)
+    # Le LLM ne produit plus que personnes / organisations / lieux
+    parser = PydanticOutputParser(pydantic_object=NamedEntitiesResult)
 
     prompt = PromptTemplate.from_template(
         _load_template(),
@@ -37,7 +39,36 @@ def _build_chain(model_name: str = ai_engine.OPENAI_MODEL) -> Runnable:
     return prompt | chat | parser
 
 
+def merge(entities, pre: PreExtraction) -> ExtractionResult:
+    """
+    Combine la sortie LLM (entités nommées) et la pré-extraction regex.
+    Si la chaîne renvoie encore dates/nombres (ancien schéma), on les ajoute
+    après ceux de la regex, sans doublon.
+    """
+    dates = list(pre.dates)
+    for d in getattr(entities, "dates", None) or []:
+        if d not in dates:
+            dates.append(d)
+
+    numbers = list(pre.numbers)
+    raws = {n.raw for n in numbers}
+    for n in getattr(entities, "numbers", None) or []:
+        if n.raw not in raws:
+            numbers.append(n)
+            raws.add(n.raw)
+
+    return ExtractionResult(
+        language=getattr(entities, "language", None) or pre.language,
+        persons=list(getattr(entities, "persons", None) or []),
+        organizations=list(getattr(entities, "organizations", None) or []),
+        locations=list(getattr(entities, "locations", None) or []),
+        dates=dates,
+        numbers=numbers,
+    )
+
+
 @llm_retry
 def run(article: str, *, model_name: str = ai_engine.OPENAI_MODEL) -> ExtractionResult:
+    pre = pre_extract(article)
     chain = _build_chain(model_name)
-    return chain.invoke({"article": article})
+    return merge(chain.invoke({"article": article}), pre)
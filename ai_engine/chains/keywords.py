@@ -7,6 +7,7 @@ from langchain.prompts import PromptTemplate
 from langchain.output_parsers import PydanticOutputParser
 from ai_engine.schemas import AngleResult, KeywordsResult
 from ai_engine.retries import llm_retry
+from ai_engine.chains.structured import structured_output
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 PROMPT_PATH = BASE_DIR / "prompts" / "generate_keywords.j2"
@@ -47,7 +48,7 @@ def run(angle_result: AngleResult) -> list[KeywordsResult]:
             },
         )
 
-        chain = prompt | chat | parser
+        chain = prompt | structured_output(chat, KeywordsResult, name="keywords")
         result: KeywordsResult = chain.invoke({"angles_block": angles_block})
 
         out.append(result)
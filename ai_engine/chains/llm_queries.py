@@ -14,6 +14,7 @@ from langchain_core.prompts import ChatPromptTemplate
 
 from ai_engine.schemas import AngleResult
 from ai_engine.retries import llm_retry
+from ai_engine.chains.structured import structured_output
 
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -69,7 +70,7 @@ def run(angle_result: AngleResult) -> list[list[QuerySpec]]:
         openai_api_key=ai_engine.OPENAI_API_KEY,
     )
 
-    chain = prompt | chat | parser
+    chain = prompt | structured_output(chat, QuerySpecList, name="llm_queries")
 
     all_queries: list[list[QuerySpec]] = []
     for angle in angle_result.angles:
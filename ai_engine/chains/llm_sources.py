@@ -12,6 +12,7 @@ from ai_engine.schemas import (
     LLMSourceSuggestionList,   # conteneur Pydantic (déjà existant)
 )
 from ai_engine.retries import llm_retry
+from ai_engine.chains.structured import structured_output
 
 # NEW: message system + trusted list depuis settings
 from django.conf import settings  # NEW
@@ -127,7 +128,7 @@ def run(angle_result: AngleResult) -> list[list[LLMSourceSuggestion]]:
         openai_api_key=ai_engine.OPENAI_API_KEY,
     )
 
-    chain = prompt | chat | parser
+    chain = prompt | structured_output(chat, LLMSourceSuggestionList, name="llm_sources")
     sources_per_angle: list[list[LLMSourceSuggestion]] = []
 
     for idx, angle in enumerate(angle_result.angles):
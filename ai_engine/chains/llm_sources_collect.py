@@ -1,6 +1,7 @@
 # ai_engine/chains/llm_sources_collect.py
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 from django.conf import settings
 
@@ -37,6 +38,10 @@ def run(angle_result: AngleResult) -> List[List[LLMSourceSuggestion]]:
       2) recherche web *par intent* (dataset puis source)
       3) conversion en LLMSourceSuggestion (le pipeline fera split/ranking/validation)
     Retour: [[LLMSourceSuggestion, ...], ...] aligné sur les angles.
+
+    Les recherches (dataset, source) de tous les angles partent ensemble
+    (au plus settings.SEARCH_MAX_CONCURRENCY) ; l'agrégation garde l'ordre
+    dataset puis source.
     """
     per_angle_suggestions: List[List[LLMSourceSuggestion]] = []
 
@@ -44,17 +49,27 @@ def run(angle_result: AngleResult) -> List[List[LLMSourceSuggestion]]:
     max_keep = int(getattr(settings, "SEARCH_RESULTS_PER_ANGLE", 18) or 18)
     k_per_query = int(getattr(settings, "SEARCH_MAX_RESULTS", 10) or 10)
 
+    max_workers = max(1, int(getattr(settings, "SEARCH_MAX_CONCURRENCY", 6) or 1))
+
     all_queries = run_llm_queries(angle_result)  # [[QuerySpec,...], ...]
-    for idx, angle in enumerate(angle_result.angles):
-        queries = all_queries[idx] if idx < len(all_queries) else []
 
-        # Split des requêtes par intent
+    # Split des requêtes par intent : (datasets, sources) par angle
+    batches = []
+    for idx, _ in enumerate(angle_result.angles):
+        queries = all_queries[idx] if idx < len(all_queries) else []
         ds_q = [q for q in queries if getattr(q, "intent", None) == "dataset"]
         src_q = [q for q in queries if getattr(q, "intent", None) == "source"]
+        batches.append(([q.model_dump() for q in ds_q], [q.model_dump() for q in src_q]))
+
+    # Appels provider séparés, tous angles en parallèle
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="search-batch") as pool:
+        futures = [
+            [pool.submit(search_many, specs, k=k_per_query) if specs else None for specs in pair]
+            for pair in batches
+        ]
+        raw_per_angle = [[f.result() if f else [] for f in pair] for pair in futures]
 
-        # Appels provider séparés (datasets d'abord)
-        ds_raw = search_many([q.model_dump() for q in ds_q], k=k_per_query) if ds_q else []
-        src_raw = search_many([q.model_dump() for q in src_q], k=k_per_query) if src_q else []
+    for idx, (ds_raw, src_raw) in enumerate(raw_per_angle):
 
         # Agrégation avec dé-duplication simple par URL normalisée
         seen = set()
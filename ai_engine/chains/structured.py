@@ -0,0 +1,149 @@
+# ai_engine/chains/structured.py
+"""
+Sortie structurée des chaînes LLM + réparation tolérante du JSON.
+
+Deux modes, choisis par `settings.LLM_OUTPUT_MODE` :
+  - "parser"           : comportement historique (texte + PydanticOutputParser),
+                         mais un JSON mal formé passe d'abord par `repair_json`
+                         avant de déclencher un nouvel appel via llm_retry ;
+  - "json_schema" / "function_calling" : `with_structured_output` côté modèle,
+                         avec la même réparation si le parsing échoue.
+
+Compteurs par chaîne (groupe "llm_parse" de ai_engine.metrics) :
+  calls, parse_failures, repairs, retries (incrémenté par llm_retry).
+"""
+from __future__ import annotations
+
+import json
+import logging
+import re
+from typing import Any, Type, get_origin
+
+from django.conf import settings
+from langchain.output_parsers import PydanticOutputParser
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import BaseMessage
+from langchain_core.runnables import Runnable, RunnableLambda
+from pydantic import BaseModel, ValidationError
+
+from ai_engine import metrics
+
+logger = logging.getLogger("datascope.ai_engine")
+
+METRICS_GROUP = "llm_parse"
+STRUCTURED_METHODS = ("json_schema", "function_calling")
+
+_FENCE_RE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$", re.I)
+_TRAILING_COMMA_RE = re.compile(r",\s*([}\]])")
+
+
+# ---------------------------------------------------------------------------
+# Réparation
+# ---------------------------------------------------------------------------
+
+def repair_json(text: str) -> str:
+    """
+    Réparations bon marché des sorties LLM courantes :
+    balises ```json, texte avant/après l'objet, guillemets typographiques,
+    virgules finales.
+    """
+    s = _FENCE_RE.sub("", (text or "").strip())
+    s = s.replace("“", '"').replace("”", '"')
+    starts = [i for i in (s.find("{"), s.find("[")) if i >= 0]
+    if starts:
+        start = min(starts)
+        end = max(s.rfind("}"), s.rfind("]"))
+        if end > start:
+            s = s[start:end + 1]
+    return _TRAILING_COMMA_RE.sub(r"\1", s)
+
+
+def _list_field(schema: Type[BaseModel]) -> str | None:
+    """Nom de l'unique champ liste du schéma (pour envelopper un tableau nu)."""
+    list_fields = [name for name, f in schema.model_fields.items() if get_origin(f.annotation) is list]
+    return list_fields[0] if len(list_fields) == 1 else None
+
+
+def lenient_parse(payload: Any, schema: Type[BaseModel]) -> BaseModel:
+    """Valide `payload` (str JSON ou dict/list) contre `schema`, après réparation."""
+    if isinstance(payload, str):
+        data = json.loads(repair_json(payload))
+    else:
+        data = payload
+    if isinstance(data, list):
+        field = _list_field(schema)
+        if field is None:
+            raise ValueError(f"bare JSON array cannot fill {schema.__name__}")
+        data = {field: data}
+    return schema.model_validate(data)
+
+
+def _message_text(msg: Any) -> str:
+    if isinstance(msg, BaseMessage):
+        content = msg.content
+        if isinstance(content, list):  # messages multi-parties
+            return "".join(p.get("text", "") if isinstance(p, dict) else str(p) for p in content)
+        return content or ""
+    return str(msg or "")
+
+
+def _repair_or_raise(name: str, payload: Any, schema: Type[BaseModel], err: Exception) -> BaseModel:
+    metrics.incr(METRICS_GROUP, name, "parse_failures")
+    try:
+        parsed = lenient_parse(payload, schema)
+    except (ValueError, ValidationError) as repair_err:
+        logger.warning("[%s] unparseable LLM output (%r); retrying", name, repair_err)
+        raise OutputParserException(f"{name}: {err}") from repair_err
+    metrics.incr(METRICS_GROUP, name, "repairs")
+    logger.info("[%s] LLM output repaired after parse failure: %r", name, err)
+    return parsed
+
+
+# ---------------------------------------------------------------------------
+# Construction de la partie « modèle → objet »
+# ---------------------------------------------------------------------------
+
+def output_mode() -> str:
+    mode = str(getattr(settings, "LLM_OUTPUT_MODE", "parser") or "parser").lower()
+    return mode if mode in STRUCTURED_METHODS else "parser"
+
+
+def structured_output(chat: Any, schema: Type[BaseModel], *, name: str) -> Runnable:
+    """
+    Runnable « messages → instance de `schema` » à chaîner après un prompt :
+
+        chain = prompt | structured_output(chat, AngleResult, name="angles")
+    """
+    mode = output_mode()
+
+    if mode in STRUCTURED_METHODS:
+        llm = chat.with_structured_output(schema, method=mode, include_raw=True)
+
+        def _from_structured(out: dict) -> BaseModel:
+            metrics.incr(METRICS_GROUP, name, "calls")
+            parsed = out.get("parsed")
+            if isinstance(parsed, schema) and out.get("parsing_error") is None:
+                return parsed
+            raw = out.get("raw")
+            tool_calls = getattr(raw, "tool_calls", None) or []
+            payload = tool_calls[0].get("args") if tool_calls else _message_text(raw)
+            return _repair_or_raise(name, payload, schema, out.get("parsing_error") or ValueError("empty"))
+
+        return llm | RunnableLambda(_from_structured)
+
+    parser = PydanticOutputParser(pydantic_object=schema)
+
+    def _from_text(msg: Any) -> BaseModel:
+        metrics.incr(METRICS_GROUP, name, "calls")
+        text = _message_text(msg)
+        try:
+            return parser.parse(text)
+        except OutputParserException as err:
+            return _repair_or_raise(name, text, schema, err)
+
+    return chat | RunnableLambda(_from_text)
+
+
+def parse_stats() -> dict:
+    """{chain: {calls, parse_failures, repairs, retries}}"""
+    return metrics.snapshot(METRICS_GROUP)
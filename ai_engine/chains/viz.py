@@ -1,18 +1,38 @@
 # ai_engine/chains/viz.py
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
 from pathlib import Path
 from functools import lru_cache
 import ai_engine
 
+from django.conf import settings
 from langchain_openai import ChatOpenAI
 from langchain.prompts import PromptTemplate
 from langchain.output_parsers import PydanticOutputParser
 
-from ai_engine.schemas import AngleResult, VizResult, VizSuggestion
-from ai_engine.retries import llm_retry
+from ai_engine.schemas import AngleResult, ExtractionResult, VizResult, VizSuggestion
+from ai_engine.retries import DeadlineExceeded, llm_retry
+from ai_engine.chains.structured import structured_output
+from ai_engine import viz_rules
 
 BASE_DIR   = Path(__file__).resolve().parent.parent
 PROMPT_PATH = BASE_DIR / "prompts" / "generate_viz.j2"
 
+logger = logging.getLogger("datascope.ai_engine")
+
+# Pool dédié : permet d'abandonner l'attente de la chaîne LLM hors budget.
+# _abandoned compte les chaînes abandonnées encore en vol : quand elles
+# occupent tous les workers, on passe directement aux règles plutôt que de
+# faire la queue derrière elles. Les chaînes en cours normal ne comptent pas.
+_MAX_WORKERS = 2
+_executor = ThreadPoolExecutor(max_workers=_MAX_WORKERS, thread_name_prefix="viz-llm")
+_abandoned = 0
+_abandoned_lock = threading.Lock()
+
+LLM_TIMEOUT = 40
+
 
 @lru_cache
 def _tmpl() -> str:
@@ -20,11 +40,18 @@ def _tmpl() -> str:
 
 
 @llm_retry
-def run(angle_result: AngleResult) -> list[list[VizSuggestion]]:
+def _run_llm(angle_result: AngleResult, deadline: float | None = None) -> list[list[VizSuggestion]]:
     """
     Retourne une liste de listes : une entrée par angle,
     contenant les VizSuggestion correspondantes.
+
+    `deadline` (time.monotonic()) borne chaque appel OpenAI au budget restant ;
+    une fois dépassée, DeadlineExceeded (sans retry) : run() bascule sur les
+    règles plutôt que de rendre une liste incomplète.
     """
+    timeout = LLM_TIMEOUT
+    if deadline is not None:
+        timeout = max(1.0, min(LLM_TIMEOUT, deadline - time.monotonic()))
     parser = PydanticOutputParser(pydantic_object=VizResult)
 
     prompt = PromptTemplate.from_template(
@@ -35,15 +62,17 @@ def run(angle_result: AngleResult) -> list[list[VizSuggestion]]:
     chat = ChatOpenAI(
         model=ai_engine.OPENAI_MODEL,
         temperature=0.5,
-        timeout=40,
+        timeout=timeout,
         openai_api_key=ai_engine.OPENAI_API_KEY,
     )
 
-    chain = prompt | chat | parser
+    chain = prompt | structured_output(chat, VizResult, name="viz")
 
     viz_per_angle: list[list[VizSuggestion]] = []
 
     for angle in angle_result.angles:
+        if deadline is not None and time.monotonic() >= deadline:
+            raise DeadlineExceeded(f"viz: {len(viz_per_angle)}/{len(angle_result.angles)} angles traités")
         parsed: VizResult = chain.invoke(
             {
                 "angle_title": angle.title,
@@ -53,3 +82,60 @@ def run(angle_result: AngleResult) -> list[list[VizSuggestion]]:
         viz_per_angle.append(parsed.suggestions)
 
     return viz_per_angle
+
+
+def run(
+    angle_result: AngleResult,
+    extraction: ExtractionResult | None = None,
+    *,
+    profile: str | None = None,
+    time_budget: float | None = None,
+) -> list[list[VizSuggestion]]:
+    """
+    Suggestions de visualisation par angle.
+
+    - profile="rules" : moteur de règles local (viz_rules), zéro latence.
+    - profile="llm"   : chaîne LLM ; si elle dépasse `time_budget` secondes
+      (settings.VIZ_TIME_BUDGET_SECONDS, 0 = pas de budget) ou échoue,
+      on bascule sur les règles.
+    """
+    profile = (profile or getattr(settings, "VIZ_PROFILE", "llm") or "llm").lower()
+    if profile == "rules":
+        return viz_rules.suggest_all(angle_result, extraction)
+
+    if time_budget is None:
+        time_budget = float(getattr(settings, "VIZ_TIME_BUDGET_SECONDS", 0) or 0)
+
+    if time_budget <= 0:
+        return _run_llm(angle_result)
+
+    with _abandoned_lock:
+        saturated = _abandoned >= _MAX_WORKERS
+    if saturated:
+        logger.warning("viz: LLM workers busy with abandoned chains; using rule engine")
+        return viz_rules.suggest_all(angle_result, extraction)
+
+    future = _executor.submit(_run_llm, angle_result, deadline=time.monotonic() + time_budget)
+    try:
+        return future.result(timeout=time_budget)
+    except FutureTimeout:
+        if not future.cancel():
+            _abandon(future)
+        logger.warning("viz: LLM chain exceeded %.1fs budget; using rule engine", time_budget)
+    except Exception as exc:
+        logger.warning("viz: LLM chain failed (%r); using rule engine", exc)
+    return viz_rules.suggest_all(angle_result, extraction)
+
+
+def _abandon(future) -> None:
+    """Compte `future` parmi les chaînes abandonnées jusqu'à sa fin."""
+    global _abandoned
+
+    def _done(_f) -> None:
+        global _abandoned
+        with _abandoned_lock:
+            _abandoned -= 1
+
+    with _abandoned_lock:
+        _abandoned += 1
+    future.add_done_callback(_done)
@@ -0,0 +1,81 @@
+# ai_engine/connectors/batching.py
+"""
+Recherche groupée : plusieurs mots-clés d'un angle → une requête OR.
+
+Les portails CKAN et data.gouv.fr acceptent des requêtes booléennes. Au lieu
+d'un appel par mot-clé, `search_batch(keywords, per_keyword=…)` envoie
+`(mot-clé 1) OR (mot-clé 2) …` avec assez de lignes pour tous, puis
+ré-attribue chaque résultat localement aux mots-clés qu'il contient
+(`attribute`). Le contrat de sortie est {mot-clé: [résultats]} : le fan-out
+(connectors.fanout) consomme ensuite ces listes exactement comme les
+résultats de `search(mot-clé)`.
+
+Réglages : settings.CONNECTORS_BATCH_MODE (on/off) et
+settings.CONNECTORS_BATCH_MAX_KEYWORDS (mots-clés par requête OR).
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Any, Dict, List, Sequence
+
+from ai_engine.connectors.helpers import sanitize_keyword
+
+BATCH_MAX_ROWS = 100           # plafond de lignes demandées par requête groupée
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_PLURAL_RE = re.compile(r"(?:es|s|x)$")
+
+
+def keyword_terms(keyword: str) -> str:
+    """Mot-clé assaini, termes séparés par des espaces (pour une sous-requête)."""
+    return sanitize_keyword(keyword).replace("+", " ").strip()
+
+
+def chunks(keywords: Sequence[str], size: int) -> List[List[str]]:
+    size = max(1, int(size))
+    return [list(keywords[i:i + size]) for i in range(0, len(keywords), size)]
+
+
+def batch_rows(n_keywords: int, per_keyword: int) -> int:
+    """Lignes à demander : marge ×2 (doublons, jeux sans format exploitable)."""
+    return min(BATCH_MAX_ROWS, max(1, n_keywords * per_keyword * 2))
+
+
+def _tokens(text: str) -> List[str]:
+    ascii_ = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode().lower()
+    return _TOKEN_RE.findall(ascii_)
+
+
+def _stem(token: str) -> str:
+    return _PLURAL_RE.sub("", token) if len(token) > 4 else token
+
+
+def attribute(record: Any, keywords: Sequence[str]) -> List[str]:
+    """
+    Mots-clés auxquels rattacher `record` : ceux dont tous les termes
+    apparaissent (au pluriel près) dans titre / description / organisation.
+    Aucun si aucun mot-clé n'est entièrement couvert (résultat non attribué).
+    """
+    text = " ".join(
+        str(getattr(record, f, None) or (record.get(f) if isinstance(record, dict) else "") or "")
+        for f in ("title", "description", "organization")
+    )
+    doc = {_stem(t) for t in _tokens(text)}
+
+    def _covered(kw: str) -> bool:
+        terms = [_stem(t) for t in _tokens(keyword_terms(kw))]
+        return bool(terms) and all(t in doc or any(d.startswith(t) for d in doc) for t in terms)
+
+    return [kw for kw in keywords if _covered(kw)]
+
+
+def distribute(records: Sequence[Any], keywords: Sequence[str], per_keyword: int) -> Dict[str, List[Any]]:
+    """Répartit les résultats d'une requête OR entre ses mots-clés (≤ per_keyword chacun)."""
+    out: Dict[str, List[Any]] = {kw: [] for kw in keywords}
+    for record in records:
+        for kw in attribute(record, keywords):
+            if len(out[kw]) < per_keyword:
+                out[kw].append(record)
+        if all(len(v) >= per_keyword for v in out.values()):
+            break
+    return out
@@ -1,15 +1,217 @@
 # ai_engine/connectors/cache_utils.py
+"""
+Cache persistant des réponses des connecteurs (diskcache), avec
+*stale-while-revalidate*.
 
+- Clé : (connecteur, mot-clé assaini, page_size, max_results, limite).
+- Valeur : liste des résultats bruts, picklée puis compressée (zlib).
+- Un cache diskcache par connecteur, chacun avec son plafond de taille
+  (éviction LRU) et son TTL : settings.CONNECTOR_CACHE["default"] surchargé
+  par settings.CONNECTOR_CACHE[<nom du connecteur>].
+- Entrée fraîche (âge < ttl)             → servie telle quelle ;
+  entrée périmée (ttl ≤ âge < ttl+stale) → servie, et rafraîchie en tâche de fond ;
+  au-delà                                → miss, appel réseau.
+- Statistiques : metrics "connector_cache" (hits / stale_hits / misses /
+  refreshes / refresh_errors) + taille et nombre d'entrées, via `cache_stats()`.
+
+Portails redirigés (settings.CONNECTOR_ORIGIN_OVERRIDES, cf. connectors.http
+et connectors.mock_portal) : tous les stores passent dans un sous-répertoire
+propre à la redirection, pour que les charges factices ne soient jamais
+servies à la place des vrais portails.
+
+Désactivable avec settings.CONNECTOR_CACHE_ENABLED = False.
+"""
+
+import hashlib
+import logging
 import os
-from diskcache import Cache
 import pickle
-from collections.abc import Generator
+import threading
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from diskcache import Cache
+from django.conf import settings
+
+from ai_engine import metrics
+from ai_engine.connectors.helpers import sanitize_keyword
+
+logger = logging.getLogger("datascope.connectors")
 
 CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', '.cache')
 os.makedirs(CACHE_DIR, exist_ok=True)
 cache = Cache(CACHE_DIR)
 
-# ai_engine/connectors/cache_utils.py
+METRICS_GROUP = "connector_cache"
+DEFAULT_POLICY = {
+    "ttl": 6 * 3600,             # s : fraîcheur
+    "stale_ttl": 24 * 3600,      # s : au-delà du ttl, servi périmé + rafraîchi
+    "max_bytes": 64 * 2 ** 20,   # plafond disque par connecteur
+}
+
+_stores: Dict[Tuple[str, str], Cache] = {}
+_stores_lock = threading.Lock()
+_refreshing: set = set()
+_refresh_lock = threading.Lock()
+_refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="connector-cache")
+
+
+# ---------------------------------------------------------------------------
+# Configuration / stockage
+# ---------------------------------------------------------------------------
+
+def enabled() -> bool:
+    return bool(getattr(settings, "CONNECTOR_CACHE_ENABLED", True))
+
+
+def policy(name: str) -> dict:
+    conf = getattr(settings, "CONNECTOR_CACHE", {}) or {}
+    out = dict(DEFAULT_POLICY)
+    out.update(conf.get("default", {}) or {})
+    out.update(conf.get(name, {}) or {})
+    return out
+
+
+def _cache_dir() -> str:
+    base = getattr(settings, "CONNECTOR_CACHE_DIR", None) or os.path.join(CACHE_DIR, "connectors")
+    overrides = getattr(settings, "CONNECTOR_ORIGIN_OVERRIDES", None)
+    if overrides:
+        digest = hashlib.sha1(repr(sorted(overrides.items())).encode()).hexdigest()[:12]
+        return os.path.join(base, "redirected", digest)
+    return base
+
+
+def store(name: str) -> Cache:
+    """Cache diskcache dédié au connecteur `name` (plafond de taille propre)."""
+    directory = _cache_dir()
+    with _stores_lock:
+        c = _stores.get((directory, name))
+        if c is None:
+            c = Cache(
+                os.path.join(directory, name),
+                size_limit=int(policy(name)["max_bytes"]),
+                eviction_policy="least-recently-used",
+            )
+            _stores[(directory, name)] = c
+        return c
+
+
+def _pack(results: List[Any]) -> bytes:
+    return zlib.compress(pickle.dumps(results, protocol=pickle.HIGHEST_PROTOCOL))
+
+
+def _unpack(blob: bytes) -> List[Any]:
+    return pickle.loads(zlib.decompress(blob))
+
+
+def make_key(keyword: str, page_size: Optional[int] = None,
+             max_results: Optional[int] = None, limit: Optional[int] = None) -> tuple:
+    return (sanitize_keyword(keyword), page_size, max_results, limit)
+
+
+# ---------------------------------------------------------------------------
+# Lecture / écriture
+# ---------------------------------------------------------------------------
+
+def _write(name: str, key: tuple, results: List[Any]) -> None:
+    p = policy(name)
+    store(name).set(key, (time.time(), _pack(results)), expire=p["ttl"] + p["stale_ttl"])
+
+
+def _refresh(name: str, key: tuple, fetch: Callable[[], List[Any]]) -> None:
+    try:
+        _write(name, key, list(fetch()))
+        metrics.incr(METRICS_GROUP, name, "refreshes")
+    except Exception as exc:
+        metrics.incr(METRICS_GROUP, name, "refresh_errors")
+        logger.warning("[cache] background refresh %s %r failed: %r", name, key, exc)
+    finally:
+        with _refresh_lock:
+            _refreshing.discard((name, key))
+
+
+def _schedule_refresh(name: str, key: tuple, fetch: Callable[[], List[Any]]) -> None:
+    with _refresh_lock:
+        if (name, key) in _refreshing:
+            return
+        _refreshing.add((name, key))
+    _refresher.submit(_refresh, name, key, fetch)
+
+
+def lookup(name: str, key: tuple, refresh: Callable[[], List[Any]],
+           count_miss: bool = True) -> Optional[List[Any]]:
+    """
+    Entrée (name, key) si présente : fraîche, ou périmée et alors rafraîchie
+    en tâche de fond via `refresh`. None sur miss (compté comme tel, sauf
+    `count_miss=False` quand une autre clé est essayée ensuite).
+    """
+    entry = store(name).get(key)
+    if entry is not None:
+        stored_at, blob = entry
+        try:
+            results = _unpack(blob)
+        except Exception:
+            results = None
+        if results is not None:
+            if time.time() - stored_at < policy(name)["ttl"]:
+                metrics.incr(METRICS_GROUP, name, "hits")
+            else:
+                metrics.incr(METRICS_GROUP, name, "stale_hits")
+                _schedule_refresh(name, key, refresh)
+            return results
+
+    if count_miss:
+        metrics.incr(METRICS_GROUP, name, "misses")
+    return None
+
+
+def put(name: str, key: tuple, results: List[Any]) -> None:
+    """Enregistre des résultats obtenus hors `cached_search` (ex. recherche groupée)."""
+    _write(name, key, list(results))
+
+
+def cached_search(name: str, key: tuple, fetch: Callable[[], List[Any]]) -> List[Any]:
+    """
+    Résultats de `fetch()` pour (name, key), servis depuis le cache quand c'est
+    possible. `fetch` doit renvoyer une liste matérialisée.
+    """
+    if not enabled():
+        return list(fetch())
+
+    results = lookup(name, key, fetch)
+    if results is not None:
+        return results
+    results = list(fetch())
+    _write(name, key, results)
+    return results
+
+
+def cache_stats() -> dict:
+    """{connecteur: {hits, stale_hits, misses, …, entries, size_bytes}}"""
+    stats = metrics.snapshot(METRICS_GROUP)
+    with _stores_lock:
+        stores = [(name, c) for (directory, name), c in _stores.items() if directory == _cache_dir()]
+    for name, c in stores:
+        entry = stats.setdefault(name, {})
+        entry["entries"] = len(c)
+        entry["size_bytes"] = c.volume()
+    return stats
+
+
+def clear(name: Optional[str] = None) -> None:
+    """Vide le cache d'un connecteur (ou de tous ceux déjà ouverts)."""
+    with _stores_lock:
+        stores = [c for (directory, n), c in _stores.items() if name is None or n == name]
+    for c in stores:
+        c.clear()
+
+
+# ---------------------------------------------------------------------------
+# Décorateur historique
+# ---------------------------------------------------------------------------
+
 def cache_response(ttl_seconds: int = 3600):
     """
     Décorateur compatible avec les fonctions qui renvoient un itérable.
@@ -27,4 +229,3 @@ def cache_response(ttl_seconds: int = 3600):
             return iter(data)              # toujours un itérateur frais
         return wrapper
     return decorator
-
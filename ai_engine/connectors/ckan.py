@@ -0,0 +1,284 @@
+"""
+Client CKAN générique
+---------------------
+Boucle `package_search` commune aux portails CKAN (data.gov, data.gov.uk,
+open.canada.ca, HDX…). Chaque module portail se contente de configurer une
+sous-classe : URL, nom de source, modèle brut, suffixe de requête, etc.
+
+Réponses allégées :
+– `fl` : seuls les champs utiles sont demandés à Solr (plus de ressources
+  complètes ni d'extras) ; les formats sont lus dans `res_format` / `res_url` ;
+– `facet=false` : pas de calcul ni de transfert des facettes ;
+– sessions HTTP mutualisées (connectors.http), débit limité et retries
+  budgétés par hôte ;
+– enregistrements bruts en dataclasses à slots, sans validation pydantic
+  (cf. connectors.records) ; seule la DatasetSuggestion est validée.
+
+Un portail qui ignore `fl` renvoie des documents complets : `package_formats`
+et `organization_name` savent lire les deux formes. Avec `fl`, Solr ne rend
+que le slug de l'organisation ("ons") : son titre ("Office for National
+Statistics") est résolu une fois par /organization_show (`organization_titles`,
+partagé par le processus et mis en cache disque), puis relu par
+`organization_name(raw, host)`.
+
+Pages lues au fil de l'eau (cf. connectors.streaming) : les packages sont
+décodés un par un et la lecture s'arrête dès `max_results` résultats
+exploitables ; `prepare_page` reçoit des fenêtres limitées aux résultats
+encore utiles.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from itertools import islice, zip_longest
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Set, Tuple, Type
+from urllib.parse import urlparse
+
+from ai_engine.connectors import batching, cache_utils, http, records, streaming
+from ai_engine.connectors.format_utils import get_format
+from ai_engine.connectors.helpers import sanitize_keyword
+from ai_engine.connectors.interface import ConnectorInterface
+from ai_engine.connectors.records import RawDataset
+from ai_engine.retries import budgeted_retry
+from ai_engine.schemas import DatasetSuggestion
+
+DEFAULT_FIELDS: Tuple[str, ...] = (
+    "id", "name", "title", "notes", "organization", "license_title",
+    "metadata_modified", "res_format", "res_url",
+)
+DEFAULT_FORMATS = {"csv", "xls", "xlsx", "json", "geojson", "xml", "zip", "pdf"}
+ORG_CACHE = "ckan.organization_show"        # cache disque (cf. cache_utils.store)
+ORG_TTL = 7 * 24 * 3600                     # une organisation change rarement de titre
+
+logger = logging.getLogger("datascope.connectors")
+
+_org_titles: Dict[Tuple[str, str], str] = {}   # (hôte, slug) → titre
+_org_lock = threading.Lock()
+
+
+# ------------------------------------------------------------------ #
+# Lecture des documents (complets ou allégés)                        #
+# ------------------------------------------------------------------ #
+def package_formats(raw: dict, valid_formats: Set[str]) -> List[str]:
+    """Formats exploitables d'un package : `resources` (complet) ou `res_*` (fl)."""
+    resources = raw.get("resources")
+    if resources is None and ("res_format" in raw or "res_url" in raw):
+        resources = [
+            {"format": fmt or "", "url": url or ""}
+            for fmt, url in zip_longest(raw.get("res_format") or [], raw.get("res_url") or [])
+        ]
+    return sorted({f for r in resources or [] if (f := get_format(r, valid_formats))})
+
+
+def organization_name(raw: dict, host: Optional[str] = None) -> Optional[str]:
+    """Titre de l'organisation ; slug (fl) → titre déjà résolu pour `host`, sinon le slug."""
+    org = raw.get("organization")
+    if isinstance(org, dict):
+        return org.get("title") or org.get("name")
+    if org and host:
+        with _org_lock:
+            return _org_titles.get((host, org), org)
+    return org or None
+
+
+def organization_titles(host: str, api: str, slugs: Iterable[str]) -> Dict[str, str]:
+    """
+    {slug: titre} via /organization_show (racine d'API `api`) : mémoire du
+    processus, puis cache disque, puis réseau. Un échec n'est pas bloquant :
+    le slug reste utilisé (et n'est pas redemandé par ce processus).
+    """
+    disk = cache_utils.store(ORG_CACHE) if cache_utils.enabled() else None
+    out: Dict[str, str] = {}
+    for slug in dict.fromkeys(s for s in slugs if s):
+        with _org_lock:
+            title = _org_titles.get((host, slug))
+        if title is None and disk is not None:
+            title = disk.get((host, slug))
+        if title is None:
+            title = _fetch_organization_title(host, api, slug)
+            if title is not None and disk is not None:
+                disk.set((host, slug), title, expire=ORG_TTL)
+        with _org_lock:
+            out[slug] = _org_titles[(host, slug)] = title or slug
+    return out
+
+
+def _fetch_organization_title(host: str, api: str, slug: str) -> Optional[str]:
+    @budgeted_retry(host)
+    def _call() -> dict:
+        r = http.get(f"{api}/organization_show", params={"id": slug, "include_datasets": "false"},
+                     conditional=True)
+        r.raise_for_status()
+        return r.json()["result"]
+
+    try:
+        return _call().get("title") or None
+    except Exception as exc:
+        logger.warning("[ckan] organization_show %s %s failed: %r", host, slug, exc)
+        return None
+
+
+def clear_organization_titles() -> None:
+    with _org_lock:
+        _org_titles.clear()
+
+
+def _translated(raw: dict, field: str, lang: Optional[str]) -> Optional[str]:
+    if lang:
+        translated = raw.get(f"{field}_translated")
+        if isinstance(translated, dict) and translated.get(lang):
+            return translated[lang]
+    return raw.get(field)
+
+
+# ------------------------------------------------------------------ #
+# Client de base                                                     #
+# ------------------------------------------------------------------ #
+class CKANClient(ConnectorInterface):
+    """
+    Sous-classer et renseigner au minimum BASE_URL, SOURCE_NAME et RECORD.
+    Le modèle RECORD expose les champs id, title, description, url,
+    organization, formats, license, last_modified.
+    """
+
+    BASE_URL: str = ""                          # racine du portail
+    API_PATH: str = "/api/3/action"
+    DATASET_URL: str = "{base}/dataset/{name}"  # {base}, {id}, {name}
+    SOURCE_NAME: str = ""
+    RECORD: Type[RawDataset]
+    VALID_FORMATS: Set[str] = DEFAULT_FORMATS
+    FIELDS: Optional[Tuple[str, ...]] = DEFAULT_FIELDS  # None → documents complets
+    QUERY_SUFFIX: str = ""                      # ex. " climate" pour HDX Climat
+    LANG: Optional[str] = None                  # champs *_translated (Canada)
+    MAX_RESULTS: Optional[int] = 2              # sécurité historique des connecteurs
+    DEFAULT_PAGE_SIZE: int = 10
+
+    @property
+    def host(self) -> str:
+        return urlparse(self.BASE_URL).netloc
+
+    # ----------- HTTP ----------------------------------------------------- #
+    def _action(self, action: str, params: dict) -> dict:
+        """Appel /api/3/action/<action> → champ `result`."""
+        @budgeted_retry(self.host)
+        def _call() -> dict:
+            r = http.get(f"{self.BASE_URL}{self.API_PATH}/{action}", params=params, conditional=True)
+            r.raise_for_status()
+            return r.json()["result"]
+
+        return _call()
+
+    def _page_items(self, action: str, params: dict, meta: dict) -> Iterator[dict]:
+        """`result.results` de l'action, élément par élément ; `count` & co → `meta`."""
+        if not streaming.enabled():
+            page = self._action(action, params)
+            meta.update((k, v) for k, v in page.items() if k != "results")
+            return iter(page.get("results") or [])
+
+        @budgeted_retry(self.host)
+        def _open():
+            r = http.get(f"{self.BASE_URL}{self.API_PATH}/{action}", params=params,
+                         conditional=True, stream=True)
+            r.raise_for_status()
+            return r
+
+        return streaming.stream_page(_open, ("result", "results"), meta,
+                                     lambda: self._action(action, params))
+
+    def search_params(self, query: str, rows: int, start: int) -> dict:
+        params = {"q": query, "rows": rows, "start": start, "facet": "false"}
+        if self.FIELDS:
+            params["fl"] = ",".join(self.FIELDS)
+        return params
+
+    # ----------- Enregistrements ------------------------------------------ #
+    def record_fields(self, raw: dict) -> dict:
+        return {
+            "id": raw["id"],
+            "title": _translated(raw, "title", self.LANG) or raw.get("name"),
+            "description": _translated(raw, "notes", self.LANG),
+            "url": self.DATASET_URL.format(base=self.BASE_URL, id=raw["id"], name=raw.get("name") or raw["id"]),
+            "organization": organization_name(raw, self.host),
+            "formats": package_formats(raw, self.VALID_FORMATS),
+            "license": raw.get("license_title"),
+            "last_modified": raw.get("metadata_modified"),
+        }
+
+    def prepare_page(self, results: List[dict]) -> None:
+        """Appelé sur chaque page brute avant `build_record` (préchargements)."""
+        slugs = [org for raw in results if isinstance(org := raw.get("organization"), str)]
+        if slugs:
+            organization_titles(self.host, f"{self.BASE_URL}{self.API_PATH}", slugs)
+
+    def build_record(self, raw: dict) -> Optional[RawDataset]:
+        """Package brut → RECORD, ou None sans format exploitable."""
+        fields = self.record_fields(raw)
+        if not fields["formats"]:
+            return None
+        return self.RECORD(**fields)
+
+    # ----------- Recherche ------------------------------------------------ #
+    def iter_packages(self, keyword: str, *, rows: int, max_results: Optional[int] = None) -> Iterator[RawDataset]:
+        """Pagination commune : s'arrête sur page vide, fin du `count` ou `max_results`."""
+        query = f"{sanitize_keyword(keyword)}{self.QUERY_SUFFIX}"
+        start = count = 0
+        while max_results is None or count < max_results:
+            meta: dict = {}
+            items = self._page_items("package_search", self.search_params(query, rows, start), meta)
+            received = 0
+            try:
+                while max_results is None or count < max_results:
+                    # fenêtre = résultats encore utiles : on ne lit pas plus loin que nécessaire
+                    window = list(islice(items, rows if max_results is None else max_results - count))
+                    if not window:
+                        break
+                    received += len(window)
+                    self.prepare_page(window)
+                    for raw in window:
+                        record = self.build_record(raw)
+                        if record is None:
+                            continue
+                        yield record
+                        count += 1
+                        if max_results is not None and count >= max_results:
+                            return
+            finally:
+                if hasattr(items, "close"):
+                    items.close()
+            if not received:
+                return
+            start += rows
+            if start >= int(meta.get("count") or 0):
+                return
+
+    def search(self, keyword: str, page_size: int = 10) -> Iterator[RawDataset]:
+        return self.iter_packages(keyword, rows=page_size, max_results=self.MAX_RESULTS)
+
+    # ----------- Recherche groupée (cf. connectors.batching) -------------- #
+    def or_query(self, keywords: Sequence[str]) -> str:
+        """`text:(a b) OR text:(c)` : syntaxe Lucene, les termes d'un mot-clé restent en ET."""
+        query = " OR ".join(f"text:({batching.keyword_terms(kw)})" for kw in keywords)
+        if self.QUERY_SUFFIX.strip():
+            query = f"({query}) AND text:({self.QUERY_SUFFIX.strip()})"
+        return query
+
+    def search_batch(self, keywords: Sequence[str], *, per_keyword: int) -> Dict[str, List[RawDataset]]:
+        """Une seule requête OR pour `keywords` → {mot-clé: [≤ per_keyword enregistrements]}."""
+        if self.MAX_RESULTS is not None:
+            per_keyword = min(per_keyword, self.MAX_RESULTS)
+        rows = batching.batch_rows(len(keywords), per_keyword)
+        page = self._action("package_search", self.search_params(self.or_query(keywords), rows, 0))
+        results = page.get("results") or []
+        self.prepare_page(results)
+        records = [r for raw in results if (r := self.build_record(raw)) is not None]
+        return batching.distribute(records, keywords, per_keyword)
+
+    def to_suggestion(self, ds: RawDataset) -> DatasetSuggestion:
+        return records.to_suggestion(ds, self.SOURCE_NAME)
+
+
+__all__ = [
+    "CKANClient", "DEFAULT_FIELDS", "clear_organization_titles", "organization_name",
+    "organization_titles", "package_formats",
+]
@@ -2,23 +2,16 @@
 Connecteur Open Canada
 ----------------------
 – Conforme à ConnectorInterface
-– API CKAN v3 : /api/3/action/package_search
+– API CKAN v3 : /api/3/action/package_search (via CKANClient)
 – Métadonnées bilingues (fr/en) → fallback prévu
 """
 
 from __future__ import annotations
 
-import time
-from typing import Iterator, List, Optional
+from dataclasses import dataclass
 
-import requests
-from pydantic import BaseModel
-from tenacity import retry, stop_after_attempt, wait_exponential
-
-from ai_engine.connectors.interface import ConnectorInterface
-from ai_engine.connectors.helpers import sanitize_keyword
-from ai_engine.connectors.format_utils import get_format
-from ai_engine.connectors.richness import richness_score
+from ai_engine.connectors.ckan import DEFAULT_FIELDS, CKANClient
+from ai_engine.connectors.records import RawDataset
 from ai_engine.schemas import DatasetSuggestion
 
 BASE_URL = "https://open.canada.ca/data"
@@ -27,86 +20,23 @@ VALID_FORMATS = {"csv", "xls", "xlsx", "json", "geojson", "xml", "zip", "pdf"}
 # ------------------------------------------------------------------ #
 # Modèle brut Canada                                                 #
 # ------------------------------------------------------------------ #
-class CADataset(BaseModel):
-    id: str
-    title: str
-    description: Optional[str] = None
-    url: str
-    organization: Optional[str] = None
-    formats: List[str] = []
-    license: Optional[str] = None
-    last_modified: Optional[str] = None
+@dataclass(slots=True, kw_only=True)
+class CADataset(RawDataset):
+    """Enregistrement brut (champs communs : cf. connectors.records)."""
 
 # ------------------------------------------------------------------ #
 # Client conforme à ConnectorInterface                               #
 # ------------------------------------------------------------------ #
-class CanadaGovClient(ConnectorInterface):
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(1, 1, 4))
-    def _get(self, path: str, params: dict) -> dict:
-        r = requests.get(f"{BASE_URL}{path}", params=params, timeout=10)
-        r.raise_for_status()
-        return r.json()
-
-    def search(self, keyword: str, page_size: int = 10) -> Iterator[CADataset]:
-        keyword = sanitize_keyword(keyword)
-        page = 0
-        max_results = 2  # ← temporaire
-
-        yielded = 0
-        while yielded < max_results:
-            data = self._get(
-                "/api/3/action/package_search",
-                {"q": keyword, "rows": page_size, "start": page * page_size}
-            )
-
-            results = data.get("result", {}).get("results", [])
-            if not results:
-                break
-
-            for raw in results:
-                # Formats disponibles
-                fmt_list = [
-                    f for r in raw.get("resources", [])
-                    if (f := get_format(r, VALID_FORMATS))
-                ]
-                if not fmt_list:
-                    continue
-
-                org_raw = raw.get("organization")
-                org_name = org_raw.get("title") if isinstance(org_raw, dict) else None
-
-                title = raw.get("title_translated", {}).get("en") or raw.get("title")
-                description = raw.get("notes_translated", {}).get("en") or raw.get("notes")
-
-                yield CADataset(
-                    id=raw["id"],
-                    title=title,
-                    description=description,
-                    url=f"https://open.canada.ca/data/en/dataset/{raw['id']}",
-                    organization=org_name,
-                    formats=list(set(fmt_list)),
-                    license=raw.get("license_title"),
-                    last_modified=raw.get("metadata_modified")
-                )
-                yielded += 1
-                if yielded >= max_results:
-                    break
-
-            page += 1
-            time.sleep(0.2)
+class CanadaGovClient(CKANClient):
+    BASE_URL = BASE_URL
+    DATASET_URL = "https://open.canada.ca/data/en/dataset/{id}"
+    SOURCE_NAME = "open.canada.ca"
+    RECORD = CADataset
+    VALID_FORMATS = VALID_FORMATS
+    FIELDS = DEFAULT_FIELDS + ("title_translated", "notes_translated")
+    LANG = "en"
 
     def ca_to_suggestion(self, ds: CADataset) -> DatasetSuggestion:
-        sugg = DatasetSuggestion(
-            title=ds.title,
-            description=ds.description,
-            source_name="open.canada.ca",
-            source_url=ds.url,
-            formats=ds.formats,
-            organization=ds.organization,
-            license=ds.license,
-            last_modified=ds.last_modified,
-        )
-        sugg.richness = richness_score(sugg)
-        return sugg
+        return self.to_suggestion(ds)
 
 __all__ = ["CADataset", "CanadaGovClient"]
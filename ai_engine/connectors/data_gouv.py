@@ -2,114 +2,130 @@
 Connecteur Data.gouv (France)
 -----------------------------
 – Conforme à ConnectorInterface
-– Recherche paginée avec fallback minimum
+– Recherche paginée avec fallback minimum, pages lues au fil de l'eau
+  (cf. connectors.streaming) : arrêt de la lecture dès MAX_RESULTS
 – Conversion vers DatasetSuggestion
 """
 
 from __future__ import annotations
 
-import time
-from typing import Iterator, List, Optional
-
-import requests
-from pydantic import BaseModel
-from tenacity import retry, stop_after_attempt, wait_exponential
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Sequence
 
 from ai_engine.connectors.interface import ConnectorInterface
+from ai_engine.connectors.records import RawDataset, to_suggestion
 from ai_engine.connectors.helpers import sanitize_keyword
 from ai_engine.connectors.format_utils import get_format
-from ai_engine.connectors.richness import richness_score
 from ai_engine.schemas import DatasetSuggestion
+from ai_engine.retries import budgeted_retry
+from ai_engine.connectors import batching, http, streaming
 
 BASE_URL = "https://www.data.gouv.fr/api/1"
 VALID_FORMATS = {"csv", "xls", "xlsx", "json", "geojson", "xml", "shp", "zip", "pdf"}
+MAX_RESULTS = 2  # ← sécurité temporaire, évite de tout renvoyer
 
 # ------------------------------------------------------------------ #
 # Modèle brut Data.gouv                                              #
 # ------------------------------------------------------------------ #
-class FRDataset(BaseModel):
-    id: str
-    title: str
-    description: Optional[str] = None
-    url: str
-    organization: Optional[str] = None
-    formats: List[str] = []
-    license: Optional[str] = None
-    last_modified: Optional[str] = None
+@dataclass(slots=True, kw_only=True)
+class FRDataset(RawDataset):
+    """Enregistrement brut (champs communs : cf. connectors.records)."""
 
 # ------------------------------------------------------------------ #
 # Client conforme à ConnectorInterface                               #
 # ------------------------------------------------------------------ #
 class DataGouvClient(ConnectorInterface):
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(1, 1, 4))
+    @budgeted_retry("www.data.gouv.fr")
     def _get(self, path: str, params: dict) -> dict:
-        r = requests.get(f"{BASE_URL}{path}", params=params, timeout=10)
+        r = http.get(f"{BASE_URL}{path}", params=params, conditional=True)
         r.raise_for_status()
         return r.json()
 
+    def _items(self, path: str, params: dict, meta: dict) -> Iterator[dict]:
+        """Champ `data` de la page, élément par élément ; `next_page` & co → `meta`."""
+        if not streaming.enabled():
+            data = self._get(path, params)
+            meta.update((k, v) for k, v in data.items() if k != "data")
+            return iter(data.get("data") or [])
+        return streaming.stream_page(lambda: self._open(path, params), ("data",), meta,
+                                     lambda: self._get(path, params))
+
+    @budgeted_retry("www.data.gouv.fr")
+    def _open(self, path: str, params: dict):
+        r = http.get(f"{BASE_URL}{path}", params=params, conditional=True, stream=True)
+        r.raise_for_status()
+        return r
+
+    def _record(self, raw: dict) -> Optional[FRDataset]:
+        """Dataset brut → FRDataset, ou None sans format exploitable."""
+        # Récupération des formats valides
+        fmt_list = [
+            f for r in raw.get("resources", [])
+            if (f := get_format(r, VALID_FORMATS))
+        ]
+        if not fmt_list:
+            return None
+
+        org_raw = raw.get("organization")
+        org_name = org_raw.get("name") or org_raw.get("title") if isinstance(org_raw, dict) else None
+
+        license_ = raw.get("license")
+        if isinstance(license_, dict):
+            license_ = license_.get("title") or license_.get("id")
+
+        return FRDataset(
+            id=raw["id"],
+            title=raw["title"],
+            description=raw.get("slug"),
+            url=raw["page"],
+            organization=org_name,
+            formats=list(set(fmt_list)),
+            license=license_,
+            last_modified=raw.get("metadata_modified")
+                or raw.get("modified")
+                or raw.get("last_modified"),
+        )
+
     def search(self, keyword: str, page_size: int = 10) -> Iterator[FRDataset]:
         keyword = sanitize_keyword(keyword)
         page = 1
-        max_results = 2  # ← sécurité temporaire, évite de tout renvoyer
+        max_results = MAX_RESULTS
 
         yielded = 0
         while yielded < max_results:
-            data = self._get("/datasets", {"q": keyword, "page": page, "page_size": page_size})
-            results = data.get("data", [])
-            if not results:
-                break
-
-            for raw in results:
-                # Récupération des formats valides
-                fmt_list = [
-                    f for r in raw.get("resources", [])
-                    if (f := get_format(r, VALID_FORMATS))
-                ]
-                if not fmt_list:
-                    continue
-
-                org_raw = raw.get("organization")
-                org_name = org_raw.get("name") or org_raw.get("title") if isinstance(org_raw, dict) else None
-
-                license_ = raw.get("license")
-                if isinstance(license_, dict):
-                    license_ = license_.get("title") or license_.get("id")
-
-                yield FRDataset(
-                    id=raw["id"],
-                    title=raw["title"],
-                    description=raw.get("slug"),
-                    url=raw["page"],
-                    organization=org_name,
-                    formats=list(set(fmt_list)),
-                    license=license_,
-                    last_modified=raw.get("metadata_modified")
-                        or raw.get("modified")
-                        or raw.get("last_modified"),
-                )
-                yielded += 1
-                if yielded >= max_results:
-                    break
-
-            if not data.get("next_page"):
+            meta: dict = {}
+            items = self._items("/datasets", {"q": keyword, "page": page, "page_size": page_size}, meta)
+            received = 0
+            try:
+                for raw in items:
+                    received += 1
+                    ds = self._record(raw)
+                    if ds is None:
+                        continue
+                    yield ds
+                    yielded += 1
+                    if yielded >= max_results:
+                        break
+            finally:
+                if hasattr(items, "close"):
+                    items.close()
+
+            if not received or yielded >= max_results or not meta.get("next_page"):
                 break
 
             page += 1
-            time.sleep(0.2)
+
+    def search_batch(self, keywords: Sequence[str], *, per_keyword: int) -> Dict[str, List[FRDataset]]:
+        """Recherche groupée : `(a b) OR (c)` en une page (cf. connectors.batching)."""
+        per_keyword = min(per_keyword, MAX_RESULTS)
+        query = " OR ".join(f"({batching.keyword_terms(kw)})" for kw in keywords)
+        page_size = batching.batch_rows(len(keywords), per_keyword)
+        data = self._get("/datasets", {"q": query, "page": 1, "page_size": page_size})
+        records = [ds for raw in data.get("data", []) if (ds := self._record(raw)) is not None]
+        return batching.distribute(records, keywords, per_keyword)
 
     def fr_to_suggestion(self, ds: FRDataset) -> DatasetSuggestion:
-        sugg = DatasetSuggestion(
-            title=ds.title,
-            description=ds.description,
-            source_name="data.gouv.fr",
-            source_url=ds.url,
-            formats=ds.formats,
-            organization=ds.organization,
-            license=ds.license,
-            last_modified=ds.last_modified,
-        )
-        sugg.richness = richness_score(sugg)
-        return sugg
+        return to_suggestion(ds, "data.gouv.fr")
 
 # ------------------------------------------------------------------ #
 # Exports                                                            #
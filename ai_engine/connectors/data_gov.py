@@ -2,26 +2,31 @@
 ai_engine.connectors.data_gov
 ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 Connecteur léger pour https://catalog.data.gov
-– Recherche paginée
-– Fallback /package_show pour métadonnées manquantes
+– Recherche paginée (client CKAN commun, réponses allégées)
+– Fallback /package_show pour métadonnées manquantes : détails partagés par
+  le processus (LRU) et sur disque (cache connecteurs), préchargés en
+  parallèle pour toute une page
 – Conversion vers DatasetSuggestion
 """
 
 from __future__ import annotations
 
+import logging
+import threading
 import time
-from functools import lru_cache
-from typing import Iterator, List, Optional
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional
 
-import requests
-from pydantic import BaseModel
-from tenacity import retry, stop_after_attempt, wait_exponential
+from django.conf import settings
 
 from ai_engine.schemas import DatasetSuggestion
-from ai_engine.connectors.format_utils import get_format
-from ai_engine.connectors.helpers import sanitize_keyword
-from ai_engine.connectors.richness import richness_score
-from ai_engine.connectors.interface import ConnectorInterface
+from ai_engine.connectors import cache_utils
+from ai_engine.connectors.ckan import CKANClient
+from ai_engine.connectors.records import RawDataset
+
+logger = logging.getLogger("datascope.connectors")
 
 # --------------------------------------------------------------------------- #
 # 0. Constantes                                                               #
@@ -32,140 +37,154 @@ VALID_FORMATS = {
     "csv", "json", "xls", "xlsx", "geojson", "xml",
     "shp", "zip", "pdf", "txt", "parquet"
 }
-HEADERS = {
-    "Accept-Encoding": "gzip",
-    "User-Agent": "DatascopeBot/0.1"
-}
+DETAIL_FIELDS = ("organization", "license", "last_modified", "formats")
+DETAIL_CACHE = "DataGovClient.package_show"   # cache disque (cf. cache_utils.store)
+DETAIL_LRU_SIZE = 2048
+DETAIL_FAILURE_TTL = 60.0                      # s : échec /package_show non retenté
 
 # --------------------------------------------------------------------------- #
 # 1. Modèle brut CKAN (après enrichissement éventuel)                         #
 # --------------------------------------------------------------------------- #
-class USDataset(BaseModel):
-    id: str
-    title: str
-    description: Optional[str] = None
-    url: str
-    organization: Optional[str] = None
-    formats: List[str] = []
-    license: Optional[str] = None
-    last_modified: Optional[str] = None
+@dataclass(slots=True, kw_only=True)
+class USDataset(RawDataset):
+    """Enregistrement brut (champs communs : cf. connectors.records)."""
+
+
+# --------------------------------------------------------------------------- #
+# 2. Détails /package_show partagés (processus + disque), clé = id package    #
+# --------------------------------------------------------------------------- #
+_details: "OrderedDict[str, dict]" = OrderedDict()
+_failures: Dict[str, float] = {}               # id → échec récent (monotonic)
+_details_lock = threading.Lock()
+
+
+def _incomplete(fields: dict) -> bool:
+    return fields["organization"] is None or not all(fields[k] for k in DETAIL_FIELDS[1:])
+
+
+def _remember(pkg_id: str, detail: dict) -> None:
+    with _details_lock:
+        _details[pkg_id] = detail
+        _details.move_to_end(pkg_id)
+        while len(_details) > DETAIL_LRU_SIZE:
+            _details.popitem(last=False)
+
+
+def _failed_recently(pkg_id: str) -> bool:
+    failed_at = _failures.get(pkg_id)
+    return failed_at is not None and time.monotonic() - failed_at < DETAIL_FAILURE_TTL
+
+
+def _remember_failure(pkg_id: str) -> None:
+    with _details_lock:
+        now = time.monotonic()
+        _failures[pkg_id] = now
+        if len(_failures) > DETAIL_LRU_SIZE:
+            for key in [k for k, t in _failures.items() if now - t >= DETAIL_FAILURE_TTL]:
+                del _failures[key]
+
+
+def package_details(client: "DataGovClient", ids: Iterable[str]) -> Dict[str, dict]:
+    """
+    {id: champs DETAIL_FIELDS} pour `ids` : LRU du processus, puis cache
+    disque, puis /package_show en parallèle (une rafale pour tous les
+    manquants, sous le limiteur de débit de l'hôte). Un échec n'est pas
+    bloquant, et n'est pas retenté pendant DETAIL_FAILURE_TTL (entrée négative) :
+    `build_record` ne refait pas, un par un, les appels ratés de la rafale.
+    """
+    out: Dict[str, dict] = {}
+    missing: List[str] = []
+    disk = cache_utils.store(DETAIL_CACHE) if cache_utils.enabled() else None
+    for pkg_id in dict.fromkeys(ids):
+        with _details_lock:
+            detail = _details.get(pkg_id)
+            if detail is None and _failed_recently(pkg_id):
+                continue
+        if detail is None and disk is not None:
+            detail = disk.get(pkg_id)
+            if detail is not None:
+                _remember(pkg_id, detail)
+        if detail is None:
+            missing.append(pkg_id)
+        else:
+            out[pkg_id] = detail
+
+    def _fetch(pkg_id: str) -> Optional[dict]:
+        try:
+            fields = client.record_fields(client._action("package_show", {"id": pkg_id}))
+        except Exception as exc:
+            logger.warning("[data.gov] package_show %s failed: %r", pkg_id, exc)
+            return None
+        return {k: fields[k] for k in DETAIL_FIELDS}
+
+    if missing:
+        width = min(len(missing), int(getattr(settings, "CONNECTORS_MAX_PER_HOST", 2) or 2))
+        with ThreadPoolExecutor(max_workers=max(1, width), thread_name_prefix="datagov-detail") as pool:
+            for pkg_id, detail in zip(missing, pool.map(_fetch, missing)):
+                if detail is None:
+                    _remember_failure(pkg_id)
+                    continue
+                _remember(pkg_id, detail)
+                if disk is not None:
+                    disk.set(pkg_id, detail, expire=cache_utils.policy(DETAIL_CACHE)["ttl"])
+                out[pkg_id] = detail
+    return out
+
+
+def clear_details() -> None:
+    with _details_lock:
+        _details.clear()
+        _failures.clear()
 
 
 # --------------------------------------------------------------------------- #
-# 2. Client orienté interface                                                 #
+# 3. Client orienté interface                                                 #
 # --------------------------------------------------------------------------- #
-class DataGovClient(ConnectorInterface):
+class DataGovClient(CKANClient):
     """Client haut-niveau conforme à ConnectorInterface."""
 
+    BASE_URL = "https://catalog.data.gov"
+    SOURCE_NAME = "data.gov"
+    RECORD = USDataset
+    VALID_FORMATS = VALID_FORMATS
+    MAX_RESULTS = None
+
     # ----------- Helpers internes ------------------------------------------ #
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(1, 1, 4))
-    def _get(self, path: str, params: dict) -> dict:
-        r = requests.get(
-            f"{BASE_URL}{path}",
-            headers=HEADERS,
-            params=params,
-            timeout=(5, 8)
-        )
-        r.raise_for_status()
-        return r.json()
-
-    @lru_cache(maxsize=256)
-    def _package_show(self, pkg_id: str) -> dict:
-        """Mémoïse /package_show pour limiter les appels réseau."""
-        return self._get("/package_show", {"id": pkg_id})["result"]
+    def prepare_page(self, results: List[dict]) -> None:
+        """Précharge en une rafale les détails des packages incomplets de la page."""
+        super().prepare_page(results)
+        ids = [raw["id"] for raw in results if _incomplete(self.record_fields(raw))]
+        if ids:
+            package_details(self, ids)
+
+    def build_record(self, raw: dict) -> Optional[USDataset]:
+        """Complète via /package_show si org/licence/date/formats manquants."""
+        fields = self.record_fields(raw)
+        if _incomplete(fields):
+            detail = package_details(self, [raw["id"]]).get(raw["id"]) or {}
+            for key in DETAIL_FIELDS:
+                fields[key] = fields[key] or detail.get(key)
+        if not fields["formats"]:
+            return None
+        return USDataset(**fields)
 
     # ----------- API publique --------------------------------------------- #
     def search(self, keyword: str, *, page_size: int = DEFAULT_PAGE_SIZE, max_results: Optional[int] = None,) -> Iterator[USDataset]:
         """
         Générateur de USDataset.
 
-        - Appelle /package_search (pagination)
+        - Appelle /package_search (pagination, champs limités via `fl`)
         - Appelle /package_show si org/licence/date/formats manquants
         - Ignore les jeux sans ressource exploitable
         - Interrompt si max_results atteint
         """
-        keyword = sanitize_keyword(keyword)
-        start = 0
-        count = 0  # nombre total émis
-
-        while True:
-            page = self._get(
-                "/package_search",
-                {
-                    "q": keyword,
-                    "rows": page_size,
-                    "start": start,
-                    "facet": "false",
-                },
-            )["result"]
-
-            for raw in page["results"]:
-                if max_results is not None and count >= max_results:
-                    return
-
-                fmt_list = [
-                    f for r in raw.get("resources", [])
-                    if (f := get_format(r, VALID_FORMATS))
-                ]
-
-                org_raw = raw.get("organization")
-                org_name = (
-                    org_raw.get("title") or org_raw.get("name")
-                    if isinstance(org_raw, dict) else None
-                )
-                license_ = raw.get("license_title")
-                lastmod = raw.get("metadata_modified")
-
-                if org_name is None or not license_ or not lastmod or not fmt_list:
-                    detail = self._package_show(raw["id"])
-                    if org_name is None and isinstance(detail.get("organization"), dict):
-                        org = detail["organization"]
-                        org_name = org.get("title") or org.get("name")
-                    license_ = license_ or detail.get("license_title")
-                    lastmod = lastmod or detail.get("metadata_modified")
-                    if not fmt_list:
-                        fmt_list = [
-                            f for r in detail.get("resources", [])
-                            if (f := get_format(r, VALID_FORMATS))
-                        ]
-
-                if not fmt_list:
-                    continue
-
-                yield USDataset(
-                    id=raw["id"],
-                    title=raw["title"],
-                    description=raw.get("notes"),
-                    url=f"https://catalog.data.gov/dataset/{raw['name']}",
-                    organization=org_name,
-                    formats=list(set(fmt_list)),
-                    license=license_,
-                    last_modified=lastmod,
-                )
-                count += 1
-
-            start += page_size
-            if start >= page["count"]:
-                break
-            time.sleep(0.2)
-
+        return self.iter_packages(keyword, rows=page_size, max_results=max_results)
 
     def us_to_suggestion(self, ds: USDataset) -> DatasetSuggestion:
-        sugg = DatasetSuggestion(
-            title=ds.title,
-            description=ds.description,
-            source_name="data.gov",
-            source_url=ds.url,
-            formats=ds.formats,
-            organization=ds.organization,
-            license=ds.license,
-            last_modified=ds.last_modified,
-        )
-        sugg.richness = richness_score(sugg)
-        return sugg
+        return self.to_suggestion(ds)
 
 
 # --------------------------------------------------------------------------- #
-# 3. Exports                                                                  #
+# 4. Exports                                                                  #
 # --------------------------------------------------------------------------- #
-__all__ = ["USDataset", "DataGovClient"]
+__all__ = ["USDataset", "DataGovClient", "package_details"]
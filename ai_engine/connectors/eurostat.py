@@ -1,40 +1,295 @@
-import requests, time
-from typing import Iterator
-from pydantic import BaseModel
-from tenacity import retry, stop_after_attempt, wait_exponential
+"""
+Connecteur Eurostat
+-------------------
+Le catalogue Eurostat est fini et change peu : plutôt qu'un appel réseau par
+mot-clé, on télécharge périodiquement la table des matières complète
+(catalogue/toc, une par langue), on la garde sur disque (cache connecteurs)
+et on construit en mémoire un index inversé compact (codes + titres).
+`search(keyword)` répond alors localement, en quelques microsecondes.
 
-BASE_URL = "https://ec.europa.eu/eurostat/api/dissemination/statistics/1.0"
+– Rafraîchissement : settings.EUROSTAT_CATALOGUE_TTL (s), en requête
+  conditionnelle (ETag / Last-Modified, cf. connectors.http) ; en cas d'échec
+  du téléchargement, l'index précédent reste servi
+– Hors du chemin des requêtes : `EurostatClient.search` ne télécharge ni
+  n'indexe jamais lui-même. Le catalogue est chauffé en arrière-plan
+  (`warm_async`, lancé en début d'analyse par le pipeline) ou par
+  `manage.py harvest_catalog --eurostat en` ; tant qu'il n'est pas prêt, le
+  client ne renvoie rien, et un index périmé reste servi pendant sa mise à jour
+– Conforme à ConnectorInterface (`EurostatClient`)
+– Conversion vers DatasetSuggestion
+"""
 
-class EurostatDataset(BaseModel):
+from __future__ import annotations
+
+import csv
+import io
+import logging
+import re
+import threading
+import time
+import unicodedata
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+
+from ai_engine.retries import budgeted_retry
+from ai_engine.connectors import cache_utils, http
+from ai_engine.connectors.interface import ConnectorInterface
+from ai_engine.connectors.richness import richness_score
+from ai_engine.schemas import DatasetSuggestion
+
+logger = logging.getLogger("datascope.connectors")
+
+BASE_URL = "https://ec.europa.eu/eurostat/api/dissemination"
+TOC_PATH = "/catalogue/toc/txt"
+DATASET_URL = "https://ec.europa.eu/eurostat/databrowser/view/{code}/default/table"
+CATALOGUE_CACHE = "EurostatCatalogue"          # cache disque (cf. cache_utils.store)
+CATALOGUE_TTL = 24 * 3600
+MAX_RESULTS = 2
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "and", "by", "de", "des", "du", "et", "for", "in", "la", "le", "les", "of", "on", "the", "to",
+}
+
+
+@dataclass(slots=True, kw_only=True)
+class EurostatDataset:
     code: str
     title: str
     url: str
+    last_modified: Optional[str] = None
+
 
-# ----------- retry HTTP -----------
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=1, max=4))
-def _get(path: str, params: dict) -> dict:
-    r = requests.get(f"{BASE_URL}{path}", params=params, timeout=10)
+# ------------------------------------------------------------------ #
+# Téléchargement de la table des matières                            #
+# ------------------------------------------------------------------ #
+@budgeted_retry("ec.europa.eu")
+def _get_toc(lang: str) -> str:
+    r = http.get(f"{BASE_URL}{TOC_PATH}", params={"lang": lang}, conditional=True)
     r.raise_for_status()
-    return r.json()
+    return r.text
+
+
+def _iso_date(value: str) -> str:
+    """'19.04.2024' (format de la toc) → '2024-04-19' ; vide si illisible."""
+    m = re.fullmatch(r"(\d{2})\.(\d{2})\.(\d{4})", value.strip())
+    return f"{m[3]}-{m[2]}-{m[1]}" if m else ""
+
+
+def parse_toc(text: str) -> List[Tuple[str, str, str]]:
+    """TSV catalogue/toc → [(code, titre, dernière mise à jour)], dossiers exclus."""
+    rows = csv.reader(io.StringIO(text), delimiter="\t")
+    header = [h.strip().lower() for h in next(rows, [])]
+    col = {name: header.index(name) for name in ("title", "code", "type") if name in header}
+    updated = header.index("last update of data") if "last update of data" in header else None
+    entries: Dict[str, Tuple[str, str, str]] = {}
+    for row in rows:
+        try:
+            title, code, kind = (row[col[k]].strip() for k in ("title", "code", "type"))
+        except (IndexError, KeyError):
+            continue
+        if kind == "folder" or not code:
+            continue
+        # un même jeu apparaît sous plusieurs thèmes : première occurrence gardée
+        entries.setdefault(code, (code, title, _iso_date(row[updated]) if updated is not None else ""))
+    return list(entries.values())
+
 
-# ----------- wrapper --------------
-def search(keyword: str, lang: str = "en") -> Iterator[EurostatDataset]:
+# ------------------------------------------------------------------ #
+# Index inversé                                                      #
+# ------------------------------------------------------------------ #
+def _tokens(text: str) -> List[str]:
+    ascii_ = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode().lower()
+    return [t for t in _TOKEN_RE.findall(ascii_) if t not in _STOPWORDS]
+
+
+def _stem(token: str) -> str:
+    return token[:-1] if len(token) > 3 and token.endswith("s") else token
+
+
+class CatalogueIndex:
     """
-    Recherche de jeux de données Eurostat via l’endpoint /dataflow.
+    Postings compactes : jeton → array('I') d'identifiants d'entrées.
+    Requête = intersection des postings de chaque terme ; tri par nombre de
+    jetons du titre (titres les plus spécifiques d'abord), puis code.
     """
-    data = _get(
-        "/dataflow",
-        {
-            "searchText": keyword,
-            "filters": f"language:{lang}",
-            "format": "JSON",
-        },
-    )
-
-    for flow in data.get("dataflows", []):
-        yield EurostatDataset(
-            code=flow["id"],
-            title=flow["name"],
-            url=f"https://ec.europa.eu/eurostat/databrowser/view/{flow['id']}/default/table",
+
+    def __init__(self, entries: List[Tuple[str, str, str]]):
+        self.entries = entries
+        self.lengths = array("H")
+        postings: Dict[str, array] = {}
+        for i, (code, title, _) in enumerate(entries):
+            toks = {_stem(t) for t in _tokens(title)} | {code.lower(), *code.lower().split("_")}
+            self.lengths.append(min(len(toks), 0xFFFF))
+            for tok in toks:
+                postings.setdefault(tok, array("I")).append(i)
+        self.postings = postings
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def search(self, keyword: str, limit: Optional[int] = None) -> List[Tuple[str, str, str]]:
+        terms = [_stem(t) for t in _tokens(keyword)]
+        if not terms:
+            return []
+        lists = sorted((self.postings.get(t) for t in terms), key=lambda p: len(p) if p else 0)
+        if not lists[0]:
+            return []
+        hits = set(lists[0])
+        for plist in lists[1:]:
+            hits.intersection_update(plist)
+            if not hits:
+                return []
+        ranked = sorted(hits, key=lambda i: (self.lengths[i], self.entries[i][0]))
+        return [self.entries[i] for i in ranked[:limit]]
+
+
+_indexes: Dict[str, Tuple[float, CatalogueIndex]] = {}
+_index_lock = threading.Lock()
+
+
+def _ttl() -> float:
+    return float(getattr(settings, "EUROSTAT_CATALOGUE_TTL", CATALOGUE_TTL) or CATALOGUE_TTL)
+
+
+def _load_entries(lang: str) -> Tuple[float, List[Tuple[str, str, str]]]:
+    """(horodatage, entrées) : cache disque si frais, sinon téléchargement."""
+    disk = cache_utils.store(CATALOGUE_CACHE) if cache_utils.enabled() else None
+    cached = disk.get(lang) if disk is not None else None
+    if cached is not None and time.time() - cached[0] < _ttl():
+        return cached
+    try:
+        entries = parse_toc(_get_toc(lang))
+    except Exception as exc:
+        if cached is not None:
+            logger.warning("[eurostat] catalogue refresh (%s) failed, keeping cached: %r", lang, exc)
+            return time.time(), cached[1]      # nouvel essai au prochain TTL
+        raise
+    fetched = (time.time(), entries)
+    if disk is not None:
+        disk.set(lang, fetched)
+    return fetched
+
+
+def catalogue(lang: str = "en") -> CatalogueIndex:
+    """Index du catalogue pour `lang`, reconstruit quand il dépasse le TTL."""
+    current = _indexes.get(lang)
+    if current is not None and time.time() - current[0] < _ttl():
+        return current[1]
+    with _index_lock:
+        current = _indexes.get(lang)
+        if current is not None and time.time() - current[0] < _ttl():
+            return current[1]
+        try:
+            fetched_at, entries = _load_entries(lang)
+        except Exception:
+            if current is not None:
+                logger.warning("[eurostat] catalogue (%s) unavailable, keeping index", lang)
+                _indexes[lang] = (time.time(), current[1])
+                return current[1]
+            raise
+        index = CatalogueIndex(entries)
+        _indexes[lang] = (fetched_at, index)
+        logger.info("[eurostat] catalogue %s indexed: %d datasets", lang, len(index))
+        return index
+
+
+_warming: Dict[str, threading.Thread] = {}
+_warm_lock = threading.Lock()
+
+
+def _warm(lang: str) -> None:
+    try:
+        catalogue(lang)
+    except Exception as exc:
+        logger.warning("[eurostat] catalogue %s warm-up failed: %r", lang, exc)
+    finally:
+        with _warm_lock:
+            _warming.pop(lang, None)
+
+
+def warm_async(lang: str = "en") -> threading.Thread:
+    """Charge / rafraîchit l'index de `lang` dans un thread (un seul à la fois)."""
+    with _warm_lock:
+        thread = _warming.get(lang)
+        if thread is None:
+            thread = _warming[lang] = threading.Thread(
+                target=_warm, args=(lang,), name=f"eurostat-warm-{lang}", daemon=True,
+            )
+            thread.start()
+        return thread
+
+
+def ready_catalogue(lang: str = "en") -> Optional[CatalogueIndex]:
+    """
+    Index de `lang` sans attente réseau : None s'il n'est pas encore chargé,
+    l'index courant (même périmé) sinon ; chargement / rafraîchissement
+    lancés en arrière-plan au besoin.
+    """
+    current = _indexes.get(lang)
+    if current is None or time.time() - current[0] >= _ttl():
+        warm_async(lang)
+    return current[1] if current is not None else None
+
+
+def reset_catalogues() -> None:
+    with _index_lock:
+        _indexes.clear()
+
+
+# ------------------------------------------------------------------ #
+# Recherche                                                          #
+# ------------------------------------------------------------------ #
+def _dataset(entry: Tuple[str, str, str]) -> EurostatDataset:
+    code, title, updated = entry
+    return EurostatDataset(code=code, title=title, url=DATASET_URL.format(code=code),
+                           last_modified=updated or None)
+
+
+def search(keyword: str, lang: str = "en", limit: Optional[int] = None) -> Iterator[EurostatDataset]:
+    """
+    Recherche de jeux de données Eurostat dans l'index local du catalogue
+    (chargé au besoin, en bloquant ; `EurostatClient.search` n'attend jamais).
+    """
+    for entry in catalogue(lang).search(keyword, limit):
+        yield _dataset(entry)
+
+
+class EurostatClient(ConnectorInterface):
+    """Client conforme à ConnectorInterface ; le réseau ne sert qu'au rafraîchissement."""
+
+    host = "ec.europa.eu"
+    cacheable = False          # recherche locale : inutile de passer par le cache disque
+
+    def __init__(self, lang: str = "en"):
+        self.lang = lang
+
+    def search(self, keyword: str, page_size: int = 10) -> Iterator[EurostatDataset]:
+        # jamais de téléchargement ici : job du fan-out, chronométré par le disjoncteur
+        index = ready_catalogue(self.lang)
+        if index is None:
+            logger.info("[eurostat] catalogue %s not ready yet, skipping %r", self.lang, keyword)
+            return iter(())
+        return (_dataset(entry) for entry in index.search(keyword, min(page_size, MAX_RESULTS)))
+
+    def to_suggestion(self, ds: EurostatDataset) -> DatasetSuggestion:
+        sugg = DatasetSuggestion(
+            title=ds.title,
+            description=f"Eurostat dataset {ds.code}",
+            source_name="eurostat",
+            source_url=ds.url,
+            formats=["csv", "json"],
+            organization="Eurostat",
+            license="CC BY 4.0",
+            last_modified=ds.last_modified,
         )
-        time.sleep(0.1)          # micro-pause anti-DOS
+        sugg.richness = richness_score(sugg)
+        return sugg
+
+
+__all__ = [
+    "CatalogueIndex", "EurostatClient", "EurostatDataset", "catalogue", "ready_catalogue", "search", "warm_async",
+]
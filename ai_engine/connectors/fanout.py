@@ -0,0 +1,328 @@
+# ai_engine/connectors/fanout.py
+"""
+Fan-out concurrent des connecteurs (angles × mots-clés × connecteurs).
+
+Les connecteurs restent synchrones (requests + générateurs paginés, testés
+avec `responses`) : chaque appel `search` est exécuté dans un thread via
+le pool `_executor`, sous deux plafonds :
+
+- global  : settings.CONNECTORS_MAX_CONCURRENCY (appels simultanés, tous hôtes) ;
+- par hôte : settings.CONNECTORS_MAX_PER_HOST (politesse envers chaque portail).
+
+Les résultats d'un angle sont consommés **dans l'ordre de soumission**
+(mot-clé puis connecteur, comme la boucle série historique) : la
+déduplication et la coupure `max_total_per_angle` donnent donc le même
+résultat qu'avant. Dès que `consume` signale l'angle plein, les appels
+encore en attente pour cet angle sont annulés. Un appel déjà parti dans
+son thread ne peut pas être interrompu : il garde ses places (hôte +
+global) jusqu'à la fin du thread, et `fan_out` rend la main sans l'attendre.
+
+Mode groupé (settings.CONNECTORS_BATCH_MODE) : pour les connecteurs qui
+exposent `search_batch` (CKAN, data.gouv.fr), les mots-clés d'un angle sont
+envoyés en une requête OR par tranche de CONNECTORS_BATCH_MAX_KEYWORDS
+(cf. connectors.batching). Chaque job (mot-clé, connecteur) attend la
+requête groupée partagée et y prend sa part : ordre de consommation,
+déduplication et annulation sont inchangés.
+
+Préchargement spéculatif (cf. connectors.prefetch) : un objet `prefetched`
+peut fournir, par (connecteur, mot-clé), un Future déjà lancé ; le job
+l'attend au lieu de relancer la recherche (et reçoit sa propre copie des
+résultats, que `consume` peut modifier). Les spéculations encore en vol
+occupent leurs places sous les deux plafonds jusqu'à leur fin.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import copy
+import inspect
+import sys
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Protocol, Tuple, Union
+from urllib.parse import urlparse
+
+from django.conf import settings
+
+from ai_engine.connectors import batching, cache_utils, health
+
+
+@dataclass(frozen=True)
+class SearchJob:
+    angle_idx: int
+    keyword: str
+    connector: Any
+
+
+# consume(job, résultats bruts | exception) -> True quand l'angle est plein
+Consumer = Callable[[SearchJob, Union[List[Any], BaseException]], bool]
+
+
+class Prefetched(Protocol):
+    def handoff(self) -> List[Tuple[str, Future]]: ...
+
+    def take(self, connector: Any, keyword: str, max_per_keyword: int, limit: int) -> Optional[Future]: ...
+
+
+def connector_host(connector: Any) -> str:
+    """Hôte du connecteur : attribut `host`, sinon BASE_URL de son module."""
+    host = getattr(connector, "host", None)
+    if host:
+        return host
+    base_url = getattr(sys.modules.get(type(connector).__module__), "BASE_URL", "") or ""
+    return urlparse(base_url).netloc or type(connector).__name__
+
+
+def _search_kwargs(connector: Any, keyword: str, max_per_keyword: int, limit: int) -> tuple:
+    """(kwargs de `search`, clé de cache) selon la signature du connecteur."""
+    sig = inspect.signature(connector.search).parameters
+    if "max_results" in sig:
+        return {"max_results": max_per_keyword}, cache_utils.make_key(keyword, None, max_per_keyword, limit)
+    if "page_size" in sig:
+        return {"page_size": max_per_keyword}, cache_utils.make_key(keyword, max_per_keyword, None, limit)
+    return {}, cache_utils.make_key(keyword, None, None, limit)
+
+
+def _cacheable(connector: Any) -> bool:
+    return cache_utils.enabled() and getattr(connector, "cacheable", True)
+
+
+def _search(connector: Any, keyword: str, kwargs: dict, limit: int) -> List[Any]:
+    # disjoncteur autour de l'appel réseau seulement : le cache reste servi
+    name = type(connector).__name__
+    return health.guarded(name, lambda: list(islice(connector.search(keyword, **kwargs), limit)))
+
+
+def search_one(connector: Any, keyword: str, max_per_keyword: int, limit: int) -> List[Any]:
+    """
+    Appel `search` adapté à la signature du connecteur, matérialisé (≤ limit
+    items), servi via le cache persistant (cf. connectors.cache_utils) et
+    protégé par le disjoncteur du connecteur (cf. connectors.health).
+    """
+    kwargs, key = _search_kwargs(connector, keyword, max_per_keyword, limit)
+    fetch = partial(_search, connector, keyword, kwargs, limit)
+    if not getattr(connector, "cacheable", True):
+        return fetch()
+    return cache_utils.cached_search(type(connector).__name__, key, fetch)
+
+
+def batch_mode(connector: Any) -> bool:
+    return bool(getattr(settings, "CONNECTORS_BATCH_MODE", False)) and callable(
+        getattr(connector, "search_batch", None)
+    )
+
+
+def search_batch(connector: Any, keywords: List[str], max_per_keyword: int, limit: int) -> Dict[str, List[Any]]:
+    """
+    Équivalent groupé de `search_one` pour plusieurs mots-clés : les entrées
+    déjà en cache (celles de `search_one`, puis les tranches groupées) sont
+    servies, seuls les mots-clés manquants partent dans la requête OR.
+
+    Une tranche de requête OR n'est qu'une approximation de `search(mot-clé)` :
+    elle est mise en cache sous sa propre clé (`_batch_key`), jamais sous celle
+    de `search_one`, et seulement si elle est non vide.
+    """
+    name = type(connector).__name__
+    out: Dict[str, List[Any]] = {}
+    misses: List[str] = []
+    for kw in keywords:
+        if _cacheable(connector):
+            kwargs, key = _search_kwargs(connector, kw, max_per_keyword, limit)
+            refresh = partial(_search, connector, kw, kwargs, limit)
+            hit = cache_utils.lookup(name, key, refresh, count_miss=False)
+            if hit is None:
+                hit = cache_utils.lookup(name, _batch_key(key), refresh)
+            if hit is not None:
+                out[kw] = hit
+                continue
+        misses.append(kw)
+
+    if misses:
+        found = health.guarded(
+            name, lambda: connector.search_batch(misses, per_keyword=min(max_per_keyword, limit))
+        )
+        for kw in misses:
+            out[kw] = list(found.get(kw, []))[:limit]
+            if out[kw] and _cacheable(connector):
+                cache_utils.put(name, _batch_key(_search_kwargs(connector, kw, max_per_keyword, limit)[1]), out[kw])
+    return out
+
+
+def _batch_key(key: tuple) -> tuple:
+    return ("batch", *key)
+
+
+# Pool propre au fan-out (et non l'exécuteur par défaut de la boucle, que
+# asyncio.run attend à la fermeture) : un appel annulé finit en arrière-plan.
+_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="connectors")
+
+
+class _Limits:
+    # ordre d'acquisition : hôte puis global, pour qu'un job en attente d'un
+    # hôte saturé n'immobilise pas une place globale utile aux autres hôtes
+    def __init__(self, max_concurrency: int, max_per_host: int):
+        self.global_sem = asyncio.Semaphore(max(1, max_concurrency))
+        self.max_per_host = max(1, max_per_host)
+        self.hosts: Dict[str, asyncio.Semaphore] = {}
+
+    def host(self, name: str) -> asyncio.Semaphore:
+        if name not in self.hosts:
+            self.hosts[name] = asyncio.Semaphore(self.max_per_host)
+        return self.hosts[name]
+
+
+async def _in_thread(limits: _Limits, host: str, fn: Callable, *args) -> Any:
+    """
+    `fn(*args)` dans `_executor`, sous les deux plafonds. Les places sont
+    rendues à la fin du thread, pas à l'annulation de la tâche : une requête
+    HTTP déjà partie continue de compter pour son hôte.
+    """
+    host_sem = limits.host(host)
+    await host_sem.acquire()
+    try:
+        await limits.global_sem.acquire()
+    except BaseException:
+        host_sem.release()
+        raise
+
+    def _release(f: asyncio.Future) -> None:
+        limits.global_sem.release()
+        host_sem.release()
+        if not f.cancelled():
+            f.exception()                # résultat d'un job annulé : lu, puis ignoré
+
+    try:
+        done = asyncio.wrap_future(_executor.submit(contextvars.copy_context().run, fn, *args))
+    except BaseException:
+        limits.global_sem.release()
+        host_sem.release()
+        raise
+    done.add_done_callback(_release)
+    # asyncio.wait n'annule pas `done` si la tâche est annulée
+    await asyncio.wait({done})
+    return done.result()
+
+
+async def _fetch(job: SearchJob, limits: _Limits, max_per_keyword: int, limit: int) -> List[Any]:
+    return await _in_thread(limits, connector_host(job.connector),
+                            search_one, job.connector, job.keyword, max_per_keyword, limit)
+
+
+async def _fetch_batch(connector: Any, keywords: List[str], limits: _Limits,
+                       max_per_keyword: int, limit: int) -> Dict[str, List[Any]]:
+    return await _in_thread(limits, connector_host(connector),
+                            search_batch, connector, keywords, max_per_keyword, limit)
+
+
+async def _pick(batch: asyncio.Task, keyword: str) -> List[Any]:
+    # shield : annuler un job ne doit pas annuler la requête partagée
+    return (await asyncio.shield(batch))[keyword]
+
+
+async def _await_prefetched(future: Future) -> List[Any]:
+    # même principe : le Future spéculatif peut servir à plusieurs angles,
+    # chacun reçoit ses propres objets (consume fixe angle_idx, found_by…)
+    return [copy.copy(x) for x in await asyncio.shield(asyncio.wrap_future(future))]
+
+
+async def _hold(limits: _Limits, host: str, future: Future) -> None:
+    """Occupe une place (hôte + global) tant que la spéculation `future` est en vol."""
+    async with limits.host(host):
+        async with limits.global_sem:
+            await asyncio.wait({asyncio.wrap_future(future)})
+
+
+def _batch_tasks(jobs: List[SearchJob], limits: _Limits, max_per_keyword: int,
+                 limit: int) -> Dict[tuple, asyncio.Task]:
+    """{(id connecteur, mot-clé): tâche groupée} pour les connecteurs en mode groupé."""
+    size = int(getattr(settings, "CONNECTORS_BATCH_MAX_KEYWORDS", 5) or 5)
+    keywords: Dict[int, List[str]] = {}
+    connectors: Dict[int, Any] = {}
+    for job in jobs:
+        if batch_mode(job.connector):
+            connectors[id(job.connector)] = job.connector
+            kws = keywords.setdefault(id(job.connector), [])
+            if job.keyword not in kws:
+                kws.append(job.keyword)
+
+    by_job: Dict[tuple, asyncio.Task] = {}
+    for cid, kws in keywords.items():
+        for chunk in batching.chunks(kws, size):
+            task = asyncio.create_task(_fetch_batch(connectors[cid], chunk, limits, max_per_keyword, limit))
+            for kw in chunk:
+                by_job[(cid, kw)] = task
+    return by_job
+
+
+def _job_coro(job: SearchJob, early: Optional[Future], batches: Dict[tuple, asyncio.Task],
+              limits: _Limits, max_per_keyword: int, limit: int):
+    if early is not None:
+        return _await_prefetched(early)
+    key = (id(job.connector), job.keyword)
+    if key in batches:
+        return _pick(batches[key], job.keyword)
+    return _fetch(job, limits, max_per_keyword, limit)
+
+
+async def _run_angle(jobs: List[SearchJob], consume: Consumer, limits: _Limits,
+                     max_per_keyword: int, limit: int, prefetched: Optional[Prefetched] = None) -> None:
+    early = [
+        prefetched.take(job.connector, job.keyword, max_per_keyword, limit) if prefetched else None
+        for job in jobs
+    ]
+    batches = _batch_tasks([j for j, f in zip(jobs, early) if f is None], limits, max_per_keyword, limit)
+    tasks = [
+        asyncio.create_task(_job_coro(job, fut, batches, limits, max_per_keyword, limit))
+        for job, fut in zip(jobs, early)
+    ]
+    try:
+        for job, task in zip(jobs, tasks):
+            try:
+                outcome: Union[List[Any], BaseException] = await task
+            except Exception as exc:
+                outcome = exc
+            if consume(job, outcome):
+                break
+    finally:
+        pending = [t for t in [*tasks, *set(batches.values())] if not t.done()]
+        for t in pending:
+            t.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
+async def _run_all(jobs_per_angle: List[List[SearchJob]], consume: Consumer,
+                   max_per_keyword: int, limit: int, prefetched: Optional[Prefetched] = None) -> None:
+    limits = _Limits(
+        int(getattr(settings, "CONNECTORS_MAX_CONCURRENCY", 8) or 8),
+        int(getattr(settings, "CONNECTORS_MAX_PER_HOST", 2) or 2),
+    )
+    # places réservées d'abord : les spéculations en vol passent avant les jobs
+    held = [asyncio.create_task(_hold(limits, host, f)) for host, f in prefetched.handoff()] if prefetched else []
+    try:
+        await asyncio.gather(*(
+            _run_angle(jobs, consume, limits, max_per_keyword, limit, prefetched) for jobs in jobs_per_angle
+        ))
+    finally:
+        for t in held:
+            t.cancel()
+        await asyncio.gather(*held, return_exceptions=True)
+
+
+def fan_out(jobs_per_angle: List[List[SearchJob]], consume: Consumer, *,
+            max_per_keyword: int, limit: int, prefetched: Optional[Prefetched] = None) -> None:
+    """
+    Lance toutes les recherches et appelle `consume` pour chacune, dans l'ordre
+    de soumission au sein d'un angle. Utilisable depuis du code synchrone
+    (vues Django) ; si une boucle asyncio tourne déjà, on passe par un thread.
+    """
+    coro = _run_all(jobs_per_angle, consume, max_per_keyword, limit, prefetched)
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        asyncio.run(coro)
+        return
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        pool.submit(asyncio.run, coro).result()
@@ -0,0 +1,196 @@
+# ai_engine/connectors/health.py
+"""
+Disjoncteurs (circuit breakers) et suivi de santé par connecteur.
+
+Chaque connecteur (nom de classe) garde :
+- une fenêtre glissante des derniers appels réseau (succès / échec) ;
+- une moyenne mobile exponentielle (EWMA) de la latence.
+
+La latence est celle des tentatives HTTP (mesurées dans connectors.http,
+`record_attempt`), moyennée par appel : attentes du limiteur de débit et
+back-off des retries n'en font pas partie, un portail bridé mais sain ne
+paraît pas lent. Un appel sans requête HTTP (index local…) compte pour sa
+durée totale.
+
+États :
+- closed    : appels normaux ;
+- open      : après ≥ min_calls appels, taux d'erreur ≥ error_rate ou EWMA
+              de latence ≥ slow_ms → les appels sont refusés immédiatement
+              (`CircuitOpenError`), sans consommer de retries ;
+- half_open : après `cooldown_s`, un seul appel de sonde est autorisé ;
+              succès → closed (fenêtre remise à zéro), échec → open.
+
+Configuration : settings.CONNECTOR_BREAKER ("default" + surcharges par nom).
+État exposé par `health_snapshot()` (bloc `_debug` du playground, logs).
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, TypeVar
+
+from django.conf import settings
+
+logger = logging.getLogger("datascope.connectors")
+
+T = TypeVar("T")
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+DEFAULT_BREAKER = {
+    "window": 20,          # derniers appels considérés
+    "min_calls": 5,        # avant de juger le taux d'erreur ou la latence
+    "error_rate": 0.5,
+    "slow_ms": 8000,       # EWMA de latence au-delà de laquelle on ouvre
+    "ewma_alpha": 0.3,
+    "cooldown_s": 30,
+}
+
+
+class CircuitOpenError(RuntimeError):
+    """Appel refusé : le disjoncteur du connecteur est ouvert."""
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, conf: dict):
+        self.name = name
+        self.conf = conf
+        self.state = CLOSED
+        self.outcomes: deque = deque(maxlen=int(conf["window"]))
+        self.ewma_ms: float | None = None
+        self.opened_at: float | None = None
+        self.probing = False
+        self.calls = self.failures = self.skipped = 0
+        self._lock = threading.Lock()
+
+    # ----------------------------------------------------------------- #
+    def _error_rate(self) -> float:
+        return (self.outcomes.count(False) / len(self.outcomes)) if self.outcomes else 0.0
+
+    def _open(self, reason: str) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.probing = False
+        logger.warning("[breaker] %s OPEN (%s)", self.name, reason)
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.conf["cooldown_s"]:
+                self.state = HALF_OPEN
+                logger.info("[breaker] %s HALF-OPEN (probe)", self.name)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self.probing:
+                self.probing = True
+                return True
+            self.skipped += 1
+            return False
+
+    def record(self, ok: bool, latency_s: float) -> None:
+        ms = latency_s * 1000
+        with self._lock:
+            self.calls += 1
+            self.failures += 0 if ok else 1
+            alpha = self.conf["ewma_alpha"]
+            self.ewma_ms = ms if self.ewma_ms is None else alpha * ms + (1 - alpha) * self.ewma_ms
+
+            if self.state == HALF_OPEN:
+                if ok and ms < self.conf["slow_ms"]:
+                    self.state = CLOSED
+                    self.outcomes.clear()
+                    self.ewma_ms = ms
+                    self.probing = False
+                    logger.info("[breaker] %s CLOSED (probe ok, %.0f ms)", self.name, ms)
+                else:
+                    self._open("probe failed" if not ok else f"probe slow {ms:.0f} ms")
+                return
+
+            self.outcomes.append(ok)
+            if self.state != CLOSED:
+                return
+            # même plancher pour les deux critères : une première requête lente
+            # (poignée de main TLS à froid, premier sommaire Eurostat) n'ouvre pas
+            if len(self.outcomes) < self.conf["min_calls"]:
+                return
+            if self._error_rate() >= self.conf["error_rate"]:
+                self._open(f"error rate {self._error_rate():.0%}")
+            elif self.ewma_ms >= self.conf["slow_ms"]:
+                self._open(f"latency EWMA {self.ewma_ms:.0f} ms")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "state": self.state,
+                "calls": self.calls,
+                "failures": self.failures,
+                "skipped": self.skipped,
+                "error_rate": round(self._error_rate(), 3),
+                "latency_ewma_ms": None if self.ewma_ms is None else round(self.ewma_ms),
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_lock = threading.Lock()
+
+
+def breaker_conf(name: str) -> dict:
+    conf = getattr(settings, "CONNECTOR_BREAKER", {}) or {}
+    out = dict(DEFAULT_BREAKER)
+    out.update(conf.get("default", {}) or {})
+    out.update(conf.get(name, {}) or {})
+    return out
+
+
+def breaker(name: str) -> CircuitBreaker:
+    with _lock:
+        b = _breakers.get(name)
+        if b is None:
+            b = _breakers[name] = CircuitBreaker(name, breaker_conf(name))
+        return b
+
+
+_attempts = threading.local()
+
+
+def record_attempt(latency_s: float) -> None:
+    """Durée d'une tentative HTTP, imputée à l'appel `guarded` en cours (même thread)."""
+    current = getattr(_attempts, "latencies", None)
+    if current is not None:
+        current.append(latency_s)
+
+
+def _call_latency(latencies: list, t0: float) -> float:
+    return sum(latencies) / len(latencies) if latencies else time.perf_counter() - t0
+
+
+def guarded(name: str, call: Callable[[], T]) -> T:
+    """Exécute `call` sous le disjoncteur `name` (latence + succès/échec)."""
+    b = breaker(name)
+    if not b.allow():
+        raise CircuitOpenError(f"{name}: circuit open, call skipped")
+    outer = getattr(_attempts, "latencies", None)
+    _attempts.latencies = latencies = []
+    t0 = time.perf_counter()
+    try:
+        result = call()
+    except Exception:
+        b.record(False, _call_latency(latencies, t0))
+        raise
+    finally:
+        _attempts.latencies = outer
+    b.record(True, _call_latency(latencies, t0))
+    return result
+
+
+def health_snapshot() -> dict:
+    """{connecteur: {state, calls, failures, skipped, error_rate, latency_ewma_ms}}"""
+    with _lock:
+        breakers = list(_breakers.values())
+    return {b.name: b.snapshot() for b in breakers}
+
+
+def reset_breakers() -> None:
+    with _lock:
+        _breakers.clear()
@@ -0,0 +1,244 @@
+# ai_engine/connectors/http.py
+"""
+Sessions HTTP keep-alive partagées par tous les connecteurs.
+
+Un `requests.Session` par hôte, créé à la demande et conservé au niveau du
+processus : les connexions TCP/TLS sont réutilisées d'un appel à l'autre,
+d'un `run_connectors` à l'autre et entre requêtes du worker.
+
+- pool par hôte : settings.HTTP_POOL_MAXSIZE (défaut = CONNECTORS_MAX_PER_HOST,
+  le plafond de concurrence du fan-out, cf. connectors.fanout) ;
+- en-têtes communs : gzip/deflate négociés, User-Agent DataScope ;
+- timeouts (connexion, lecture) par hôte : settings.CONNECTOR_TIMEOUTS[host],
+  sinon settings.CONNECTOR_DEFAULT_TIMEOUT ;
+- débit par hôte : chaque requête prend un jeton du limiteur de l'hôte
+  (connectors.ratelimit), qui ne fait patienter que si le budget est épuisé ;
+- santé : la durée de chaque tentative (hors attente du limiteur) alimente
+  l'EWMA de latence du disjoncteur en cours (connectors.health).
+
+Requêtes conditionnelles (`get(..., conditional=True)`) : le corps et les
+validateurs (`ETag`, `Last-Modified`) des réponses sont gardés dans le cache
+disque des connecteurs (store "http") ; les appels suivants envoient
+`If-None-Match` / `If-Modified-Since` et un 304 resert le corps stocké (un
+simple prolongement du cache). Avec `stream=True`, le corps n'est stocké que
+s'il a été lu en entier. Octets économisés par portail : metrics
+"http_revalidation" (`revalidation_stats()`). Désactivable avec
+settings.CONNECTOR_CONDITIONAL_REQUESTS = False.
+
+Redirection (tests de charge, cf. connectors.mock_portal) :
+settings.CONNECTOR_ORIGIN_OVERRIDES = {hôte | "*": "http://127.0.0.1:8765"}
+remplace schéma + hôte de l'URL ; session, timeout et débit restent ceux du
+portail d'origine. Le store "http" suit alors les caches des connecteurs
+dans un répertoire à part (cf. cache_utils).
+
+Les retries restent gérés par `ai_engine.retries.budgeted_retry` autour des
+`_get` des connecteurs (l'adapter n'en fait pas lui-même).
+
+    from ai_engine.connectors import http
+    r = http.get(f"{BASE_URL}{path}", params=params)
+"""
+from __future__ import annotations
+
+import threading
+import time
+import zlib
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import urlencode, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from django.conf import settings
+
+from ai_engine import metrics
+from ai_engine.connectors import cache_utils, health, ratelimit
+
+DEFAULT_HEADERS = {
+    "Accept-Encoding": "gzip, deflate",
+    "User-Agent": "DatascopeBot/0.1",
+}
+DEFAULT_TIMEOUT: Tuple[float, float] = (5, 10)
+
+Timeout = Union[float, Tuple[float, float]]
+
+VALIDATOR_CACHE = "http"                 # cache disque des corps + validateurs
+METRICS_GROUP = "http_revalidation"
+_KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+_sessions: Dict[str, requests.Session] = {}
+_lock = threading.Lock()
+
+
+def _pool_maxsize(host: str) -> int:
+    sizes = getattr(settings, "HTTP_POOL_MAXSIZE", None)
+    default = int(getattr(settings, "CONNECTORS_MAX_PER_HOST", 2) or 2)
+    if isinstance(sizes, dict):
+        return int(sizes.get(host, sizes.get("default", default)))
+    return int(sizes or default)
+
+
+def timeout_for(host: str) -> Timeout:
+    """(connect, read) pour `host`, depuis CONNECTOR_TIMEOUTS / CONNECTOR_DEFAULT_TIMEOUT."""
+    per_host = getattr(settings, "CONNECTOR_TIMEOUTS", {}) or {}
+    value = per_host.get(host) or getattr(settings, "CONNECTOR_DEFAULT_TIMEOUT", None) or DEFAULT_TIMEOUT
+    return tuple(value) if isinstance(value, (list, tuple)) else value
+
+
+def _build_session(host: str) -> requests.Session:
+    s = requests.Session()
+    s.headers.update(DEFAULT_HEADERS)
+    size = max(1, _pool_maxsize(host))
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size, pool_block=False, max_retries=0)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+
+def session_for(host: str) -> requests.Session:
+    """Session (et pool de connexions) dédiée à `host`, partagée par le processus."""
+    with _lock:
+        s = _sessions.get(host)
+        if s is None:
+            s = _sessions[host] = _build_session(host)
+        return s
+
+
+def _origin_override(host: str) -> Optional[str]:
+    overrides = getattr(settings, "CONNECTOR_ORIGIN_OVERRIDES", None) or {}
+    return overrides.get(host) or overrides.get("*")
+
+
+def _send(url: str, params: Optional[dict], headers: Optional[dict],
+          timeout: Optional[Timeout], **kwargs) -> requests.Response:
+    parsed = urlparse(url)
+    host = parsed.netloc
+    origin = _origin_override(host)
+    if origin:
+        url = origin.rstrip("/") + parsed._replace(scheme="", netloc="").geturl()
+    ratelimit.limiter(host).acquire()
+    t0 = time.perf_counter()
+    try:
+        return session_for(host).get(
+            url,
+            params=params,
+            headers=headers,
+            timeout=timeout if timeout is not None else timeout_for(host),
+            **kwargs,
+        )
+    finally:
+        health.record_attempt(time.perf_counter() - t0)
+
+
+# ---------------------------------------------------------------------------
+# Requêtes conditionnelles (ETag / Last-Modified)
+# ---------------------------------------------------------------------------
+
+def conditional_enabled() -> bool:
+    return cache_utils.enabled() and bool(getattr(settings, "CONNECTOR_CONDITIONAL_REQUESTS", True))
+
+
+def _validator_key(url: str, params: Optional[dict]) -> str:
+    return f"{url}?{urlencode(sorted((params or {}).items()), doseq=True)}"
+
+
+def _replay(entry: dict, response: requests.Response) -> requests.Response:
+    """Réponse 200 reconstruite depuis le corps stocké (après un 304)."""
+    replay = requests.Response()
+    replay.status_code = 200
+    replay._content = zlib.decompress(entry["body"])
+    replay._content_consumed = True          # iter_content resert le corps stocké
+    replay.headers = CaseInsensitiveDict(entry["headers"])
+    replay.encoding = entry["encoding"]
+    replay.url = response.url
+    replay.request = response.request
+    return replay
+
+
+def _conditional_get(url: str, params: Optional[dict], headers: Optional[dict],
+                     timeout: Optional[Timeout], **kwargs) -> requests.Response:
+    host = urlparse(url).netloc
+    store = cache_utils.store(VALIDATOR_CACHE)
+    key = _validator_key(url, params)
+    entry = store.get(key)
+
+    headers = dict(headers or {})
+    if entry is not None:
+        if entry["headers"].get("ETag"):
+            headers["If-None-Match"] = entry["headers"]["ETag"]
+        if entry["headers"].get("Last-Modified"):
+            headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+        metrics.incr(METRICS_GROUP, host, "conditional")
+
+    r = _send(url, params, headers, timeout, **kwargs)
+    policy = cache_utils.policy(VALIDATOR_CACHE)
+    expire = policy["ttl"] + policy["stale_ttl"]
+
+    if r.status_code == 304 and entry is not None:
+        metrics.incr(METRICS_GROUP, host, "not_modified")
+        metrics.incr(METRICS_GROUP, host, "bytes_saved", entry["wire_bytes"])
+        store.touch(key, expire=expire)
+        return _replay(entry, r)
+
+    if r.status_code == 200 and (r.headers.get("ETag") or r.headers.get("Last-Modified")):
+        def _save(body: bytes) -> None:
+            store.set(key, {
+                "body": zlib.compress(body),
+                "headers": {h: r.headers[h] for h in _KEPT_HEADERS if h in r.headers},
+                "encoding": r.encoding,
+                # taille sur le fil (gzip) si annoncée, sinon corps décodé
+                "wire_bytes": int(r.headers.get("Content-Length") or len(body)),
+                "stored_at": time.time(),
+            }, expire=expire)
+
+        if kwargs.get("stream"):
+            _tee_body(r, _save)
+        else:
+            _save(r.content)
+    return r
+
+
+def _tee_body(response: requests.Response, save) -> None:
+    """
+    stream=True : le corps n'est pas lu ici (ce serait tout télécharger avant
+    le parseur incrémental). Les blocs sont copiés au fil de `iter_content` et
+    `save(corps)` n'est appelé que si la lecture va jusqu'au bout ; une lecture
+    arrêtée tôt (max_results atteint) ne stocke rien.
+    """
+    iter_content = response.iter_content
+
+    def _iter(chunk_size=1, decode_unicode=False):
+        if decode_unicode:
+            yield from iter_content(chunk_size, decode_unicode)
+            return
+        parts = []
+        for chunk in iter_content(chunk_size, decode_unicode):
+            parts.append(chunk)
+            yield chunk
+        save(b"".join(parts))
+
+    response.iter_content = _iter
+
+
+def get(url: str, params: Optional[dict] = None, *, headers: Optional[dict] = None,
+        timeout: Optional[Timeout] = None, conditional: bool = False, **kwargs) -> requests.Response:
+    """
+    GET via la session de l'hôte de `url`, avec le timeout de ce connecteur.
+    `conditional=True` : revalidation ETag / Last-Modified (cf. en-tête du module).
+    """
+    if conditional and conditional_enabled():
+        return _conditional_get(url, params, headers, timeout, **kwargs)
+    return _send(url, params, headers, timeout, **kwargs)
+
+
+def revalidation_stats() -> dict:
+    """{hôte: {conditional, not_modified, bytes_saved}}"""
+    return metrics.snapshot(METRICS_GROUP)
+
+
+def close_all() -> None:
+    """Ferme toutes les sessions (tests, arrêt du worker)."""
+    with _lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for s in sessions:
+        s.close()
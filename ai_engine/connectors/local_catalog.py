@@ -0,0 +1,276 @@
+"""
+Miroir local des catalogues CKAN (SQLite FTS5)
+----------------------------------------------
+– `harvest(portal)` : moisson incrémentale de /package_search, triée par
+  `metadata_modified` ; le curseur (dernier metadata_modified vu) est stocké
+  par portail, la moisson suivante ne reprend que les jeux modifiés depuis.
+– `LocalCatalogClient` : conforme à ConnectorInterface, répond en quelques
+  millisecondes avec un classement BM25 (titre > organisation > notes > formats).
+
+Index : settings.LOCAL_CATALOG_PATH (défaut .cache/catalog.sqlite3).
+Commande : `python manage.py harvest_catalog [--portal data.gov.uk ...]`.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import time
+from contextlib import closing
+from typing import Dict, Iterator, List, Optional
+
+from django.conf import settings
+
+from ai_engine.connectors import http
+from ai_engine.connectors.ckan import DEFAULT_FIELDS, organization_name, organization_titles, package_formats
+from ai_engine.connectors.helpers import sanitize_keyword
+from ai_engine.connectors.interface import ConnectorInterface
+from ai_engine.connectors.richness import richness_score
+from ai_engine.retries import budgeted_retry
+from ai_engine.schemas import DatasetSuggestion
+
+logger = logging.getLogger("datascope.connectors")
+
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), "..", "..", ".cache", "catalog.sqlite3")
+VALID_FORMATS = {"csv", "json", "xls", "xlsx", "geojson", "xml", "shp", "zip", "pdf", "txt", "parquet"}
+
+# ------------------------------------------------------------------ #
+# Portails CKAN moissonnables                                        #
+# ------------------------------------------------------------------ #
+PORTALS: Dict[str, dict] = {
+    "catalog.data.gov": {
+        "api": "https://catalog.data.gov/api/3/action",
+        "dataset_url": "https://catalog.data.gov/dataset/{name}",
+        "source_name": "data.gov",
+    },
+    "open.canada.ca": {
+        "api": "https://open.canada.ca/data/api/3/action",
+        "dataset_url": "https://open.canada.ca/data/en/dataset/{id}",
+        "source_name": "open.canada.ca",
+    },
+    "data.gov.uk": {
+        "api": "https://data.gov.uk/api/3/action",
+        "dataset_url": "https://data.gov.uk/dataset/{name}",
+        "source_name": "data.gov.uk",
+    },
+    "data.humdata.org": {
+        "api": "https://data.humdata.org/api/3/action",
+        "dataset_url": "https://data.humdata.org/dataset/{name}",
+        "source_name": "data.humdata.org",
+    },
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS datasets (
+    rowid INTEGER PRIMARY KEY,
+    uid TEXT UNIQUE NOT NULL,               -- portail:id CKAN
+    portal TEXT NOT NULL,
+    title TEXT, notes TEXT, organization TEXT, formats TEXT,
+    license TEXT, url TEXT, metadata_modified TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS datasets_fts USING fts5(
+    title, notes, organization, formats,
+    content='datasets', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS datasets_ai AFTER INSERT ON datasets BEGIN
+    INSERT INTO datasets_fts(rowid, title, notes, organization, formats)
+    VALUES (new.rowid, new.title, new.notes, new.organization, new.formats);
+END;
+CREATE TRIGGER IF NOT EXISTS datasets_ad AFTER DELETE ON datasets BEGIN
+    INSERT INTO datasets_fts(datasets_fts, rowid, title, notes, organization, formats)
+    VALUES ('delete', old.rowid, old.title, old.notes, old.organization, old.formats);
+END;
+CREATE TRIGGER IF NOT EXISTS datasets_au AFTER UPDATE ON datasets BEGIN
+    INSERT INTO datasets_fts(datasets_fts, rowid, title, notes, organization, formats)
+    VALUES ('delete', old.rowid, old.title, old.notes, old.organization, old.formats);
+    INSERT INTO datasets_fts(rowid, title, notes, organization, formats)
+    VALUES (new.rowid, new.title, new.notes, new.organization, new.formats);
+END;
+CREATE TABLE IF NOT EXISTS harvest_state (
+    portal TEXT PRIMARY KEY,
+    cursor TEXT,                            -- dernier metadata_modified moissonné
+    harvested_at REAL,
+    total INTEGER
+);
+"""
+
+# Poids BM25 des colonnes : title, notes, organization, formats
+_BM25 = "bm25(datasets_fts, 10.0, 1.0, 3.0, 0.5)"
+
+
+def catalog_path() -> str:
+    return getattr(settings, "LOCAL_CATALOG_PATH", None) or DEFAULT_PATH
+
+
+def connect(path: Optional[str] = None) -> sqlite3.Connection:
+    path = path or catalog_path()
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+# ------------------------------------------------------------------ #
+# Moisson                                                            #
+# ------------------------------------------------------------------ #
+def _row(portal: str, raw: dict) -> Optional[tuple]:
+    conf = PORTALS[portal]
+    fmt_list = package_formats(raw, VALID_FORMATS)
+    if not fmt_list:
+        return None
+    return (
+        f"{portal}:{raw['id']}",
+        portal,
+        raw.get("title") or raw.get("name"),
+        raw.get("notes"),
+        organization_name(raw, portal),
+        " ".join(fmt_list),
+        raw.get("license_title"),
+        conf["dataset_url"].format(id=raw["id"], name=raw.get("name") or raw["id"]),
+        raw.get("metadata_modified"),
+    )
+
+
+_UPSERT = """
+INSERT INTO datasets (uid, portal, title, notes, organization, formats, license, url, metadata_modified)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(uid) DO UPDATE SET
+    title=excluded.title, notes=excluded.notes, organization=excluded.organization,
+    formats=excluded.formats, license=excluded.license, url=excluded.url,
+    metadata_modified=excluded.metadata_modified
+"""
+
+
+def _package_search(portal: str, params: dict) -> dict:
+    @budgeted_retry(portal)   # clés de PORTALS = hôtes, même budget que les connecteurs live
+    def _get() -> dict:
+        r = http.get(f"{PORTALS[portal]['api']}/package_search", params=params)
+        r.raise_for_status()
+        return r.json()["result"]
+
+    return _get()
+
+
+def harvest(portal: str, *, rows: int = 500, max_pages: Optional[int] = None,
+            full: bool = False, path: Optional[str] = None) -> int:
+    """
+    Moissonne `portal` dans l'index local et renvoie le nombre de jeux écrits.
+
+    Pagination par curseur `metadata_modified` (fq=[cursor TO *], tri croissant)
+    plutôt que par `start` profond ; `start` n'avance que si toute une page
+    partage le même horodatage.
+    """
+    if portal not in PORTALS:
+        raise ValueError(f"unknown portal {portal!r}; expected one of {sorted(PORTALS)}")
+
+    with closing(connect(path)) as conn:
+        state = conn.execute("SELECT cursor FROM harvest_state WHERE portal = ?", (portal,)).fetchone()
+        cursor = None if full or state is None else state[0]
+        start, pages, written = 0, 0, 0
+
+        while max_pages is None or pages < max_pages:
+            params = {
+                "q": "*:*", "rows": rows, "start": start, "sort": "metadata_modified asc",
+                "fl": ",".join(DEFAULT_FIELDS), "facet": "false",
+            }
+            if cursor:
+                solr_ts = cursor if cursor.endswith("Z") else f"{cursor}Z"
+                params["fq"] = f"metadata_modified:[{solr_ts} TO *]"
+            page = _package_search(portal, params)
+            results = page.get("results") or []
+            pages += 1
+            if not results:
+                break
+
+            organization_titles(portal, PORTALS[portal]["api"],
+                                [o for raw in results if isinstance(o := raw.get("organization"), str)])
+            batch = [row for raw in results if (row := _row(portal, raw))]
+            with conn:
+                conn.executemany(_UPSERT, batch)
+            written += len(batch)
+
+            last = results[-1].get("metadata_modified") or cursor
+            if last == cursor:
+                start += rows            # page entière au même horodatage
+            else:
+                cursor, start = last, 0
+            with conn:
+                conn.execute(
+                    "INSERT INTO harvest_state (portal, cursor, harvested_at, total) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(portal) DO UPDATE SET cursor=excluded.cursor, "
+                    "harvested_at=excluded.harvested_at, total=excluded.total",
+                    (portal, cursor, time.time(),
+                     conn.execute("SELECT COUNT(*) FROM datasets WHERE portal = ?", (portal,)).fetchone()[0]),
+                )
+            if len(results) < rows:
+                break
+
+    logger.info("[harvest] %s: %d datasets written (%d pages)", portal, written, pages)
+    return written
+
+
+def harvested_portals(path: Optional[str] = None) -> List[str]:
+    path = path or catalog_path()
+    if not os.path.exists(path):
+        return []
+    with closing(connect(path)) as conn:
+        return [r[0] for r in conn.execute("SELECT portal FROM harvest_state WHERE total > 0")]
+
+
+# ------------------------------------------------------------------ #
+# Client conforme à ConnectorInterface                               #
+# ------------------------------------------------------------------ #
+def _match_query(keyword: str) -> str:
+    """Mots-clés → requête FTS5 (termes entre guillemets, OU ; BM25 classe)."""
+    terms = [t for t in sanitize_keyword(keyword).split("+") if t]
+    return " OR ".join('"' + t.replace('"', '""') + '"' for t in terms)
+
+
+class LocalCatalogClient(ConnectorInterface):
+    host = "local-catalog"
+    cacheable = False   # déjà local : inutile de passer par connectors.cache_utils
+
+    def __init__(self, path: Optional[str] = None, portals: Optional[List[str]] = None):
+        self.path = path
+        self.portals = list(portals) if portals else None
+
+    def search(self, keyword: str, page_size: int = 10) -> Iterator[DatasetSuggestion]:
+        path = self.path or catalog_path()
+        query = _match_query(keyword)
+        if not query or not os.path.exists(path):
+            return
+
+        sql = (
+            "SELECT d.portal, d.title, d.notes, d.organization, d.formats, d.license, "
+            "d.url, d.metadata_modified "
+            "FROM datasets_fts JOIN datasets d ON d.rowid = datasets_fts.rowid "
+            "WHERE datasets_fts MATCH ?"
+        )
+        params: list = [query]
+        if self.portals:
+            sql += f" AND d.portal IN ({','.join('?' * len(self.portals))})"
+            params += self.portals
+        sql += f" ORDER BY {_BM25} LIMIT ?"
+        params.append(int(page_size))
+
+        with closing(sqlite3.connect(path)) as conn:
+            rows = conn.execute(sql, params).fetchall()
+
+        for portal, title, notes, org, formats, license_, url, lastmod in rows:
+            sugg = DatasetSuggestion(
+                title=title,
+                description=notes,
+                source_name=PORTALS.get(portal, {}).get("source_name", portal),
+                source_url=url,
+                formats=(formats or "").split(),
+                organization=org,
+                license=license_,
+                last_modified=lastmod,
+            )
+            sugg.richness = richness_score(sugg)
+            yield sugg
+
+
+__all__ = ["LocalCatalogClient", "PORTALS", "harvest", "harvested_portals"]
@@ -0,0 +1,279 @@
+# ai_engine/connectors/mock_portal.py
+"""
+Portail factice local (CKAN + data.gouv) pour tests de charge et benchmarks.
+
+Un seul serveur HTTP (stdlib, threadé) répond aux routes utilisées par nos
+connecteurs, quel que soit le préfixe du portail :
+
+- `…/api/3/action/package_search`  (rows / start, `count` = pages × rows)
+- `…/api/3/action/package_show`    (?id=)
+- `…/api/1/datasets/`              (data.gouv : page / page_size / next_page)
+- `/search?format=json`            (SearxNG : bouchon du backend de recherche
+  web, cf. search_provider, via settings.SEARXNG_URL = server.origin)
+
+Les charges utiles sont des réponses enregistrées : celles du paquet
+(RECORDED_*), ou un répertoire `package_search.json`, `package_show.json`,
+`datasets.json` (réponses brutes des portails). Les enregistrements sont
+dupliqués en identifiants uniques (`<requête>-<n>`) pour couvrir les pages.
+
+Comportement configurable (`MockConfig`) : latence (+ gigue), taux d'erreurs
+503, nombre de pages par requête. Pour y envoyer les connecteurs sans les
+modifier, settings.CONNECTOR_ORIGIN_OVERRIDES = {"*": server.origin}
+(cf. connectors.http) ; `redirect()` le fait pour une durée donnée.
+
+    with MockPortal(MockConfig(latency=0.05, error_rate=0.1)) as server, redirect(server.origin):
+        run_connectors(...)
+
+CLI : `python manage.py mock_portals --port 8765 --latency 0.05`.
+Benchmark : `python manage.py bench_connectors`.
+"""
+from __future__ import annotations
+
+import copy
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator, List, Optional
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from django.test import override_settings
+
+# ------------------------------------------------------------------ #
+# Réponses enregistrées (allégées)                                   #
+# ------------------------------------------------------------------ #
+RECORDED_PACKAGE = {
+    "id": "0a1b2c3d-0000-4000-8000-000000000001",
+    "name": "air-quality-monitoring-stations",
+    "title": "Air Quality Monitoring Stations",
+    "notes": "Hourly measurements of NO2, PM10 and PM2.5 from the national monitoring network.",
+    "organization": {"name": "environment-agency", "title": "Environment Agency"},
+    "license_title": "Open Government Licence v3.0",
+    "metadata_modified": "2024-03-18T09:12:44.120931",
+    "resources": [
+        {"format": "CSV", "url": "https://example.org/air/stations.csv"},
+        {"format": "JSON", "url": "https://example.org/air/stations.json"},
+    ],
+    "res_format": ["CSV", "JSON"],
+    "res_url": ["https://example.org/air/stations.csv", "https://example.org/air/stations.json"],
+}
+RECORDED_DATAGOUV = {
+    "id": "5c4ae55a634f4117716d5656",
+    "title": "Qualité de l'air : stations de mesure",
+    "slug": "qualite-de-lair-stations-de-mesure",
+    "page": "https://www.data.gouv.fr/fr/datasets/qualite-de-lair-stations-de-mesure/",
+    "organization": {"name": "Atmo France", "title": "Atmo France"},
+    "license": "fr-lo",
+    "last_modified": "2024-02-07T14:03:11.504000+00:00",
+    "resources": [{"format": "csv", "url": "https://static.data.gouv.fr/air.csv"}],
+}
+
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+_SITE_RE = re.compile(r"-?site:\S+|[()]|\bOR\b")
+_ROUTES = (
+    ("/package_search", "package_search"),
+    ("/package_show", "package_show"),
+    ("/datasets", "datasets"),
+    ("/search", "search"),
+)
+
+
+@dataclass
+class MockConfig:
+    latency: float = 0.0           # s par réponse
+    jitter: float = 0.0            # s, uniforme [0, jitter] en plus
+    error_rate: float = 0.0        # part de réponses 503
+    pages: int = 3                 # pages disponibles par requête
+    seed: Optional[int] = None
+    recordings: Optional[str] = None   # répertoire de réponses enregistrées
+
+
+def _load(directory: Optional[str], name: str) -> Optional[dict]:
+    path = Path(directory) / name if directory else None
+    return json.loads(path.read_text(encoding="utf-8")) if path and path.exists() else None
+
+
+class _Payloads:
+    """Modèles d'enregistrements (CKAN, data.gouv) tirés des réponses enregistrées."""
+
+    def __init__(self, directory: Optional[str]):
+        search = _load(directory, "package_search.json")
+        show = _load(directory, "package_show.json")
+        datasets = _load(directory, "datasets.json")
+        self.ckan: List[dict] = (
+            (search or {}).get("result", {}).get("results")
+            or ([show["result"]] if show else [RECORDED_PACKAGE])
+        )
+        self.datagouv: List[dict] = (datasets or {}).get("data") or [RECORDED_DATAGOUV]
+
+    @staticmethod
+    def _slug(query: str) -> str:
+        return _SLUG_RE.sub("-", query.lower()).strip("-")[:40] or "all"
+
+    def package(self, ident: str, n: int = 0) -> dict:
+        pkg = copy.deepcopy(self.ckan[n % len(self.ckan)])
+        pkg["id"] = pkg["name"] = ident
+        pkg["title"] = f"{pkg.get('title') or ident} #{n}"
+        return pkg
+
+    def packages(self, query: str, start: int, rows: int) -> List[dict]:
+        slug = self._slug(query)
+        return [self.package(f"{slug}-{n}", n) for n in range(start, start + rows)]
+
+    def web(self, query: str, n: int) -> List[dict]:
+        """Résultats web façon SearxNG ; `site:` respecté (premier domaine inclus)."""
+        sites = re.findall(r"(?<!-)site:([^\s)]+)", query)
+        host = sites[0] if sites else "open-data.example.org"
+        slug = self._slug(_SITE_RE.sub(" ", query))
+        return [
+            {"url": f"https://{host}/{slug}/{i}", "title": f"{slug} #{i}",
+             "content": f"Jeu de données {slug} ({i})", "engine": "mock"}
+            for i in range(n)
+        ]
+
+    def datasets(self, query: str, page: int, page_size: int) -> List[dict]:
+        slug, out = self._slug(query), []
+        for n in range((page - 1) * page_size, page * page_size):
+            ds = copy.deepcopy(self.datagouv[n % len(self.datagouv)])
+            ds["id"] = ds["slug"] = f"{slug}-{n}"
+            ds["title"] = f"{ds.get('title') or slug} #{n}"
+            ds["page"] = f"https://www.data.gouv.fr/fr/datasets/{slug}-{n}/"
+            out.append(ds)
+        return out
+
+
+# ------------------------------------------------------------------ #
+# Serveur                                                            #
+# ------------------------------------------------------------------ #
+class _Handler(BaseHTTPRequestHandler):
+    server: "_Server"
+    protocol_version = "HTTP/1.1"      # keep-alive, comme les vrais portails
+
+    def log_message(self, format, *args):  # silencieux
+        pass
+
+    def _json(self, status: int, body: dict) -> None:
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        portal = self.server.portal
+        url = urlparse(self.path)
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        path = url.path.rstrip("/")
+        route = next((name for suffix, name in _ROUTES if path.endswith(suffix)), None)
+        portal.count(route or "not_found")
+
+        portal.wait()
+        if route is None:
+            return self._json(404, {"success": False, "error": {"message": "Not found"}})
+        if portal.fails():
+            portal.count("errors")
+            return self._json(503, {"success": False, "error": {"message": "Service Unavailable"}})
+
+        cfg, payloads = portal.config, portal.payloads
+        if route == "package_search":
+            rows, start = int(params.get("rows", 10)), int(params.get("start", 0))
+            total = cfg.pages * rows
+            results = payloads.packages(params.get("q", ""), start, max(0, min(rows, total - start)))
+            return self._json(200, {"success": True, "result": {"count": total, "results": results}})
+        if route == "package_show":
+            return self._json(200, {"success": True, "result": payloads.package(params.get("id", "unknown"))})
+        if route == "search":
+            query = params.get("q", "")
+            return self._json(200, {"query": query, "results": payloads.web(query, 10)})
+
+        page, size = int(params.get("page", 1)), int(params.get("page_size", 20))
+        next_page = None
+        if page < cfg.pages:
+            next_page = f"{portal.origin}{url.path}?{urlencode({**params, 'page': page + 1})}"
+        return self._json(200, {
+            "data": payloads.datasets(params.get("q", ""), page, size),
+            "page": page, "page_size": size, "total": cfg.pages * size, "next_page": next_page,
+        })
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    portal: "MockPortal"
+
+
+class MockPortal:
+    """Serveur factice dans un thread ; `origin` = http://hôte:port."""
+
+    def __init__(self, config: Optional[MockConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or MockConfig()
+        self.payloads = _Payloads(self.config.recordings)
+        self.stats: Counter = Counter()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self._server = _Server((host, port), _Handler)
+        self._server.portal = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def origin(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    # ----------- comportement --------------------------------------------- #
+    def count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def wait(self) -> None:
+        with self._lock:
+            delay = self.config.latency + self._rng.uniform(0, self.config.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+    def fails(self) -> bool:
+        with self._lock:
+            return self._rng.random() < self.config.error_rate
+
+    # ----------- cycle de vie --------------------------------------------- #
+    def start(self) -> "MockPortal":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-portal", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._server.serve_forever()
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def __enter__(self) -> "MockPortal":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+@contextmanager
+def redirect(origin: str) -> Iterator[None]:
+    """Envoie toutes les requêtes des connecteurs vers `origin` (settings surchargés)."""
+    from ai_engine.connectors import http
+
+    http.close_all()
+    with override_settings(CONNECTOR_ORIGIN_OVERRIDES={"*": origin}):
+        try:
+            yield
+        finally:
+            http.close_all()
+
+
+__all__ = ["MockConfig", "MockPortal", "redirect"]
@@ -0,0 +1,213 @@
+# ai_engine/connectors/prefetch.py
+"""
+Préchargement spéculatif des connecteurs, pendant la génération des angles.
+
+`run_connectors` ne démarre qu'après `angles.run` puis `keywords.run` (deux
+appels LLM). Or l'extraction fournit déjà lieux, organisations et unités
+chiffrées, qui annoncent souvent les mots-clés. Dès la fin de l'extraction :
+
+    prefetch = Prefetch.start(connectors, speculative_terms(extraction))
+    ...angles, mots-clés...
+    run_connectors(..., prefetch=prefetch)
+    prefetch.finish()          # rapport hit / waste + annulation du reliquat
+
+Chaque spéculation est un `search_one` (connecteur, terme) soumis à un petit
+pool de threads : il réchauffe le cache persistant des connecteurs et son
+Future est repris par le fan-out quand un mot-clé correspond (même terme
+assaini, mêmes paramètres), qu'il soit terminé ou encore en vol.
+
+Politesse : les mêmes plafonds que le fan-out s'appliquent. Au plus
+CONNECTORS_MAX_PER_HOST spéculations par hôte (les suivantes attendent leur
+tour) et CONNECTORS_MAX_CONCURRENCY au total. Au démarrage du fan-out,
+`handoff()` arrête les lancements (spéculations en file annulées) et rend
+celles en vol, dont le fan-out réserve les places jusqu'à leur fin.
+
+Statistiques : metrics "connector_prefetch" (speculated / hits / waste par
+connecteur) et `report()` (totaux + hit_ratio), journalisées par le pipeline.
+Réglages : settings.CONNECTOR_PREFETCH_ENABLED, CONNECTOR_PREFETCH_MAX_TERMS,
+CONNECTOR_PREFETCH_WORKERS.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+
+from ai_engine import metrics
+from ai_engine.connectors.fanout import connector_host, search_one
+from ai_engine.connectors.helpers import sanitize_keyword
+
+logger = logging.getLogger("datascope.connectors")
+
+METRICS_GROUP = "connector_prefetch"
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def enabled() -> bool:
+    return bool(getattr(settings, "CONNECTOR_PREFETCH_ENABLED", True))
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = min(
+                int(getattr(settings, "CONNECTOR_PREFETCH_WORKERS", 4) or 4),
+                int(getattr(settings, "CONNECTORS_MAX_CONCURRENCY", 8) or 8),
+            )
+            _pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="connector-prefetch")
+        return _pool
+
+
+def speculative_terms(extraction: Any, limit: Optional[int] = None) -> List[str]:
+    """
+    Termes probables des futurs mots-clés : lieux et organisations (les plus
+    cités d'abord), puis unités chiffrées explicites (« habitants », « tonnes »).
+    """
+    if limit is None:
+        limit = int(getattr(settings, "CONNECTOR_PREFETCH_MAX_TERMS", 4) or 0)
+    counts: Counter = Counter()
+    labels: Dict[str, str] = {}
+    for value in [*(extraction.locations or []), *(extraction.organizations or [])]:
+        key = sanitize_keyword(value)
+        if len(key) > 2:
+            counts[key] += 1
+            labels.setdefault(key, value.strip())
+    units = [
+        n.unit.strip() for n in (extraction.numbers or [])
+        if n.unit and n.unit.strip().isalpha() and len(n.unit.strip()) > 3
+    ]
+    for unit in units:
+        labels.setdefault(sanitize_keyword(unit), unit)
+    ordered = [k for k, _ in counts.most_common()] + [sanitize_keyword(u) for u in units]
+    return [labels[k] for k in dict.fromkeys(ordered)][:limit]
+
+
+class Prefetch:
+    """Recherches spéculatives en vol, indexées par (connecteur, terme assaini)."""
+
+    def __init__(self, max_per_keyword: int = 2, limit: int = 5):
+        self.max_per_keyword = max_per_keyword
+        self.limit = limit
+        self.max_per_host = max(1, int(getattr(settings, "CONNECTORS_MAX_PER_HOST", 2) or 2))
+        self._futures: Dict[Tuple[str, str], Future] = {}
+        self._hosts: Dict[Tuple[str, str], str] = {}
+        self._queued: Dict[str, Deque[Tuple[Tuple[str, str], Any, str]]] = {}
+        self._running: Counter = Counter()
+        self._launched: set = set()
+        self._hits: set = set()
+        self._lock = threading.Lock()
+        self._handed_off = False
+        self._finished = False
+
+    @classmethod
+    def start(cls, connectors: Sequence[Any], terms: Iterable[str], *,
+              max_per_keyword: int = 2, limit: int = 5) -> "Prefetch":
+        self = cls(max_per_keyword, limit)
+        terms = list(terms)
+        for term in terms:
+            for connector in connectors:
+                key = (type(connector).__name__, sanitize_keyword(term))
+                if key in self._futures:
+                    continue
+                host = connector_host(connector)
+                self._futures[key] = Future()
+                self._hosts[key] = host
+                self._queued.setdefault(host, deque()).append((key, connector, term))
+        for host in list(self._queued):
+            self._pump(host)
+        logger.info("[prefetch] %d recherches spéculatives (%s)", len(self._futures), ", ".join(terms))
+        return self
+
+    def _pump(self, host: str) -> None:
+        """Lance les spéculations en file de `host` dans la limite du plafond par hôte."""
+        launch = []
+        with self._lock:
+            queue = self._queued.get(host)
+            while queue and not self._handed_off and self._running[host] < self.max_per_host:
+                item = queue.popleft()
+                self._running[host] += 1
+                self._launched.add(item[0])
+                launch.append(item)
+        for key, connector, term in launch:
+            metrics.incr(METRICS_GROUP, key[0], "speculated")
+            _executor().submit(self._run, host, key, connector, term)
+
+    def _run(self, host: str, key: Tuple[str, str], connector: Any, term: str) -> None:
+        future = self._futures[key]
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(search_one(connector, term, self.max_per_keyword, self.limit))
+                except Exception as exc:
+                    future.set_exception(exc)
+        finally:
+            with self._lock:
+                self._running[host] -= 1
+            self._pump(host)
+
+    def handoff(self) -> List[Tuple[str, Future]]:
+        """
+        Passage de relais au fan-out : plus aucun lancement, spéculations en
+        file annulées ; renvoie [(hôte, Future)] de celles encore en vol.
+        """
+        with self._lock:
+            self._handed_off = True
+            queued = [key for queue in self._queued.values() for key, _, _ in queue]
+            self._queued.clear()
+            running = [
+                (self._hosts[key], self._futures[key])
+                for key in self._launched if not self._futures[key].done()
+            ]
+        for key in queued:
+            self._futures[key].cancel()
+        return running
+
+    def take(self, connector: Any, keyword: str, max_per_keyword: int, limit: int) -> Optional[Future]:
+        """Future spéculatif pour ce job, si les paramètres correspondent."""
+        if (max_per_keyword, limit) != (self.max_per_keyword, self.limit):
+            return None
+        key = (type(connector).__name__, sanitize_keyword(keyword))
+        with self._lock:
+            future = self._futures.get(key)
+            if future is None or key not in self._launched or future.cancelled():
+                return None
+            if key not in self._hits:
+                self._hits.add(key)
+                metrics.incr(METRICS_GROUP, key[0], "hits")
+        return future
+
+    def report(self) -> dict:
+        with self._lock:
+            speculated, hits = len(self._launched), len(self._hits)
+        return {
+            "speculated": speculated,
+            "hits": hits,
+            "waste": speculated - hits,
+            "hit_ratio": round(hits / speculated, 3) if speculated else 0.0,
+        }
+
+    def finish(self) -> dict:
+        """Annule les spéculations pas encore lancées, compte le gaspillage, renvoie le rapport."""
+        self.handoff()
+        with self._lock:
+            if self._finished:
+                return self.report()
+            self._finished = True
+            unused = [k for k in self._launched if k not in self._hits]
+        for name, _ in unused:
+            metrics.incr(METRICS_GROUP, name, "waste")
+        report = self.report()
+        logger.info("[prefetch] %s", report)
+        return report
+
+
+def prefetch_stats() -> dict:
+    """{connecteur: {speculated, hits, waste}} (cumul du processus)."""
+    return metrics.snapshot(METRICS_GROUP)
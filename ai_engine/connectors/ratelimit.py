@@ -0,0 +1,97 @@
+# ai_engine/connectors/ratelimit.py
+"""
+Limiteur de débit par hôte (token bucket), utilisable en sync et en async.
+
+Remplace les `time.sleep` fixes entre pages : un appel ne patiente que si
+le budget de l'hôte est réellement épuisé. Chaque hôte dispose d'un seau
+de `burst` jetons, rechargé à `rate` jetons/s :
+
+    settings.CONNECTOR_RATE_LIMITS = {
+        "default": {"rate": 5, "burst": 5},
+        "catalog.data.gov": {"rate": 2, "burst": 4},
+    }
+
+`rate` ≤ 0 désactive la limite pour l'hôte. Les jetons sont *réservés*
+(le solde peut devenir négatif) : les appelants concurrents sont servis
+dans l'ordre d'arrivée, sans se réveiller tous en même temps.
+
+Compteurs : metrics "rate_limit" → acquired / delayed / waited_ms par hôte.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from typing import Dict
+
+from django.conf import settings
+
+from ai_engine import metrics
+
+METRICS_GROUP = "rate_limit"
+DEFAULT_LIMIT = {"rate": 5.0, "burst": 5.0}
+
+
+class TokenBucket:
+    def __init__(self, name: str, rate: float, burst: float):
+        self.name = name
+        self.rate = float(rate)
+        self.burst = max(float(burst), 1.0)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Prend un jeton ; renvoie l'attente (s) nécessaire avant de l'utiliser."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        metrics.incr(METRICS_GROUP, self.name, "acquired")
+        if wait > 0:
+            metrics.incr(METRICS_GROUP, self.name, "delayed")
+            metrics.incr(METRICS_GROUP, self.name, "waited_ms", int(wait * 1000))
+        return wait
+
+    def acquire(self) -> float:
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+
+_buckets: Dict[str, TokenBucket] = {}
+_lock = threading.Lock()
+
+
+def limit_for(host: str) -> dict:
+    conf = getattr(settings, "CONNECTOR_RATE_LIMITS", {}) or {}
+    out = dict(DEFAULT_LIMIT)
+    out.update(conf.get("default", {}) or {})
+    out.update(conf.get(host, {}) or {})
+    return out
+
+
+def limiter(host: str) -> TokenBucket:
+    """Seau partagé (processus) pour `host`."""
+    with _lock:
+        bucket = _buckets.get(host)
+        if bucket is None:
+            conf = limit_for(host)
+            bucket = _buckets[host] = TokenBucket(host, conf["rate"], conf["burst"])
+        return bucket
+
+
+def reset_limiters() -> None:
+    with _lock:
+        _buckets.clear()
@@ -0,0 +1,53 @@
+# ai_engine/connectors/records.py
+"""
+Enregistrements bruts des connecteurs : dataclasses à `__slots__`.
+
+La sortie des connecteurs est « de confiance » (champs déjà extraits et
+normalisés par notre code) : pas de validation pydantic par résultat brut.
+Une seule validation a lieu, à la frontière, quand on construit la
+`DatasetSuggestion` (`to_suggestion`). Les slots évitent un `__dict__` par
+instance : moins d'allocations sur des pages de centaines de résultats.
+
+Chaque connecteur garde son type nommé (USDataset, FRDataset…) en
+sous-classant `RawDataset` sans champ supplémentaire.
+
+Mesure : `python manage.py bench_records` (pydantic validé vs slots).
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+from ai_engine.connectors.richness import richness_score
+from ai_engine.schemas import DatasetSuggestion
+
+
+@dataclass(slots=True, kw_only=True)
+class RawDataset:
+    id: str
+    title: str
+    url: str
+    description: Optional[str] = None
+    organization: Optional[str] = None
+    formats: List[str] = field(default_factory=list)
+    license: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+def to_suggestion(ds: RawDataset, source_name: str) -> DatasetSuggestion:
+    """RawDataset → DatasetSuggestion validée (unique validation du parcours)."""
+    sugg = DatasetSuggestion(
+        title=ds.title,
+        description=ds.description,
+        source_name=source_name,
+        source_url=ds.url,
+        formats=ds.formats,
+        organization=ds.organization,
+        license=ds.license,
+        last_modified=ds.last_modified,
+    )
+    sugg.richness = richness_score(sugg)
+    return sugg
+
+
+__all__ = ["RawDataset", "to_suggestion"]
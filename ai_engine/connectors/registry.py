@@ -0,0 +1,113 @@
+# ai_engine/connectors/registry.py
+"""
+Registre des connecteurs : imports paresseux + plugins par entry points.
+
+- Connecteurs intégrés : BUILTIN = {nom: "module:Classe"} ; le module n'est
+  importé (avec requests, tenacity, modèles pydantic…) que si le connecteur
+  est actif.
+- Plugins : tout paquet installé peut déclarer un connecteur dans le groupe
+  d'entry points `datascope.connectors` :
+
+      [project.entry-points."datascope.connectors"]
+      eurostat_plus = "mon_paquet.connecteur:EurostatPlusClient"
+
+- Connecteurs actifs, dans l'ordre : settings.CONNECTORS_ACTIVE (noms).
+- Conversion → DatasetSuggestion : la méthode (`to_suggestion`, sinon l'un
+  des alias historiques `*_to_suggestion`) est résolue une fois par classe
+  puis mise en cache (`converter`).
+"""
+from __future__ import annotations
+
+import importlib
+import logging
+from functools import lru_cache
+from importlib.metadata import EntryPoint, entry_points
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from django.conf import settings
+
+logger = logging.getLogger("datascope.connectors")
+
+ENTRY_POINT_GROUP = "datascope.connectors"
+
+Target = Union[str, EntryPoint, Callable[[], Any]]
+
+BUILTIN: Dict[str, Target] = {
+    "data_gouv": "ai_engine.connectors.data_gouv:DataGouvClient",
+    "data_gov": "ai_engine.connectors.data_gov:DataGovClient",
+    "data_canada": "ai_engine.connectors.data_canada:CanadaGovClient",
+    "data_uk": "ai_engine.connectors.data_uk:UKGovClient",
+    "hdx": "ai_engine.connectors.hdx_data:HdxClient",
+    "hdx_climate": "ai_engine.connectors.hdx_climate:HDXClimateClient",
+    "world_bank": "ai_engine.connectors.world_bank:WorldBankClient",
+    "eurostat": "ai_engine.connectors.eurostat:EurostatClient",
+}
+DEFAULT_ACTIVE = ("data_gouv", "data_gov", "data_canada", "data_uk", "hdx")
+
+# Ordre de recherche de la méthode de conversion (alias historiques inclus)
+CONVERTER_NAMES = (
+    "to_suggestion",
+    "us_to_suggestion",
+    "fr_to_suggestion",
+    "ca_to_suggestion",
+    "uk_to_suggestion",
+    "hdx_to_suggestion",
+)
+
+
+# ------------------------------------------------------------------ #
+# Découverte / chargement                                            #
+# ------------------------------------------------------------------ #
+@lru_cache(maxsize=1)
+def plugins() -> Dict[str, EntryPoint]:
+    """Entry points `datascope.connectors` installés (lus une seule fois)."""
+    return {ep.name: ep for ep in entry_points(group=ENTRY_POINT_GROUP)}
+
+
+def available() -> List[str]:
+    return list(dict.fromkeys([*BUILTIN, *plugins()]))
+
+
+def active_names() -> List[str]:
+    return list(getattr(settings, "CONNECTORS_ACTIVE", None) or DEFAULT_ACTIVE)
+
+
+def factory(name: str) -> Callable[[], Any]:
+    """Classe (ou fabrique) du connecteur `name` ; importe son module si besoin."""
+    target: Optional[Target] = BUILTIN.get(name)
+    if target is None:
+        target = plugins().get(name)
+    if target is None:
+        raise KeyError(f"unknown connector {name!r} (available: {', '.join(available())})")
+    if isinstance(target, EntryPoint):
+        return target.load()
+    if isinstance(target, str):
+        module, _, attr = target.partition(":")
+        return getattr(importlib.import_module(module), attr)
+    return target
+
+
+def enabled_connectors() -> List[Any]:
+    """Instances des connecteurs actifs ; un connecteur qui ne se charge pas est ignoré."""
+    out = []
+    for name in active_names():
+        try:
+            out.append(factory(name)())
+        except Exception as exc:
+            logger.warning("[registry] connector %s unavailable: %r", name, exc)
+    return out
+
+
+# ------------------------------------------------------------------ #
+# Conversion                                                         #
+# ------------------------------------------------------------------ #
+@lru_cache(maxsize=None)
+def converter(cls: type) -> Optional[str]:
+    """Nom de la méthode de conversion de `cls` (résolu une fois par classe)."""
+    return next((n for n in CONVERTER_NAMES if callable(getattr(cls, n, None))), None)
+
+
+def reset() -> None:
+    """Oublie les plugins découverts et les conversions résolues (tests)."""
+    plugins.cache_clear()
+    converter.cache_clear()
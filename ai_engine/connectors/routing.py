@@ -0,0 +1,167 @@
+# ai_engine/connectors/routing.py
+"""
+Routage des connecteurs selon la géographie et la langue de l'article.
+
+Chaque angle interrogeait les cinq portails nationaux (FR, US, CA, UK, HDX),
+que l'article parle d'Alençon ou de Houston. `route()` décide, à partir de
+`ExtractionResult.language` et `.locations` :
+
+- primary   : tous les mots-clés de l'angle, en tête de l'ordre de consommation ;
+- secondary : seulement les CONNECTOR_ROUTING_SECONDARY_KEYWORDS premiers
+              mots-clés (appels réduits) ;
+- skip      : aucun appel.
+
+Les lieux sont résolus en pays via un petit gazetteer local (pays, régions,
+grandes villes ; noms fr/en, sans accents), extensible par
+settings.CONNECTOR_GAZETTEER = {"alias": "CODE"}. Sans lieu reconnu, la
+langue de l'article sert de repli. Un connecteur dont le portail n'est pas
+connu (catalogue local, connecteur ajouté) reste toujours primary.
+"""
+from __future__ import annotations
+
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from django.conf import settings
+
+from ai_engine.connectors.fanout import connector_host
+
+PRIMARY, SECONDARY, SKIP = "primary", "secondary", "skip"
+INTERNATIONAL = "*"          # HDX : pays sans portail national branché
+
+# Portail → pays couvert, langues de publication
+PORTALS: Dict[str, dict] = {
+    "www.data.gouv.fr": {"country": "FR", "languages": {"fr"}},
+    "catalog.data.gov": {"country": "US", "languages": {"en"}},
+    "open.canada.ca": {"country": "CA", "languages": {"en", "fr"}},
+    "data.gov.uk": {"country": "GB", "languages": {"en"}},
+    "data.humdata.org": {"country": INTERNATIONAL, "languages": {"en", "fr"}},
+}
+
+# ------------------------------------------------------------------ #
+# Gazetteer (alias normalisés → code pays)                           #
+# ------------------------------------------------------------------ #
+_GAZETTEER_SOURCE: Dict[str, Sequence[str]] = {
+    "FR": (
+        "france", "francais", "francaise", "hexagone", "metropole", "outre-mer", "dom-tom",
+        "ile-de-france", "paris", "normandie", "bretagne", "hauts-de-france", "grand est",
+        "bourgogne-franche-comte", "centre-val de loire", "pays de la loire", "nouvelle-aquitaine",
+        "occitanie", "auvergne-rhone-alpes", "provence-alpes-cote d'azur", "paca", "corse",
+        "guadeloupe", "martinique", "guyane", "la reunion", "mayotte",
+        "lyon", "marseille", "toulouse", "lille", "bordeaux", "nantes", "strasbourg",
+        "montpellier", "rennes", "nice", "alencon", "orne", "calvados", "caen", "rouen",
+    ),
+    "US": (
+        "united states", "etats-unis", "usa", "u.s.", "amerique", "america",
+        "california", "californie", "texas", "new york", "florida", "floride", "illinois",
+        "washington", "louisiana", "louisiane", "ohio", "michigan", "georgia", "arizona",
+        "houston", "los angeles", "chicago", "san francisco", "miami", "seattle", "boston",
+        "new orleans", "la nouvelle-orleans", "detroit", "atlanta", "phoenix", "dallas",
+    ),
+    "CA": (
+        "canada", "canadien", "canadienne", "canadian", "quebec", "ontario",
+        "british columbia", "colombie-britannique", "alberta", "manitoba", "saskatchewan",
+        "nova scotia", "nouvelle-ecosse", "new brunswick", "nouveau-brunswick", "nunavut",
+        "montreal", "toronto", "vancouver", "ottawa", "calgary",
+    ),
+    "GB": (
+        "united kingdom", "royaume-uni", "uk", "great britain", "grande-bretagne", "britain",
+        "british", "britannique", "england", "angleterre", "scotland", "ecosse", "wales",
+        "pays de galles", "northern ireland", "irlande du nord",
+        "london", "londres", "manchester", "birmingham", "liverpool", "leeds", "glasgow",
+        "edinburgh", "edimbourg", "cardiff", "belfast",
+    ),
+    INTERNATIONAL: (
+        "ukraine", "syrie", "syria", "soudan", "sudan", "yemen", "afghanistan", "haiti",
+        "gaza", "palestine", "liban", "lebanon", "somalie", "somalia", "sahel", "mali",
+        "niger", "burkina faso", "tchad", "chad", "rdc", "congo", "ethiopie", "ethiopia",
+        "nigeria", "bangladesh", "myanmar", "birmanie", "venezuela", "libye", "libya",
+        "irak", "iraq", "afrique", "africa", "moyen-orient", "middle east",
+    ),
+}
+
+
+def _norm(text: str) -> str:
+    # toute ponctuation sépare : « Houston, TX », « Paris. », « U.S. »
+    ascii_ = unicodedata.normalize("NFKD", text or "").encode("ascii", "ignore").decode().lower()
+    return re.sub(r"[^a-z0-9]+", " ", ascii_).strip()
+
+
+def gazetteer() -> Dict[str, str]:
+    """{alias normalisé: code pays}, complété par settings.CONNECTOR_GAZETTEER."""
+    out = {_norm(alias): code for code, aliases in _GAZETTEER_SOURCE.items() for alias in aliases}
+    extra = getattr(settings, "CONNECTOR_GAZETTEER", {}) or {}
+    out.update({_norm(alias): code for alias, code in extra.items()})
+    return out
+
+
+def resolve_countries(locations: Iterable[str]) -> List[str]:
+    """Codes pays mentionnés, du plus cité au moins cité (ordre d'apparition à égalité)."""
+    gaz = gazetteer()
+    aliases = sorted(gaz, key=len, reverse=True)      # « new york » avant « york »
+    covered = {p["country"] for p in PORTALS.values()}
+    counts: Counter = Counter()
+    for loc in locations or []:
+        text = f" {_norm(loc)} "
+        for alias in aliases:
+            if f" {alias} " in text:
+                code = gaz[alias]
+                counts[code if code in covered else INTERNATIONAL] += 1
+                break
+    return [code for code, _ in counts.most_common()]
+
+
+# ------------------------------------------------------------------ #
+# Routage                                                            #
+# ------------------------------------------------------------------ #
+@dataclass(frozen=True)
+class Route:
+    connector: Any
+    level: str
+
+    @property
+    def max_keywords(self) -> Optional[int]:
+        """Mots-clés par angle (None = tous, 0 = aucun appel)."""
+        if self.level == PRIMARY:
+            return None
+        if self.level == SECONDARY:
+            return int(getattr(settings, "CONNECTOR_ROUTING_SECONDARY_KEYWORDS", 1) or 0)
+        return 0
+
+
+def _level(portal: Optional[dict], countries: List[str], language: str) -> str:
+    if portal is None:
+        return PRIMARY
+    country, languages = portal["country"], portal["languages"]
+    if countries:
+        # lieux reconnus : seuls les portails des pays cités (HDX pour les pays
+        # sans portail branché)
+        return PRIMARY if country in countries else SKIP
+    # aucun lieu reconnu : la langue de l'article guide ; portails
+    # bilingues ou internationaux en appoint seulement
+    if language in languages:
+        return PRIMARY if len(languages) == 1 and country != INTERNATIONAL else SECONDARY
+    return SKIP
+
+
+def route(connectors: Sequence[Any], *, language: str = "", locations: Iterable[str] = ()) -> List[Route]:
+    """
+    Routes des `connectors`, sans les `skip`, triées : primary d'abord (pays
+    dans l'ordre des mentions), puis secondary ; ordre d'origine à égalité.
+    """
+    countries = resolve_countries(locations)
+    language = (language or "").lower()[:2]
+    rank = {code: i for i, code in enumerate(countries)}
+
+    routes = []
+    for pos, connector in enumerate(connectors):
+        portal = PORTALS.get(connector_host(connector))
+        level = _level(portal, countries, language)
+        if level == SKIP:
+            continue
+        country_rank = rank.get(portal["country"], len(rank)) if portal else -1
+        routes.append(((level != PRIMARY, country_rank, pos), Route(connector, level)))
+    return [r for _, r in sorted(routes, key=lambda item: item[0])]
@@ -0,0 +1,228 @@
+# ai_engine/connectors/streaming.py
+"""
+Lecture incrémentale des réponses JSON de recherche des portails.
+
+Une page `package_search` (ressources complètes, notes longues…) peut peser
+plusieurs Mo alors que le connecteur s'arrête après 2 résultats exploitables.
+Plutôt que `r.json()` sur tout le corps, on lit la réponse par blocs
+(`stream=True`) et on produit les éléments du tableau visé un par un :
+
+    meta = {}
+    for pkg in stream_items(response, ("result", "results"), meta):
+        ...                      # on peut s'arrêter quand on veut
+    meta.get("count")            # scalaires voisins lus en chemin
+
+Dès que l'appelant s'arrête, la lecture cesse et la connexion est fermée :
+mémoire bornée à un élément (+ un bloc), premier résultat disponible avant
+la fin du transfert. Les valeurs sont décodées par le décodeur C de `json`
+(`raw_decode`) ; seul le squelette (clés, virgules) est parcouru à la main.
+
+Une lecture qui échoue en cours de corps (coupure, JSON invalide) n'est pas
+couverte par les retries de l'ouverture : `stream_page` relit alors la page
+entière (requête classique, retries budgétés) et reprend après les éléments
+déjà produits.
+
+Statistiques : metrics "json_streaming" par hôte (streamed, stopped_early,
+bytes_read, read_errors). Désactivable : settings.CONNECTOR_STREAMING_JSON = False.
+"""
+from __future__ import annotations
+
+import codecs
+import json
+import logging
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, Optional, Sequence, Union
+from urllib.parse import urlparse
+
+import requests
+from django.conf import settings
+
+from ai_engine import metrics
+
+logger = logging.getLogger("datascope.connectors")
+
+METRICS_GROUP = "json_streaming"
+CHUNK_SIZE = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+def enabled() -> bool:
+    return bool(getattr(settings, "CONNECTOR_STREAMING_JSON", True))
+
+
+class _Reader:
+    """Tampon texte alimenté à la demande par les blocs de la réponse."""
+
+    def __init__(self, chunks: Iterable[Union[bytes, str]]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.bytes_read = 0
+
+    def _more(self, at_least: int = 1) -> bool:
+        """Ajoute au moins `at_least` caractères au tampon ; False en fin de flux."""
+        added = 0
+        for chunk in self._chunks:
+            if isinstance(chunk, bytes):
+                self.bytes_read += len(chunk)
+                chunk = self._utf8.decode(chunk)
+            self.buf += chunk
+            added += len(chunk)
+            if added >= at_least:
+                return True
+        return added > 0
+
+    def drain(self) -> None:
+        """Consomme les blocs restants (blancs après le document)."""
+        while self._more():
+            self.buf, self.pos = "", 0
+
+    def _compact(self) -> None:
+        self.buf, self.pos = self.buf[self.pos:], 0
+
+    def _peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._more():
+                return ""
+
+    def _expect(self, char: str) -> None:
+        found = self._peek()
+        if found != char:
+            raise ValueError(f"JSON: {char!r} attendu, {found!r} trouvé (position {self.pos})")
+        self.pos += 1
+
+    def _value(self) -> Any:
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # valeur incomplète : on double au moins la partie en attente
+                if not self._more(max(len(self.buf) - self.pos, 1)):
+                    raise
+                continue
+            # un nombre en fin de tampon peut être tronqué ("12" de "125")
+            if end == len(self.buf) and isinstance(value, (int, float)) and self._more():
+                continue
+            self.pos = end
+            return value
+
+    def _items(self) -> Iterator[Any]:
+        self._expect("[")
+        if self._peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            item = self._value()
+            self._compact()
+            yield item
+            sep = self._peek()
+            self.pos += 1
+            if sep == "]":
+                return
+            if sep != ",":
+                raise ValueError(f"JSON: ',' ou ']' attendu, {sep!r} trouvé")
+
+    def find(self, path: Sequence[str], meta: Optional[dict]) -> Iterator[Any]:
+        """Éléments du tableau au bout de `path` ; scalaires voisins → `meta`."""
+        self._expect("{")
+        if self._peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            head = self._peek()
+            if key == path[0] and len(path) == 1 and head == "[":
+                yield from self._items()
+            elif key == path[0] and len(path) > 1 and head == "{":
+                yield from self.find(path[1:], meta)
+            else:
+                value = self._value()
+                if meta is not None and len(path) == 1 and not isinstance(value, (dict, list)):
+                    meta[key] = value
+            self._compact()
+            sep = self._peek()
+            self.pos += 1
+            if sep == "}":
+                return
+            if sep != ",":
+                raise ValueError(f"JSON: ',' ou '}}' attendu, {sep!r} trouvé")
+
+
+def iter_array(chunks: Iterable[Union[bytes, str]], path: Sequence[str],
+               meta: Optional[dict] = None) -> Iterator[Any]:
+    """
+    Éléments du tableau `path` (clés d'objets imbriqués) d'un document JSON
+    fourni par blocs ; les scalaires de l'objet parent sont copiés dans `meta`
+    (ceux situés après le tableau seulement si on va jusqu'au bout).
+    """
+    return _Reader(chunks).find(tuple(path), meta)
+
+
+def stream_items(response: requests.Response, path: Sequence[str], meta: Optional[dict] = None,
+                 chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """`iter_array` sur le corps de `response` (stream=True) ; ferme la réponse à l'arrêt."""
+    host = urlparse(response.url or "").netloc
+    reader = _Reader(response.iter_content(chunk_size))
+    finished = False
+    try:
+        yield from reader.find(tuple(path), meta)
+        finished = True
+        reader.drain()                    # fin du corps : cf. http._tee_body
+    finally:
+        response.close()
+        metrics.incr(METRICS_GROUP, host, "streamed")
+        metrics.incr(METRICS_GROUP, host, "bytes_read", reader.bytes_read)
+        if not finished:
+            metrics.incr(METRICS_GROUP, host, "stopped_early")
+
+
+def stream_page(open_response: Callable[[], requests.Response], path: Sequence[str], meta: dict,
+                reread: Callable[[], dict]) -> Iterator[Any]:
+    """
+    `stream_items` sur `open_response()`. Si la lecture du corps échoue, la
+    page est relue via `reread()` (objet parent du tableau `path[-1]`,
+    décodé en entier) et reprise après les éléments déjà produits.
+    """
+    response = open_response()
+    host = urlparse(response.url or "").netloc
+    produced = 0
+    items = stream_items(response, path, meta)
+    try:
+        for item in items:
+            produced += 1
+            yield item
+        return
+    except (requests.RequestException, ValueError) as exc:
+        metrics.incr(METRICS_GROUP, host, "read_errors")
+        logger.warning("[streaming] %s: lecture interrompue après %d éléments (%r), page relue",
+                       host, produced, exc)
+    finally:
+        items.close()
+
+    try:
+        parent = reread()
+    except Exception:
+        if not produced:
+            raise
+        # éléments déjà remis à l'appelant : on s'arrête là plutôt que de les perdre
+        logger.warning("[streaming] %s: relecture échouée, page tronquée à %d éléments", host, produced)
+        return
+    meta.update((k, v) for k, v in parent.items() if not isinstance(v, (dict, list)))
+    yield from islice(parent.get(path[-1]) or [], produced, None)
+
+
+def streaming_stats() -> dict:
+    """{hôte: {streamed, stopped_early, bytes_read, read_errors}}"""
+    return metrics.snapshot(METRICS_GROUP)
+
+
+__all__ = ["iter_array", "stream_items", "stream_page", "streaming_stats"]
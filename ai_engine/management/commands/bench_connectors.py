@@ -0,0 +1,105 @@
+"""
+Benchmark de `run_connectors` contre le portail factice local.
+
+Pour chaque niveau de concurrence (CONNECTORS_MAX_CONCURRENCY et
+CONNECTORS_MAX_PER_HOST), `--runs` exécutions complètes de run_connectors
+(cache disque coupé, limiteurs de débit levés sauf --keep-rate-limits) :
+débit (requêtes HTTP/s, recherches/s) et percentiles de latence par run.
+
+    python manage.py bench_connectors                          # 1,2,4,8 × 5 runs
+    python manage.py bench_connectors --concurrency 2,8 --latency 0.1 --error-rate 0.05
+    python manage.py bench_connectors --origin http://127.0.0.1:8765   # serveur déjà lancé
+"""
+
+import contextlib
+import io
+import time
+from typing import List
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from ai_engine.connectors import health, http, ratelimit, registry
+from ai_engine.connectors.mock_portal import MockPortal, redirect
+from ai_engine.management.commands.mock_portals import add_mock_arguments, mock_config
+from ai_engine.retries import reset_budgets
+from ai_engine.schemas import KeywordSet, KeywordsResult
+
+KEYWORDS = ["air quality", "unemployment", "housing prices", "rainfall", "hospital beds",
+            "school enrolment", "road accidents", "energy consumption"]
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def _reset_state() -> None:
+    ratelimit.reset_limiters()
+    health.reset_breakers()
+    reset_budgets()
+    http.close_all()
+
+
+class Command(BaseCommand):
+    help = "Débit et latence de run_connectors contre le portail factice, par niveau de concurrence."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--concurrency", default="1,2,4,8", help="Niveaux testés (liste).")
+        parser.add_argument("--runs", type=int, default=5, help="Exécutions par niveau.")
+        parser.add_argument("--angles", type=int, default=3)
+        parser.add_argument("--keywords", type=int, default=4, help="Mots-clés par angle.")
+        parser.add_argument("--connectors", default=None, help="Noms du registre (défaut : CONNECTORS_ACTIVE).")
+        parser.add_argument("--origin", default=None, help="Portail déjà lancé (sinon serveur intégré).")
+        parser.add_argument("--keep-rate-limits", action="store_true")
+        add_mock_arguments(parser)
+
+    def handle(self, *args, **opts):
+        # import tardif : run_connectors charge la chaîne LLM
+        from ai_engine.pipeline import run_connectors
+
+        levels = [int(c) for c in opts["concurrency"].split(",") if c.strip()]
+        names = opts["connectors"].split(",") if opts["connectors"] else registry.active_names()
+        kws = [
+            KeywordsResult(language="en", sets=[KeywordSet(
+                angle_title=f"Angle {a}",
+                keywords=[KEYWORDS[(a + k) % len(KEYWORDS)] for k in range(opts["keywords"])],
+            )])
+            for a in range(opts["angles"])
+        ]
+        searches = opts["angles"] * opts["keywords"] * len(names)
+
+        portal = None if opts["origin"] else MockPortal(mock_config(opts)).start()
+        origin = opts["origin"] or portal.origin
+        base = {"CONNECTORS_ACTIVE": names, "CONNECTOR_CACHE_ENABLED": False}
+        if not opts["keep_rate_limits"]:
+            base["CONNECTOR_RATE_LIMITS"] = {"default": {"rate": 0, "burst": 1}}
+
+        self.stdout.write(f"{searches} recherches / run ({', '.join(names)}) → {origin}")
+        self.stdout.write(f"{'concurrence':>11}{'req/s':>10}{'rech/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        try:
+            with redirect(origin):
+                for level in levels:
+                    conf = {**base, "CONNECTORS_MAX_CONCURRENCY": level, "CONNECTORS_MAX_PER_HOST": level,
+                            "HTTP_POOL_MAXSIZE": {"default": level}}
+                    with override_settings(**conf):
+                        _reset_state()
+                        served = sum(portal.stats.values()) if portal else 0
+                        latencies = []
+                        for _ in range(max(1, opts["runs"])):
+                            t0 = time.perf_counter()
+                            with contextlib.redirect_stdout(io.StringIO()):   # traces print() du pipeline
+                                run_connectors(kws, max_total_per_angle=10_000)
+                            latencies.append(time.perf_counter() - t0)
+                    total = sum(latencies)
+                    requests_ = (sum(portal.stats.values()) - served) if portal else 0
+                    ms = [x * 1000 for x in latencies]
+                    self.stdout.write(
+                        f"{level:>11}{requests_ / total:>10.1f}{searches * len(latencies) / total:>10.1f}"
+                        f"{percentile(ms, 50):>10.0f}{percentile(ms, 95):>10.0f}{percentile(ms, 99):>10.0f}"
+                    )
+        finally:
+            _reset_state()
+            if portal:
+                portal.stop()
+                self.stdout.write(f"Requêtes servies : {dict(portal.stats)}")
@@ -0,0 +1,96 @@
+"""
+Micro-benchmark des enregistrements bruts des connecteurs.
+
+Compare, sur des pages de résultats CKAN allégés (`fl`) :
+– « pydantic » : modèle brut validé puis DatasetSuggestion validée (ancien chemin) ;
+– « slots »    : RawDataset à slots (sans validation) puis DatasetSuggestion validée.
+
+    python manage.py bench_records                 # 500 résultats × 5 passes
+    python manage.py bench_records --rows 200 --repeat 20
+"""
+
+import time
+import tracemalloc
+from typing import Callable, List, Optional
+
+from django.core.management.base import BaseCommand
+from pydantic import BaseModel
+
+from ai_engine.connectors.data_uk import UKGovClient
+
+
+class _ValidatedDataset(BaseModel):
+    """Équivalent de l'ancien modèle brut pydantic (validation à chaque résultat)."""
+    id: str
+    title: str
+    description: Optional[str] = None
+    url: str
+    organization: Optional[str] = None
+    formats: List[str] = []
+    license: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+def _page(rows: int) -> List[dict]:
+    return [
+        {
+            "id": f"id-{i}", "name": f"ds-{i}", "title": f"Dataset {i}", "notes": "desc " * 20,
+            "organization": "ons", "license_title": "OGL", "metadata_modified": "2024-01-01T00:00:00Z",
+            "res_format": ["CSV", "JSON", ""], "res_url": ["https://x/a.csv", "https://x/b.json", "https://x/c"],
+        }
+        for i in range(rows)
+    ]
+
+
+def _measure(build: Callable[[dict], object], page: List[dict], repeat: int) -> dict:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for raw in page:
+            build(raw)
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    kept = [build(raw) for raw in page]          # objets conservés : mémoire par résultat
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return {"us": best / len(page) * 1e6, "bytes": current / len(page)}
+
+
+class Command(BaseCommand):
+    help = "Compare le coût par résultat : modèles bruts pydantic vs dataclasses à slots."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=500, help="Résultats par page.")
+        parser.add_argument("--repeat", type=int, default=5, help="Passes (meilleur temps retenu).")
+
+    def handle(self, *args, **opts):
+        client = UKGovClient()
+        page = _page(max(1, opts["rows"]))
+        repeat = max(1, opts["repeat"])
+
+        def _pydantic_raw(raw):
+            return _ValidatedDataset(**client.record_fields(raw))
+
+        def _with_suggestion(build):
+            # le brut reste vivant (listes du fan-out, cache) à côté de la suggestion
+            return lambda raw: (rec := build(raw), client.to_suggestion(rec))
+
+        results = {
+            "pydantic raw": _measure(_pydantic_raw, page, repeat),
+            "slots raw": _measure(client.build_record, page, repeat),
+            "pydantic + suggestion": _measure(_with_suggestion(_pydantic_raw), page, repeat),
+            "slots + suggestion": _measure(_with_suggestion(client.build_record), page, repeat),
+        }
+
+        self.stdout.write(f"{len(page)} résultats CKAN, meilleur de {repeat} passes")
+        self.stdout.write(f"{'chemin':<24}{'µs/résultat':>14}{'octets/résultat':>18}")
+        for name, r in results.items():
+            self.stdout.write(f"{name:<24}{r['us']:>14.2f}{r['bytes']:>18.0f}")
+        for stage in ("raw", "+ suggestion"):
+            old, new = results[f"pydantic {stage}"], results[f"slots {stage}"]
+            self.stdout.write(self.style.SUCCESS(
+                f"slots vs pydantic ({stage.strip('+ ')}) : "
+                f"CPU −{(1 - new['us'] / old['us']) * 100:.0f} %, "
+                f"mémoire −{(1 - new['bytes'] / old['bytes']) * 100:.0f} %"
+            ))
@@ -0,0 +1,59 @@
+"""
+Moisson incrémentale des catalogues CKAN dans l'index local FTS5.
+
+    python manage.py harvest_catalog                       # tous les portails
+    python manage.py harvest_catalog --portal data.gov.uk --rows 1000
+    python manage.py harvest_catalog --full                # ignore les curseurs
+    python manage.py harvest_catalog --eurostat en         # + sommaire Eurostat (cache disque)
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ai_engine.connectors import eurostat
+from ai_engine.connectors.local_catalog import PORTALS, catalog_path, harvest
+
+
+class Command(BaseCommand):
+    help = "Moissonne les catalogues CKAN (package_search) dans l'index SQLite FTS5 local."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--portal", action="append", choices=sorted(PORTALS),
+            help="Portail à moissonner (répétable ; défaut : tous).",
+        )
+        parser.add_argument("--rows", type=int, default=500, help="Jeux par page package_search.")
+        parser.add_argument("--max-pages", type=int, default=None, help="Limite de pages par portail.")
+        parser.add_argument("--full", action="store_true", help="Moisson complète (ignore le curseur).")
+        parser.add_argument("--path", default=None, help="Chemin de l'index (défaut : LOCAL_CATALOG_PATH).")
+        parser.add_argument(
+            "--eurostat", action="append", default=[], metavar="LANG",
+            help="Télécharge aussi le sommaire Eurostat de LANG dans le cache disque (répétable).",
+        )
+
+    def handle(self, *args, **opts):
+        portals = opts["portal"] or sorted(PORTALS)
+        self.stdout.write(f"Index : {opts['path'] or catalog_path()}")
+        failed = []
+        for portal in portals:
+            try:
+                n = harvest(
+                    portal,
+                    rows=opts["rows"],
+                    max_pages=opts["max_pages"],
+                    full=opts["full"],
+                    path=opts["path"],
+                )
+            except Exception as exc:
+                failed.append(portal)
+                self.stderr.write(f"✗ {portal} : {exc!r}")
+                continue
+            self.stdout.write(self.style.SUCCESS(f"✓ {portal} : {n} jeux moissonnés"))
+        for lang in opts["eurostat"]:
+            try:
+                n = len(eurostat.catalogue(lang))
+            except Exception as exc:
+                self.stderr.write(f"✗ eurostat ({lang}) : {exc!r}")
+                continue
+            self.stdout.write(self.style.SUCCESS(f"✓ eurostat ({lang}) : {n} jeux indexés"))
+        if failed and len(failed) == len(portals):
+            raise CommandError(f"harvest failed for: {', '.join(failed)}")
@@ -0,0 +1,52 @@
+"""
+Portail factice local (CKAN + data.gouv), cf. ai_engine.connectors.mock_portal.
+
+    python manage.py mock_portals --port 8765 --latency 0.05 --error-rate 0.1
+    CONNECTOR_MOCK_ORIGIN=http://127.0.0.1:8765 python manage.py runserver
+"""
+
+from django.core.management.base import BaseCommand
+
+from ai_engine.connectors.mock_portal import MockConfig, MockPortal
+
+
+def add_mock_arguments(parser) -> None:
+    """Options communes à mock_portals et bench_connectors."""
+    parser.add_argument("--latency", type=float, default=0.0, help="Latence par réponse (s).")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Gigue ajoutée, uniforme [0, jitter] (s).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Part de réponses 503 (0-1).")
+    parser.add_argument("--pages", type=int, default=3, help="Pages disponibles par requête.")
+    parser.add_argument("--seed", type=int, default=None, help="Graine du tirage (erreurs, gigue).")
+    parser.add_argument("--recordings", default=None,
+                        help="Répertoire de réponses enregistrées (package_search.json, package_show.json, datasets.json).")
+
+
+def mock_config(opts: dict) -> MockConfig:
+    return MockConfig(
+        latency=opts["latency"],
+        jitter=opts["jitter"],
+        error_rate=opts["error_rate"],
+        pages=max(1, opts["pages"]),
+        seed=opts["seed"],
+        recordings=opts["recordings"],
+    )
+
+
+class Command(BaseCommand):
+    help = "Sert des réponses CKAN / data.gouv enregistrées en local (tests de charge des connecteurs)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        add_mock_arguments(parser)
+
+    def handle(self, *args, **opts):
+        portal = MockPortal(mock_config(opts), host=opts["host"], port=opts["port"])
+        self.stdout.write(self.style.SUCCESS(f"Portail factice sur {portal.origin}"))
+        self.stdout.write(f"→ CONNECTOR_MOCK_ORIGIN={portal.origin} pour y envoyer les connecteurs")
+        try:
+            portal.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stdout.write(f"Requêtes servies : {dict(portal.stats)}")
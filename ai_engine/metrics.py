@@ -0,0 +1,43 @@
+# ai_engine/metrics.py
+"""
+Compteurs en mémoire (par processus), thread-safe.
+
+Regroupés par « groupe » (ex. "llm_parse") puis par clé (ex. "angles"),
+chaque clé portant un dict de compteurs entiers :
+
+    incr("llm_parse", "angles", "parse_failures")
+    snapshot("llm_parse")  # {"angles": {"parse_failures": 1}}
+
+Volontairement minimal : pas d'export Prometheus, lecture via `snapshot()`
+(logs, bloc `_debug` du playground, tests).
+"""
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from typing import Dict, Optional
+
+_lock = threading.Lock()
+_counters: Dict[str, Dict[str, Dict[str, int]]] = defaultdict(lambda: defaultdict(dict))
+
+
+def incr(group: str, key: str, counter: str, n: int = 1) -> None:
+    with _lock:
+        bucket = _counters[group][key]
+        bucket[counter] = bucket.get(counter, 0) + n
+
+
+def snapshot(group: Optional[str] = None) -> dict:
+    """Copie des compteurs (d'un groupe, ou de tous les groupes)."""
+    with _lock:
+        if group is not None:
+            return {k: dict(v) for k, v in _counters.get(group, {}).items()}
+        return {g: {k: dict(v) for k, v in keys.items()} for g, keys in _counters.items()}
+
+
+def reset(group: Optional[str] = None) -> None:
+    with _lock:
+        if group is None:
+            _counters.clear()
+        else:
+            _counters.pop(group, None)
@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import ai_engine
-import inspect
 import logging
 from typing import Optional, List
 
@@ -16,17 +15,18 @@ from ai_engine.schemas import (
     KeywordsResult,
     LLMSourceSuggestion,
     AngleResources,
+    ExtractionResult,
 )
 from ai_engine.scoring import compute_score
 from ai_engine.chains import keywords, viz  # llm_sources
 from ai_engine.chains import llm_sources_collect  # NEW
 from ai_engine.memory import get_memory
 
-from ai_engine.connectors.data_gouv import DataGouvClient
-from ai_engine.connectors.data_gov import DataGovClient
-from ai_engine.connectors.data_canada import CanadaGovClient
-from ai_engine.connectors.data_uk import UKGovClient
-from ai_engine.connectors.hdx_data import HdxClient
+# Connecteurs chargés à la demande (settings.CONNECTORS_ACTIVE, entry points)
+from ai_engine.connectors import registry
+from ai_engine.connectors.fanout import SearchJob, connector_host, fan_out
+from ai_engine.connectors.health import CircuitOpenError, health_snapshot
+from ai_engine.connectors.routing import PRIMARY, Route, route
 
 from ai_engine.services import validate_url
 
@@ -109,102 +109,159 @@ def _score(extr) -> int:
     return min(raw, 100)
 
 
+def connector_routes(extraction: ExtractionResult | None = None) -> list[Route]:
+    """Connecteurs actifs (catalogue local inclus) et leur niveau de routage."""
+    connectors = registry.enabled_connectors()
+
+    # Routage géo/langue : portails hors sujet ignorés ou interrogés a minima
+    if extraction is not None and getattr(settings, "CONNECTOR_ROUTING_ENABLED", True):
+        routes = route(connectors, language=extraction.language, locations=extraction.locations)
+    else:
+        routes = [Route(c, PRIMARY) for c in connectors]
+
+    if getattr(settings, "LOCAL_CATALOG_ENABLED", False):
+        # Portails moissonnés localement : index FTS5 au lieu des appels live,
+        # limité aux portails retenus par le routage (un client par niveau)
+        from ai_engine.connectors.local_catalog import LocalCatalogClient, harvested_portals
+
+        harvested = set(harvested_portals())
+        if harvested:
+            local: dict[str, list[str]] = {}
+            for r in routes:
+                if connector_host(r.connector) in harvested:
+                    local.setdefault(r.level, []).append(connector_host(r.connector))
+            merged: list[Route] = []
+            for r in routes:
+                host = connector_host(r.connector)
+                if host not in harvested:
+                    merged.append(r)
+                elif local[r.level][0] == host:
+                    # à la place du premier portail moissonné de ce niveau
+                    merged.append(Route(LocalCatalogClient(portals=local[r.level]), r.level))
+            routes = merged
+
+    if extraction is not None:
+        logger.info(
+            "Connecteurs (routage): %s",
+            {type(r.connector).__name__: r.level for r in routes},
+        )
+    return routes
+
+
+def warm_catalogues() -> None:
+    """
+    Catalogues indexés en mémoire (Eurostat) chargés en arrière-plan dès le
+    début de l'analyse, hors des jobs du fan-out.
+    """
+    if "eurostat" not in registry.active_names():
+        return
+    from ai_engine.connectors import eurostat
+
+    eurostat.warm_async()
+
+
+def start_prefetch(extraction: ExtractionResult):
+    """
+    Recherches spéculatives (termes issus de l'extraction) sur les connecteurs
+    PRIMARY, lancées pendant la génération des angles ; None si désactivé.
+    """
+    from ai_engine.connectors import prefetch
+
+    if not prefetch.enabled():
+        return None
+    terms = prefetch.speculative_terms(extraction)
+    if not terms:
+        return None
+    try:
+        primary = [r.connector for r in connector_routes(extraction) if r.level == PRIMARY]
+        return prefetch.Prefetch.start(primary, terms)
+    except Exception as exc:  # spéculatif : jamais bloquant
+        logger.warning("Préchargement connecteurs indisponible: %r", exc)
+        return None
+
+
 def run_connectors(
     keywords_per_angle: list[KeywordsResult],
     max_per_keyword: int = 2,
     max_total_per_angle: int = 5,
+    extraction: ExtractionResult | None = None,
+    prefetch=None,
 ) -> list[list[DatasetSuggestion]]:
-    connectors = [
-        DataGouvClient(),
-        DataGovClient(),
-        CanadaGovClient(),
-        UKGovClient(),
-        HdxClient(),
+    routes = connector_routes(extraction)
+
+    angle_suggestions: list[list[DatasetSuggestion]] = [[] for _ in keywords_per_angle]
+    seen_urls: list[set[str]] = [set() for _ in keywords_per_angle]
+
+    def _consume(job: SearchJob, outcome) -> bool:
+        """Conversion + dédoublonnage ; True quand l'angle est plein."""
+        idx = job.angle_idx
+        suggestions = angle_suggestions[idx]
+        connector = job.connector
+        label = f"[ANGLE {idx}] '{job.keyword}' ↳ {connector.__class__.__name__}.search"
+        if isinstance(outcome, CircuitOpenError):
+            print(f"{label} ⏭  ignoré (disjoncteur ouvert)")
+            return False
+        if isinstance(outcome, BaseException):
+            print(f"{label} ERREUR : {outcome!r}")
+            return False
+        print(f"{label} ok")
+
+        # méthode de conversion résolue une fois par classe (cf. registry.converter)
+        fn = registry.converter(type(connector))
+        convert = getattr(connector, fn) if fn else None
+
+        for raw_ds in outcome:
+            suggestion: DatasetSuggestion | None = None
+
+            if convert is not None:
+                try:
+                    suggestion = convert(raw_ds)
+                except Exception as conv_err:
+                    print(f"      ↳ échec {fn} : {conv_err!r}")
+
+            if suggestion is None and isinstance(raw_ds, DatasetSuggestion):
+                suggestion = raw_ds
+
+            if suggestion is None:
+                print("      ⚠️  ignoré (non convertible)")
+                continue
+
+            if suggestion.source_url in seen_urls[idx]:
+                print("      ⏩ doublon")
+                continue
+
+            suggestion.found_by  = "CONNECTOR"
+            suggestion.angle_idx = idx
+
+            suggestions.append(suggestion)
+            seen_urls[idx].add(suggestion.source_url)
+
+            print(f"      ✅ ajouté : {suggestion.title[:60]}")
+
+            if len(suggestions) >= max_total_per_angle:
+                print(f"      🔘 limite par angle atteinte (angle {idx})")
+                return True
+        return False
+
+    # Ordre de soumission = ordre de la boucle série historique (mot-clé → connecteur),
+    # connecteurs triés par priorité de routage
+    jobs_per_angle = [
+        [
+            SearchJob(idx, keyword, r.connector)
+            for rank, keyword in enumerate(kw for kw_set in kw_result.sets for kw in kw_set.keywords)
+            for r in routes
+            if r.max_keywords is None or rank < r.max_keywords
+        ]
+        for idx, kw_result in enumerate(keywords_per_angle)
     ]
+    fan_out(jobs_per_angle, _consume, max_per_keyword=max_per_keyword, limit=max_total_per_angle,
+            prefetched=prefetch)
+
+    for idx, suggestions in enumerate(angle_suggestions):
+        print(f"→ total datasets angle {idx} : {len(suggestions)}")
+    logger.info("Connecteurs (santé): %s", health_snapshot())
 
-    all_angles: list[list[DatasetSuggestion]] = []
-
-    for idx, kw_result in enumerate(keywords_per_angle):
-        print(f"\n=== [ANGLE {idx}] {kw_result.sets[0].angle_title} ===")
-        seen_urls: set[str] = set()
-        angle_suggestions: list[DatasetSuggestion] = []
-
-        for kw_set in kw_result.sets:
-            for keyword in kw_set.keywords:
-                print(f"→ keyword='{keyword}'")
-                for connector in connectors:
-                    sig = inspect.signature(connector.search).parameters
-                    print(f"   ↳ {connector.__class__.__name__}.search … ", end="")
-                    try:
-                        if "max_results" in sig:
-                            raw_results = connector.search(keyword, max_results=max_per_keyword)
-                        elif "page_size" in sig:
-                            raw_results = connector.search(keyword, page_size=max_per_keyword)
-                        else:
-                            raw_results = connector.search(keyword)
-                    except Exception as e:
-                        print(f"ERREUR : {e!r}")
-                        continue
-                    else:
-                        print("ok")
-
-                    for raw_ds in raw_results:
-                        suggestion: DatasetSuggestion | None = None
-
-                        if hasattr(connector, "to_suggestion"):
-                            try:
-                                suggestion = connector.to_suggestion(raw_ds)
-                            except Exception as err:
-                                print("      ⚠️  to_suggestion KO :", err)
-
-                        if suggestion is None:
-                            for fn in (
-                                "us_to_suggestion",
-                                "fr_to_suggestion",
-                                "ca_to_suggestion",
-                                "uk_to_suggestion",
-                                "hdx_to_suggestion",
-                            ):
-                                if hasattr(connector, fn):
-                                    try:
-                                        suggestion = getattr(connector, fn)(raw_ds)
-                                    except Exception as conv_err:
-                                        print(f"      ↳ échec {fn} : {conv_err!r}")
-                                        suggestion = None
-                                    break
-
-                        if suggestion is None and isinstance(raw_ds, DatasetSuggestion):
-                            suggestion = raw_ds
-
-                        if suggestion is None:
-                            print("      ⚠️  ignoré (non convertible)")
-                            continue
-
-                        if suggestion.source_url in seen_urls:
-                            print("      ⏩ doublon")
-                            continue
-
-                        suggestion.found_by  = "CONNECTOR"
-                        suggestion.angle_idx = idx
-
-                        angle_suggestions.append(suggestion)
-                        seen_urls.add(suggestion.source_url)
-
-                        print(f"      ✅ ajouté : {suggestion.title[:60]}")
-
-                        if len(angle_suggestions) >= max_total_per_angle:
-                            print("      🔘 limite par angle atteinte")
-                            break
-
-                    if len(angle_suggestions) >= max_total_per_angle:
-                        break
-                if len(angle_suggestions) >= max_total_per_angle:
-                    break
-
-        print(f"→ total datasets angle {idx} : {len(angle_suggestions)}")
-        all_angles.append(angle_suggestions)
-
-    return all_angles
+    return angle_suggestions
 
 
 def _llm_to_ds(item: LLMSourceSuggestion, *, angle_idx: int) -> DatasetSuggestion:
@@ -410,15 +467,27 @@ def run(
         1,
     )
 
-    angle_result = angles.run(article_text)
-    logger.debug("Angles générés: %s", len(angle_result.angles))
+    # Préchargement spéculatif des connecteurs pendant angles + mots-clés
+    prefetch = None
+    if _connectors_enabled():
+        warm_catalogues()
+        prefetch = start_prefetch(extraction_result)
+
+    try:
+        angle_result = angles.run(article_text)
+        logger.debug("Angles générés: %s", len(angle_result.angles))
 
-    keywords_per_angle = keywords.run(angle_result)
+        keywords_per_angle = keywords.run(angle_result)
 
-    if _connectors_enabled():
-        connectors_sets = run_connectors(keywords_per_angle)
-    else:
-        connectors_sets = [[] for _ in range(len(keywords_per_angle))]
+        if _connectors_enabled():
+            connectors_sets = run_connectors(keywords_per_angle, extraction=extraction_result,
+                                             prefetch=prefetch)
+        else:
+            connectors_sets = [[] for _ in range(len(keywords_per_angle))]
+    finally:
+        # y compris si angles / mots-clés échouent : pas de spéculation orpheline
+        if prefetch is not None:
+            logger.info("Connecteurs (préchargement): %s", prefetch.finish())
 
     # Recherche / collecte web
     if bool(getattr(settings, "SEARCH_ENABLED", False)):
@@ -426,7 +495,7 @@ def run(
     else:
         llm_sources_sets = llm_sources_collect.run(angle_result)  # fallback LLM-only
 
-    viz_sets = viz.run(angle_result)
+    viz_sets = viz.run(angle_result, extraction=extraction_result)
 
     angle_resources: list[AngleResources] = []
 
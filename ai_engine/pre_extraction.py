@@ -0,0 +1,266 @@
+# ai_engine/pre_extraction.py
+"""
+Pré-extraction déterministe des nombres et des dates (FR/EN).
+
+Les champs `ExtractionResult.numbers` et `dates` sont en grande partie
+récupérables par expressions régulières : pourcentages, montants,
+« 1,5 million », dates ISO, numériques ou écrites en toutes lettres.
+Le LLM n'a plus à produire que personnes / organisations / lieux.
+"""
+from __future__ import annotations
+
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+from ai_engine.schemas import NumberEntity
+
+# ---------------------------------------------------------------------------
+# Langue (heuristique mots-outils)
+# ---------------------------------------------------------------------------
+
+_FR_STOPWORDS = {
+    "le", "la", "les", "des", "du", "une", "est", "et", "pour", "dans", "que", "qui",
+    "sur", "au", "aux", "pas", "ont", "été", "avec", "par", "selon",
+}
+_EN_STOPWORDS = {
+    "the", "and", "of", "to", "is", "in", "that", "for", "with", "was", "are",
+    "on", "by", "has", "have", "were", "from", "said", "this", "it",
+}
+_WORD_RE = re.compile(r"[a-zà-ÿ']+")
+
+
+def detect_language(text: str) -> str:
+    """Retourne 'fr' ou 'en' selon la fréquence des mots-outils (défaut : 'fr')."""
+    words = _WORD_RE.findall((text or "").lower())
+    fr = sum(1 for w in words if w in _FR_STOPWORDS)
+    en = sum(1 for w in words if w in _EN_STOPWORDS)
+    return "en" if en > fr else "fr"
+
+
+# ---------------------------------------------------------------------------
+# Dates
+# ---------------------------------------------------------------------------
+
+_MONTHS = {
+    # FR
+    "janvier": 1, "février": 2, "fevrier": 2, "mars": 3, "avril": 4, "mai": 5, "juin": 6,
+    "juillet": 7, "août": 8, "aout": 8, "septembre": 9, "octobre": 10, "novembre": 11,
+    "décembre": 12, "decembre": 12,
+    # EN
+    "january": 1, "february": 2, "march": 3, "april": 4, "may": 5, "june": 6, "july": 7,
+    "august": 8, "september": 9, "october": 10, "november": 11, "december": 12,
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "jun": 6, "jul": 7, "aug": 8,
+    "sep": 9, "sept": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+_MONTH_ALT = "|".join(sorted((re.escape(m) for m in _MONTHS), key=len, reverse=True))
+_YEAR = r"(?:19|20)\d{2}"
+
+_ISO_DATE_RE = re.compile(rf"\b({_YEAR})-(\d{{2}})(?:-(\d{{2}}))?\b")
+_NUMERIC_DATE_RE = re.compile(rf"\b(\d{{1,2}})[/.](\d{{1,2}})[/.]({_YEAR})\b")
+_DAY_MONTH_YEAR_RE = re.compile(
+    rf"\b(1er|\d{{1,2}})(?:st|nd|rd|th)?\s+({_MONTH_ALT})\.?,?\s+({_YEAR})\b", re.I
+)
+_MONTH_DAY_YEAR_RE = re.compile(
+    rf"\b({_MONTH_ALT})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?,?\s+({_YEAR})\b", re.I
+)
+_MONTH_YEAR_RE = re.compile(rf"\b({_MONTH_ALT})\.?\s+({_YEAR})\b", re.I)
+_YEAR_RANGE_RE = re.compile(rf"\b({_YEAR})\s?[-–/]\s?({_YEAR})\b")
+_YEAR_CONTEXT_RE = re.compile(
+    rf"\b(?:en|depuis|dès|jusqu['’]en|avant|après|entre|et|in|since|by|from|until|"
+    rf"through|before|after|between|and|année|year)\s+({_YEAR})\b"
+    rf"(?!\s?(?:%|€|\$|£|euros|dollars|personnes|habitants|emplois|people|jobs|residents)\b)",
+    re.I,
+)
+
+
+def _iso(year: int, month: Optional[int] = None, day: Optional[int] = None) -> Optional[str]:
+    if month is not None and not 1 <= month <= 12:
+        return None
+    if day is not None and not 1 <= day <= 31:
+        return None
+    if month is None:
+        return f"{year:04d}"
+    if day is None:
+        return f"{year:04d}-{month:02d}"
+    return f"{year:04d}-{month:02d}-{day:02d}"
+
+
+def _overlaps(span: Tuple[int, int], taken: List[Tuple[int, int]]) -> bool:
+    return any(span[0] < e and s < span[1] for s, e in taken)
+
+
+def _date_matches(text: str, language: str) -> List[Tuple[int, int, str]]:
+    """(début, fin, date ISO) pour chaque date reconnue, sans chevauchement."""
+    found: List[Tuple[int, int, str]] = []
+    taken: List[Tuple[int, int]] = []
+
+    def _add(m: re.Match, value: Optional[str], group: int = 0) -> None:
+        span = m.span(group)
+        if value and not _overlaps(span, taken):
+            taken.append(span)
+            found.append((span[0], span[1], value))
+
+    # Du plus spécifique au moins spécifique
+    for m in _ISO_DATE_RE.finditer(text):
+        day = int(m.group(3)) if m.group(3) else None
+        _add(m, _iso(int(m.group(1)), int(m.group(2)), day))
+    for m in _NUMERIC_DATE_RE.finditer(text):
+        a, b, year = int(m.group(1)), int(m.group(2)), int(m.group(3))
+        day, month = (b, a) if language == "en" and a <= 12 else (a, b)
+        _add(m, _iso(year, month, day))
+    for m in _DAY_MONTH_YEAR_RE.finditer(text):
+        day = 1 if m.group(1).lower() == "1er" else int(m.group(1))
+        _add(m, _iso(int(m.group(3)), _MONTHS[m.group(2).lower()], day))
+    for m in _MONTH_DAY_YEAR_RE.finditer(text):
+        _add(m, _iso(int(m.group(3)), _MONTHS[m.group(1).lower()], int(m.group(2))))
+    for m in _MONTH_YEAR_RE.finditer(text):
+        if m.group(1).lower() == "may" and language == "en" and not m.group(1)[0].isupper():
+            continue  # « may » verbe
+        _add(m, _iso(int(m.group(2)), _MONTHS[m.group(1).lower()]))
+    for m in _YEAR_RANGE_RE.finditer(text):
+        _add(m, _iso(int(m.group(1))), 1)
+        _add(m, _iso(int(m.group(2))), 2)
+    for m in _YEAR_CONTEXT_RE.finditer(text):
+        _add(m, _iso(int(m.group(1))), 1)
+
+    found.sort()
+    return found
+
+
+def extract_dates(text: str, language: Optional[str] = None) -> List[str]:
+    """Dates au format ISO (YYYY-MM-DD, YYYY-MM ou YYYY), dans l'ordre du texte, sans doublon."""
+    language = language or detect_language(text)
+    out: List[str] = []
+    for _s, _e, value in _date_matches(text or "", language):
+        if value not in out:
+            out.append(value)
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Nombres
+# ---------------------------------------------------------------------------
+
+_SCALES = {
+    "mille": 1e3, "thousand": 1e3, "k": 1e3,
+    "million": 1e6, "millions": 1e6, "m": 1e6,
+    "milliard": 1e9, "milliards": 1e9, "md": 1e9, "mds": 1e9, "mrd": 1e9,
+    "billion": 1e9, "billions": 1e9, "bn": 1e9,
+    "trillion": 1e12, "trillions": 1e12,
+}
+_SCALE_ALT = "|".join(sorted((re.escape(s) for s in _SCALES), key=len, reverse=True))
+
+_UNIT_ALIASES = {
+    "%": "%", "pour cent": "%", "pourcent": "%", "percent": "%", "per cent": "%",
+    "€": "€", "euro": "€", "euros": "€", "eur": "€",
+    "$": "$", "dollar": "$", "dollars": "$", "usd": "$",
+    "£": "£", "livre": "£", "livres": "£", "pound": "£", "pounds": "£", "gbp": "£",
+}
+_UNITS = [
+    "pour cent", "pourcent", "per cent", "percent", "%",
+    "euros", "euro", "eur", "€", "dollars", "dollar", "usd", r"\$", "livres sterling",
+    "livres", "pounds", "pound", "gbp", "£",
+    "km²", "km2", "km/h", "km", "m²", "m2", "m³", "kg", "tonnes", "tonne", "tons", "ton",
+    "hectares", "hectare", "ha", "mw", "gw", "kwh", "mwh", "gwh", "twh", "°c", "°f",
+    "habitants", "personnes", "salariés", "emplois", "logements", "élèves", "lits",
+    "people", "residents", "inhabitants", "jobs", "homes", "students", "beds",
+    "ans", "années", "jours", "mois", "heures", "years", "days", "months", "hours",
+    "points", "point",
+]
+_UNIT_ALT = "|".join(u if u.startswith("\\") else re.escape(u) for u in _UNITS)
+
+_NUM = r"\d{1,3}(?:[ \u00a0\u202f.,]\d{3})+(?:[.,]\d+)?|\d+(?:[.,]\d+)?"
+_NUMBER_RE = re.compile(
+    rf"(?<![\w.,/-])(?P<pre>[€$£])?\s?(?P<num>{_NUM})"
+    rf"(?:\s?(?P<scale>{_SCALE_ALT})(?![\w]))?"
+    rf"(?:\s?(?:d['’]|de\s+|of\s+)?(?P<unit>{_UNIT_ALT})(?![\w²³]))?",
+    re.I,
+)
+_GROUPED_RE = re.compile(r"\d{1,3}(?:[ \u00a0\u202f.,]\d{3})+$")
+
+
+def _to_float(raw: str, language: str) -> Optional[float]:
+    """Convertit un nombre écrit à la française ou à l'anglaise."""
+    s = re.sub(r"[ \u00a0\u202f]", "", raw)
+    if language == "fr":
+        if "," in s:
+            s = s.replace(".", "").replace(",", ".")
+        elif re.fullmatch(r"\d{1,3}(?:\.\d{3})+", s):
+            s = s.replace(".", "")
+    else:
+        if "." in s or re.fullmatch(r"\d{1,3}(?:,\d{3})+", s):
+            s = s.replace(",", "")
+        else:
+            s = s.replace(",", ".")
+    try:
+        return float(s)
+    except ValueError:
+        return None
+
+
+def _normalize_unit(pre: Optional[str], unit: Optional[str]) -> Optional[str]:
+    if unit:
+        u = unit.lower()
+        if u == "livres sterling":
+            return "£"
+        return _UNIT_ALIASES.get(u, u)
+    if pre:
+        return pre
+    return None
+
+
+def extract_numbers(text: str, language: Optional[str] = None) -> List[NumberEntity]:
+    """
+    NumberEntity pour les nombres porteurs de sens : avec unité, devise,
+    échelle (« 1,5 million ») ou séparateur de milliers. Les années et les
+    nombres appartenant à une date sont ignorés.
+    """
+    text = text or ""
+    language = language or detect_language(text)
+    date_spans = [(s, e) for s, e, _v in _date_matches(text, language)]
+
+    out: List[NumberEntity] = []
+    seen: set[str] = set()
+    for m in _NUMBER_RE.finditer(text):
+        if _overlaps(m.span("num"), date_spans):
+            continue
+        pre, num, scale, unit = m.group("pre"), m.group("num"), m.group("scale"), m.group("unit")
+        if scale and scale.lower() in ("m", "k") and not (pre or unit):
+            scale = None  # « 15 m » = mètres, pas millions
+        grouped = bool(_GROUPED_RE.match(num))
+        if not (pre or scale or unit or grouped):
+            continue
+
+        value = _to_float(num, language)
+        if value is None:
+            continue
+        if scale:
+            value *= _SCALES[scale.lower()]
+
+        end = m.end("unit") if unit else (m.end("scale") if scale else m.end("num"))
+        raw = text[m.start():end].strip()
+        if raw in seen:
+            continue
+        seen.add(raw)
+        out.append(NumberEntity(raw=raw, value=value, unit=_normalize_unit(pre, unit)))
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Point d'entrée
+# ---------------------------------------------------------------------------
+
+class PreExtraction(NamedTuple):
+    language: str
+    dates: List[str]
+    numbers: List[NumberEntity]
+
+
+def pre_extract(text: str, language: Optional[str] = None) -> PreExtraction:
+    """Langue, dates et nombres d'un article, sans appel LLM."""
+    language = language or detect_language(text)
+    return PreExtraction(
+        language=language,
+        dates=extract_dates(text, language),
+        numbers=extract_numbers(text, language),
+    )
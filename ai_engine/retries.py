@@ -1,43 +1,269 @@
 """
-Décorateur de résilience pour tous les appels LLM.
-- 3 tentatives par défaut (configurable via env).
-- Back-off exponentiel : 1 s → 2 s → 4 s (max 10 s).
-- Journalise chaque échec avant de réessayer.
+Politique de nouvelles tentatives commune (LLM, connecteurs, recherche web).
+
+- Back-off exponentiel à *full jitter* : attente ~ U(0, min(cap, base·2^n)),
+  pour éviter que les requêtes en échec ne se resynchronisent.
+- Budget de retries par dépendance (hôte / fournisseur) : les retries sont
+  plafonnés à un pourcentage des requêtes récentes (fenêtre glissante), avec
+  un plancher pour les dépendances peu sollicitées. Quand un fournisseur se
+  dégrade, on échoue vite au lieu de multiplier la charge par 3.
+- Une seule configuration (settings.RETRY_POLICY + RETRY_POLICIES[dep]) sert
+  à tenacity (`budgeted_retry`, `llm_retry`) et à urllib3 (`urllib3_retry`).
+- Compteurs : metrics "retry_budget" (requests / retries / denied) et
+  "llm_parse" → retries pour les chaînes LLM.
 """
 
 import logging
 import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, fields, replace
 from functools import wraps
+from typing import Callable, Dict, Optional
 
 from tenacity import (
-    retry,
+    Retrying,
+    retry_if_not_exception_type,
     stop_after_attempt,
-    wait_exponential,
+    wait_random_exponential,
     RetryError,
 )
+from urllib3.util.retry import Retry
+
+from ai_engine import metrics
 
 logger = logging.getLogger("ai_engine.retry")
 
 MAX_ATTEMPTS = int(os.getenv("LLM_MAX_RETRIES", 1))
 
 
+def _setting(name: str, default):
+    """Lecture tolérante des settings Django (modules importables hors Django)."""
+    try:
+        from django.conf import settings
+        return getattr(settings, name, default)
+    except Exception:
+        return default
+
+
+# ---------------------------------------------------------------------------
+# Politique
+# ---------------------------------------------------------------------------
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    attempts: int = 3                 # tentatives au total (1 = pas de retry)
+    backoff_base: float = 0.5         # secondes
+    backoff_cap: float = 4.0          # secondes
+    budget_ratio: float = 0.2         # retries ≤ 20 % des requêtes récentes…
+    budget_min_retries: int = 5       # …mais au moins 5 par fenêtre
+    budget_window_s: float = 60.0
+    status_forcelist: tuple = (429, 500, 502, 503, 504)
+
+    def backoff(self, attempt: int) -> float:
+        """Full jitter : U(0, min(cap, base·2^(attempt-1)))."""
+        ceiling = min(self.backoff_cap, self.backoff_base * (2 ** max(attempt - 1, 0)))
+        return random.uniform(0, ceiling) if ceiling > 0 else 0.0
+
+
+def get_policy(dependency: str = "default") -> RetryPolicy:
+    """settings.RETRY_POLICY (défauts) surchargé par settings.RETRY_POLICIES[dependency]."""
+    allowed = {f.name for f in fields(RetryPolicy)}
+    base = {k: v for k, v in dict(_setting("RETRY_POLICY", {}) or {}).items() if k in allowed}
+    override = dict((_setting("RETRY_POLICIES", {}) or {}).get(dependency, {}) or {})
+    base.update({k: v for k, v in override.items() if k in allowed})
+    if "status_forcelist" in base:
+        base["status_forcelist"] = tuple(base["status_forcelist"])
+    return replace(RetryPolicy(), **base)
+
+
+# ---------------------------------------------------------------------------
+# Budget
+# ---------------------------------------------------------------------------
+
+class RetryBudget:
+    """Retries autorisés ≤ max(min_retries, ratio × requêtes) sur la fenêtre."""
+
+    def __init__(self, name: str, ratio: float, min_retries: int, window_s: float):
+        self.name = name
+        self.ratio = float(ratio)
+        self.min_retries = int(min_retries)
+        self.window_s = float(window_s)
+        self._requests: deque = deque()
+        self._retries: deque = deque()
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float) -> None:
+        horizon = now - self.window_s
+        for q in (self._requests, self._retries):
+            while q and q[0] < horizon:
+                q.popleft()
+
+    def record_request(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            self._requests.append(now)
+        metrics.incr("retry_budget", self.name, "requests")
+
+    def try_acquire(self) -> bool:
+        """Réserve un retry si le budget le permet."""
+        now = time.monotonic()
+        with self._lock:
+            self._prune(now)
+            allowed = max(self.min_retries, self.ratio * len(self._requests))
+            if len(self._retries) < allowed:
+                self._retries.append(now)
+                ok = True
+            else:
+                ok = False
+        metrics.incr("retry_budget", self.name, "retries" if ok else "denied")
+        if not ok:
+            logger.warning("[retry budget] %s exhausted; failing fast", self.name)
+        return ok
+
+
+_budgets: Dict[str, RetryBudget] = {}
+_budgets_lock = threading.Lock()
+
+
+def retry_budget(dependency: str) -> RetryBudget:
+    with _budgets_lock:
+        budget = _budgets.get(dependency)
+        if budget is None:
+            p = get_policy(dependency)
+            budget = RetryBudget(dependency, p.budget_ratio, p.budget_min_retries, p.budget_window_s)
+            _budgets[dependency] = budget
+        return budget
+
+
+def reset_budgets() -> None:
+    with _budgets_lock:
+        _budgets.clear()
+
+
+# ---------------------------------------------------------------------------
+# tenacity
+# ---------------------------------------------------------------------------
+
+def _tenacity_kwargs(dependency: str, attempts: Optional[int] = None,
+                     before_sleep: Optional[Callable] = None) -> dict:
+    policy = get_policy(dependency)
+    budget = retry_budget(dependency)
+    n = int(attempts if attempts is not None else policy.attempts)
+
+    def _stop(retry_state) -> bool:
+        # stop_after_attempt d'abord : le budget n'est consommé que pour un vrai retry
+        return stop_after_attempt(n)(retry_state) or not budget.try_acquire()
+
+    return {
+        "stop": _stop,
+        "wait": lambda rs: policy.backoff(rs.attempt_number),
+        "reraise": True,
+        "before_sleep": before_sleep,
+    }
+
+
+def budgeted_retry(dependency: str, *, attempts: Optional[int] = None):
+    """
+    Décorateur tenacity partagé par les connecteurs :
+
+        @budgeted_retry("www.data.gouv.fr")
+        def _get(self, path, params): ...
+
+    La politique est relue à chaque appel (settings modifiables à chaud / en test).
+    """
+    def decorator(func):
+        def _log(retry_state):
+            logger.info(
+                "[retry] %s → %s failed (attempt %d): %r",
+                dependency, func.__name__, retry_state.attempt_number,
+                retry_state.outcome.exception(),
+            )
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            retry_budget(dependency).record_request()
+            retrying = Retrying(**_tenacity_kwargs(dependency, attempts, before_sleep=_log))
+            return retrying(func, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class DeadlineExceeded(TimeoutError):
+    """Budget de temps de l'appelant épuisé : `llm_retry` ne retente pas."""
+
+
 def llm_retry(func):
-    @retry(
-        stop=stop_after_attempt(MAX_ATTEMPTS),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        reraise=True,
-        before_sleep=lambda retry_state: logger.warning(
+    chain_name = func.__module__.rsplit(".", 1)[-1]
+
+    def _before_sleep(retry_state):
+        metrics.incr("llm_parse", chain_name, "retries")
+        logger.warning(
             f"[LLM retry] {func.__name__} failed "
             f"(attempt {retry_state.attempt_number}/{MAX_ATTEMPTS}): "
             f"{retry_state.outcome.exception()}"
-        ),
-    )
+        )
+
     @wraps(func)
     def wrapper(*args, **kwargs):
-        return func(*args, **kwargs)
+        retry_budget("openai").record_request()
+        policy = get_policy("openai")
+        kwargs_t = _tenacity_kwargs("openai", MAX_ATTEMPTS, before_sleep=_before_sleep)
+        # back-off LLM historique (1 s → 10 s), désormais avec jitter
+        kwargs_t["wait"] = wait_random_exponential(multiplier=1, max=max(policy.backoff_cap, 10))
+        kwargs_t["retry"] = retry_if_not_exception_type(DeadlineExceeded)
+        return Retrying(**kwargs_t)(func, *args, **kwargs)
 
     return wrapper
 
 
+# ---------------------------------------------------------------------------
+# urllib3 (sessions requests)
+# ---------------------------------------------------------------------------
+
+class BudgetedRetry(Retry):
+    """Retry urllib3 à full jitter, qui consulte le budget de la dépendance."""
+
+    dependency: str = "default"
+    policy: RetryPolicy = RetryPolicy()
+
+    def new(self, **kw):
+        r = super().new(**kw)
+        r.dependency = self.dependency
+        r.policy = self.policy
+        return r
+
+    def get_backoff_time(self) -> float:
+        consecutive = len([h for h in self.history if h.redirect_location is None])
+        if consecutive <= 0:
+            return 0.0
+        return self.policy.backoff(consecutive)
+
+    def increment(self, *args, **kwargs):
+        # d'abord le décompte urllib3 : la dernière tentative lève MaxRetryError
+        # sans consommer de budget (même ordre que _tenacity_kwargs._stop)
+        retry = super().increment(*args, **kwargs)
+        if not retry_budget(self.dependency).try_acquire():
+            # budget épuisé : on force l'épuisement → MaxRetryError / réponse brute
+            return Retry.increment(self.new(total=0), *args, **kwargs)
+        return retry
 
 
+def urllib3_retry(dependency: str, **overrides) -> Retry:
+    """Retry urllib3 construit depuis la même politique que tenacity."""
+    policy = get_policy(dependency)
+    params = {
+        "total": max(policy.attempts - 1, 0),
+        "status_forcelist": list(policy.status_forcelist),
+        "raise_on_status": False,
+    }
+    params.update(overrides)
+    r = BudgetedRetry(**params)
+    r.dependency = dependency
+    r.policy = policy
+    return r
@@ -24,6 +24,13 @@ class NumberEntity(BaseModel):
     value: Optional[float] = Field(None, description="Valeur numérique normalisée si possible")
     unit: Optional[str] = Field(None, description="Unité ou symbole (%) / (€) / (kg)")
 
+class NamedEntitiesResult(BaseModel):
+    """Sortie LLM réduite : dates et nombres viennent de la pré-extraction regex."""
+    language: str = Field(..., description="fr ou en")
+    persons: List[str]
+    organizations: List[str]
+    locations: List[str]
+
 class ExtractionResult(BaseModel):
     language: str = Field(..., description="fr ou en")
     persons: List[str]
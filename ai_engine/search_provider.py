@@ -2,14 +2,24 @@
 from __future__ import annotations
 
 import logging
-from typing import Any, Dict, List, Optional
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import partial
+from typing import Any, Callable, Deque, Dict, List, Optional, Protocol
 from urllib.parse import urlparse
 
 import requests
+from diskcache import Cache
 from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
 from django.conf import settings
 
+from ai_engine import metrics
+from ai_engine.connectors import cache_utils
+from ai_engine.retries import retry_budget, urllib3_retry
+
 logger = logging.getLogger("datascope.search")
 
 # ---------------------------------------------------------------------------
@@ -20,16 +30,60 @@ _TAVILY_TIMEOUT_S: int = int(getattr(settings, "TAVILY_TIMEOUT_SECONDS", 20) or
 _TAVILY_MAX_RETRIES: int = int(getattr(settings, "TAVILY_MAX_RETRIES", 2) or 2)
 
 _session = requests.Session()
-_retry = Retry(
+# full jitter + budget de retries partagé (cf. ai_engine.retries, dépendance "tavily")
+_retry = urllib3_retry(
+    "tavily",
     total=_TAVILY_MAX_RETRIES,
-    backoff_factor=0.6,
-    status_forcelist=[429, 500, 502, 503, 504],
     allowed_methods=["GET", "POST"],
-    raise_on_status=False,
 )
 _session.mount("https://", HTTPAdapter(max_retries=_retry))
 _session.mount("http://", HTTPAdapter(max_retries=_retry))
 
+# SearxNG (ou toute API compatible /search?format=json) : budget "searxng"
+_searxng_session = requests.Session()
+_searxng_retry = urllib3_retry("searxng", total=1, allowed_methods=["GET"])
+_searxng_session.mount("https://", HTTPAdapter(max_retries=_searxng_retry))
+_searxng_session.mount("http://", HTTPAdapter(max_retries=_searxng_retry))
+
+# Appels provider simultanés (requêtes d'un lot, lots de plusieurs angles) :
+# settings.SEARCH_MAX_CONCURRENCY, 1 = séquentiel
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_size = 0
+_executor_lock = threading.Lock()
+
+
+def _max_concurrency() -> int:
+    return max(1, int(getattr(settings, "SEARCH_MAX_CONCURRENCY", 6) or 1))
+
+
+def _pool() -> ThreadPoolExecutor:
+    global _executor, _executor_size
+    size = _max_concurrency()
+    with _executor_lock:
+        if _executor is None or _executor_size != size:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            _executor = ThreadPoolExecutor(max_workers=size, thread_name_prefix="search")
+            _executor_size = size
+        return _executor
+
+
+def _submit_all(calls: List[Callable[[], List[Dict[str, Any]]]]) -> List[Future]:
+    """Soumet les appels au pool de recherche (FIFO : les premiers soumis partent d'abord)."""
+    pool = _pool()
+    return [pool.submit(call) for call in calls]
+
+
+def _run_concurrently(calls: List[Callable[[], List[Dict[str, Any]]]]) -> List[List[Dict[str, Any]]]:
+    """
+    Exécute les appels provider en parallèle (au plus SEARCH_MAX_CONCURRENCY),
+    résultats dans l'ordre des appels : la dé-duplication reste celle du
+    parcours séquentiel.
+    """
+    if len(calls) <= 1 or _max_concurrency() <= 1:
+        return [call() for call in calls]
+    return [f.result() for f in _submit_all(calls)]
+
 
 # ---------------------------------------------------------------------------
 # Helpers URL
@@ -107,6 +161,7 @@ def _tavily_search_one(
         payload["exclude_domains"] = exclude_domains
 
     try:
+        retry_budget("tavily").record_request()
         r = _session.post(
             "https://api.tavily.com/search",
             json=payload,
@@ -136,6 +191,408 @@ def _tavily_search_one(
         return []
 
 
+# ---------------------------------------------------------------------------
+# SearxNG wrapper (API JSON compatible)
+# ---------------------------------------------------------------------------
+
+def _domain_matches(url: str, domains: List[str]) -> bool:
+    host = _source_domain(url)
+    return any(host == d or host.endswith(f".{d}") for d in (d.lower().strip() for d in domains) if d)
+
+
+def _searxng_search_one(
+    query: str,
+    k: int,
+    timeout: int,
+    include_domains: Optional[List[str]] = None,
+    exclude_domains: Optional[List[str]] = None,
+    search_depth: str = "basic",
+) -> List[Dict[str, Any]]:
+    """
+    GET {SEARXNG_URL}/search?format=json. Retourne des dicts {url, title, snippet}.
+    - include/exclude domains : opérateurs `site:` / `-site:` dans la requête,
+      puis filtrage des URLs (tous les moteurs ne les respectent pas)
+    - search_depth : sans équivalent, ignoré
+    """
+    base = (getattr(settings, "SEARXNG_URL", "") or "").rstrip("/")
+    if not base:
+        logger.warning("SEARXNG_URL missing; returning empty results.")
+        return []
+
+    q = query
+    if include_domains:
+        q += " (" + " OR ".join(f"site:{d}" for d in include_domains) + ")"
+    for d in exclude_domains or []:
+        q += f" -site:{d}"
+
+    try:
+        retry_budget("searxng").record_request()
+        r = _searxng_session.get(
+            f"{base}/search",
+            params={"q": q, "format": "json", "pageno": 1},
+            timeout=timeout,
+        )
+        r.raise_for_status()
+        out: List[Dict[str, Any]] = []
+        for it in (r.json() or {}).get("results") or []:
+            url = it.get("url") or ""
+            if not url:
+                continue
+            if include_domains and not _domain_matches(url, include_domains):
+                continue
+            if exclude_domains and _domain_matches(url, exclude_domains):
+                continue
+            out.append({"url": url, "title": it.get("title") or None, "snippet": it.get("content") or None})
+            if len(out) >= int(k):
+                break
+        return out
+    except requests.RequestException as e:
+        logger.warning("SearxNG request failed: %r", e)
+        return []
+    except Exception as e:
+        logger.warning("SearxNG unexpected error: %r", e)
+        return []
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+# settings.SEARCH_PROVIDER choisit le backend principal ; serper / bing ne
+# sont pas branchés (repli sur Tavily, journalisé).
+
+class SearchBackend(Protocol):
+    """Backend de recherche web : résultats bruts {url, title, snippet}."""
+
+    name: str
+
+    def search(self, query: str, k: int, timeout: int, include_domains: Optional[List[str]] = None,
+               exclude_domains: Optional[List[str]] = None, search_depth: str = "basic") -> List[Dict[str, Any]]: ...
+
+
+class TavilyBackend(SearchBackend):
+    name = "tavily"
+
+    def search(self, query, k, timeout, include_domains=None, exclude_domains=None, search_depth="basic"):
+        return _tavily_search_one(query, k, timeout, include_domains, exclude_domains, search_depth)
+
+
+class SearxngBackend(SearchBackend):
+    name = "searxng"
+
+    def search(self, query, k, timeout, include_domains=None, exclude_domains=None, search_depth="basic"):
+        return _searxng_search_one(query, k, timeout, include_domains, exclude_domains, search_depth)
+
+
+BACKENDS: Dict[str, SearchBackend] = {b.name: b for b in (TavilyBackend(), SearxngBackend())}
+
+
+def get_backend(name: Optional[str]) -> SearchBackend:
+    key = (name or "tavily").lower()
+    found = BACKENDS.get(key)
+    if found is None:
+        logger.warning("search provider %r not available; falling back to Tavily", key)
+        found = BACKENDS["tavily"]
+    return found
+
+
+# Latences récentes par backend (appels réels, résultats non vides)
+_LATENCY_WINDOW = 200
+_latencies: Dict[str, Deque[float]] = {}
+_latencies_lock = threading.Lock()
+
+
+def _record_latency(name: str, seconds: float) -> None:
+    with _latencies_lock:
+        _latencies.setdefault(name, deque(maxlen=_LATENCY_WINDOW)).append(seconds)
+
+
+def latency_percentile(name: str, percentile: float) -> Optional[float]:
+    """Percentile des latences récentes de `name` (s) ; None sans mesure."""
+    with _latencies_lock:
+        samples = sorted(_latencies.get(name) or ())
+    if not samples:
+        return None
+    return samples[min(len(samples) - 1, int(round(percentile / 100 * (len(samples) - 1))))]
+
+
+def reset_latencies() -> None:
+    with _latencies_lock:
+        _latencies.clear()
+
+
+# ---------------------------------------------------------------------------
+# Cache persistant des résultats bruts du provider
+# ---------------------------------------------------------------------------
+# Clé : (provider, requête normalisée, include/exclude domains, depth, k).
+# Valeur : résultats bruts {url, title, snippet}, *avant* filtrage near-root /
+# dé-duplication (un changement de règles s'applique aux données en cache).
+# Réglages : settings.SEARCH_CACHE_ENABLED, SEARCH_CACHE = {"ttl", "max_bytes"},
+# SEARCH_CACHE_DIR. Les réponses vides (ou en échec, le wrapper renvoie [])
+# ne sont pas mises en cache. Statistiques : `search_cache_stats()`.
+
+CACHE_METRICS_GROUP = "search_cache"
+_CACHE_DEFAULTS = {"ttl": 24 * 3600, "max_bytes": 32 * 2 ** 20}
+
+_caches: Dict[str, Cache] = {}
+_caches_lock = threading.Lock()
+
+
+def _cache_policy() -> dict:
+    return {**_CACHE_DEFAULTS, **(getattr(settings, "SEARCH_CACHE", {}) or {})}
+
+
+def _search_cache() -> Optional[Cache]:
+    if not bool(getattr(settings, "SEARCH_CACHE_ENABLED", True)):
+        return None
+    directory = getattr(settings, "SEARCH_CACHE_DIR", None) or os.path.join(cache_utils.CACHE_DIR, "search")
+    with _caches_lock:
+        c = _caches.get(directory)
+        if c is None:
+            c = _caches[directory] = Cache(
+                directory,
+                size_limit=int(_cache_policy()["max_bytes"]),
+                eviction_policy="least-recently-used",
+            )
+        return c
+
+
+def _domains_key(domains: Optional[List[str]]) -> tuple:
+    return tuple(sorted({d.strip().lower() for d in domains or [] if d and d.strip()}))
+
+
+def _cache_key(provider: str, query: str, k: int, include_domains: Optional[List[str]],
+               exclude_domains: Optional[List[str]], search_depth: str) -> tuple:
+    text = " ".join((query or "").casefold().split())
+    return (provider, text, _domains_key(include_domains), _domains_key(exclude_domains), search_depth, int(k))
+
+
+def _cached_search_one(
+    query: str,
+    k: int,
+    timeout: int,
+    include_domains: Optional[List[str]] = None,
+    exclude_domains: Optional[List[str]] = None,
+    search_depth: str = "basic",
+    provider: str = "tavily",
+) -> List[Dict[str, Any]]:
+    """Recherche du backend `provider`, servie depuis le cache quand c'est possible."""
+    backend = get_backend(provider)
+    provider = backend.name
+
+    def _call() -> List[Dict[str, Any]]:
+        t0 = time.perf_counter()
+        items = backend.search(query, k, timeout, include_domains, exclude_domains, search_depth)
+        if items:
+            _record_latency(provider, time.perf_counter() - t0)
+        return items
+
+    cache = _search_cache()
+    if cache is None:
+        return _call()
+
+    key = _cache_key(provider, query, k, include_domains, exclude_domains, search_depth)
+    cached = cache.get(key)
+    if cached is not None:
+        metrics.incr(CACHE_METRICS_GROUP, provider, "hits")
+        return [dict(it) for it in cached]
+
+    metrics.incr(CACHE_METRICS_GROUP, provider, "misses")
+    items = _call()
+    if items:
+        cache.set(key, items, expire=_cache_policy()["ttl"])
+        metrics.incr(CACHE_METRICS_GROUP, provider, "stores")
+    return items
+
+
+def search_cache_stats() -> dict:
+    """{"providers": {provider: {hits, misses, stores}}, "entries", "size_bytes"}"""
+    cache = _search_cache()
+    return {
+        "providers": metrics.snapshot(CACHE_METRICS_GROUP),
+        "entries": len(cache) if cache is not None else 0,
+        "size_bytes": cache.volume() if cache is not None else 0,
+    }
+
+
+def clear_search_cache() -> None:
+    cache = _search_cache()
+    if cache is not None:
+        cache.clear()
+
+
+# ---------------------------------------------------------------------------
+# Hedging : backend secondaire quand le principal traîne
+# ---------------------------------------------------------------------------
+# settings.SEARCH_HEDGE_PROVIDER (ex. "searxng", vide = désactivé) et
+# settings.SEARCH_HEDGE = {percentile, min_samples, initial_delay_s, grace_s} :
+# si le principal n'a pas répondu après son percentile de latence (ou
+# initial_delay_s tant qu'il a moins de min_samples mesures), la requête part
+# aussi sur le secondaire. Dès qu'une réponse non vide arrive, l'autre a
+# encore grace_s pour arriver ; les résultats sont fusionnés par URL
+# normalisée, ceux du principal d'abord. Une réponse rapide mais vide ou en
+# échec du principal (Tavily rend [] sur 401 / 429 / timeout) bascule aussi
+# sur le secondaire (disponibilité). Compteurs : metrics "search_hedge".
+
+HEDGE_METRICS_GROUP = "search_hedge"
+_HEDGE_DEFAULTS = {"percentile": 95, "min_samples": 20, "initial_delay_s": 2.0, "grace_s": 0.3}
+
+_hedge_executor: Optional[ThreadPoolExecutor] = None
+_hedge_lock = threading.Lock()
+
+
+def _hedge_policy() -> dict:
+    return {**_HEDGE_DEFAULTS, **(getattr(settings, "SEARCH_HEDGE", {}) or {})}
+
+
+def _hedge_pool() -> ThreadPoolExecutor:
+    global _hedge_executor
+    with _hedge_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(max_workers=4 * _max_concurrency(), thread_name_prefix="search-hedge")
+        return _hedge_executor
+
+
+def hedge_delay(name: str) -> float:
+    """Attente (s) avant de solliciter le secondaire pour une requête de `name`."""
+    policy = _hedge_policy()
+    with _latencies_lock:
+        n = len(_latencies.get(name) or ())
+    if n < int(policy["min_samples"]):
+        return float(policy["initial_delay_s"])
+    return latency_percentile(name, float(policy["percentile"])) or float(policy["initial_delay_s"])
+
+
+def _merge(primary: List[Dict[str, Any]], secondary: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    seen: set[str] = set()
+    out: List[Dict[str, Any]] = []
+    for it in primary + secondary:
+        key = _normalize_url(it.get("url") or "")
+        if key in seen:
+            continue
+        seen.add(key)
+        out.append(it)
+    return out
+
+
+def _result(future: Future) -> List[Dict[str, Any]]:
+    if not future.done():
+        return []
+    try:
+        return future.result() or []
+    except Exception as e:
+        logger.warning("search backend error: %r", e)
+        return []
+
+
+def _hedged(call: Callable[..., List[Dict[str, Any]]], primary: str, secondary: str,
+            timeout: int) -> List[Dict[str, Any]]:
+    pool = _hedge_pool()
+    first = pool.submit(call, provider=primary)
+    done, _ = wait([first], timeout=hedge_delay(primary))
+    if done:
+        items = _result(first)
+        if items:
+            return items
+        metrics.incr(HEDGE_METRICS_GROUP, primary, "failover")
+        second = pool.submit(call, provider=secondary)
+        wait([second], timeout=timeout)
+        return _result(second)
+
+    metrics.incr(HEDGE_METRICS_GROUP, primary, "hedged")
+    second = pool.submit(call, provider=secondary)
+    done, pending = wait([first, second], timeout=timeout, return_when=FIRST_COMPLETED)
+    if not any(_result(f) for f in done):
+        # première réponse vide (échec ?) : on attend l'autre
+        done, pending = wait([first, second], timeout=timeout)
+    elif pending:
+        wait(pending, timeout=float(_hedge_policy()["grace_s"]))
+
+    primary_items, secondary_items = _result(first), _result(second)
+    if secondary_items and not first.done():
+        metrics.incr(HEDGE_METRICS_GROUP, primary, "secondary_won")
+    if primary_items and secondary_items:
+        metrics.incr(HEDGE_METRICS_GROUP, primary, "merged")
+    return _merge(primary_items, secondary_items)
+
+
+def _provider_search(
+    query: str,
+    k: int,
+    timeout: int,
+    include_domains: Optional[List[str]] = None,
+    exclude_domains: Optional[List[str]] = None,
+    search_depth: str = "basic",
+) -> List[Dict[str, Any]]:
+    """Recherche via le backend principal, avec hedging vers le secondaire si configuré."""
+    primary = get_backend(getattr(settings, "SEARCH_PROVIDER", "tavily")).name
+    secondary = (getattr(settings, "SEARCH_HEDGE_PROVIDER", "") or "").lower()
+    call = partial(_cached_search_one, query, k, timeout, include_domains, exclude_domains, search_depth)
+    if not secondary or secondary == primary:
+        return call(provider=primary)
+    return _hedged(call, primary, get_backend(secondary).name, timeout)
+
+
+def hedge_stats() -> dict:
+    """{backend principal: {hedged, secondary_won, merged, failover}}"""
+    return metrics.snapshot(HEDGE_METRICS_GROUP)
+
+
+# ---------------------------------------------------------------------------
+# Back-off spéculatif
+# ---------------------------------------------------------------------------
+# settings.SEARCH_BACKOFF_SPECULATIVE : les premières requêtes de back-off
+# (au plus SEARCH_BACKOFF_SPECULATIVE_BUDGET par lot) partent avec la passe
+# normale ; leurs résultats ne sont fusionnés que si le seuil de datasets
+# n'est pas atteint, sinon elles sont annulées (non démarrées) ou ignorées.
+# Compteurs : metrics "search_backoff" (speculated / used / cancelled / wasted).
+
+BACKOFF_METRICS_GROUP = "search_backoff"
+
+
+def _speculative_budget() -> int:
+    if not bool(getattr(settings, "SEARCH_BACKOFF_SPECULATIVE", False)) or _max_concurrency() <= 1:
+        return 0
+    return max(0, int(getattr(settings, "SEARCH_BACKOFF_SPECULATIVE_BUDGET", 2) or 0))
+
+
+class _SpeculativeBackoff:
+    def __init__(self, calls: List[Callable[[], List[Dict[str, Any]]]]):
+        self.calls = calls
+        self.futures: List[Future] = []
+        self._skip = threading.Event()
+
+    def _guarded(self, call: Callable[[], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        # annulé entre la sortie de file et le démarrage : pas d'appel provider
+        return [] if self._skip.is_set() else call()
+
+    def start(self) -> None:
+        self.futures = _submit_all([partial(self._guarded, c) for c in self.calls])
+        metrics.incr(BACKOFF_METRICS_GROUP, "speculative", "speculated", len(self.futures))
+
+    def results(self) -> List[List[Dict[str, Any]]]:
+        metrics.incr(BACKOFF_METRICS_GROUP, "speculative", "used", len(self.futures))
+        return [_result_or_empty(f) for f in self.futures]
+
+    def cancel(self) -> None:
+        self._skip.set()
+        for f in self.futures:
+            counter = "cancelled" if f.cancel() else "wasted"
+            metrics.incr(BACKOFF_METRICS_GROUP, "speculative", counter)
+
+
+def _result_or_empty(future: Future) -> List[Dict[str, Any]]:
+    try:
+        return future.result() or []
+    except Exception as e:
+        logger.warning("search back-off error: %r", e)
+        return []
+
+
+def backoff_stats() -> dict:
+    """{"speculative": {speculated, used, cancelled, wasted}}"""
+    return metrics.snapshot(BACKOFF_METRICS_GROUP)
+
+
 # ---------------------------------------------------------------------------
 # Recherche batch + back-off optionnel
 # ---------------------------------------------------------------------------
@@ -153,8 +610,14 @@ def search_many(queries: List[dict], k: int = 10) -> List[Dict[str, Any]]:
 
     Sortie: liste aplatie de dicts SearchResult-like:
       { "url", "title", "snippet", "source_domain", "intent", "score": None }
+
+    Backend : settings.SEARCH_PROVIDER (tavily | searxng), hedging optionnel
+    vers settings.SEARCH_HEDGE_PROVIDER (cf. `_provider_search`).
+
+    Les requêtes partent en parallèle (settings.SEARCH_MAX_CONCURRENCY) ;
+    l'ordre et la dé-duplication par URL normalisée sont ceux d'une exécution
+    séquentielle.
     """
-    provider = (getattr(settings, "SEARCH_PROVIDER", "tavily") or "tavily").lower()
     timeout = int(getattr(settings, "SEARCH_TIMEOUT", _TAVILY_TIMEOUT_S) or _TAVILY_TIMEOUT_S)
 
     # Back-off params (lecture settings)
@@ -167,38 +630,7 @@ def search_many(queries: List[dict], k: int = 10) -> List[Dict[str, Any]]:
     seen: set[str] = set()
     results: List[Dict[str, Any]] = []
 
-    # --- 1) Passe normale
-    for q in queries:
-        text = (q or {}).get("text") or ""
-        intent = (q or {}).get("intent") or "dataset"
-        include_domains_q: Optional[List[str]] = (q or {}).get("include_domains")
-        exclude_domains_q: List[str] = (q or {}).get("exclude_domains") or []
-        search_depth_q: str = (q or {}).get("search_depth") or "basic"
-
-        if not text:
-            continue
-
-        raw_items: List[Dict[str, Any]] = []
-        if provider == "tavily":
-            raw_items = _tavily_search_one(
-                text,
-                k=k,
-                timeout=timeout,
-                include_domains=include_domains_q,
-                exclude_domains=(exclude_domains_q or exclude_domains_default) or None,
-                search_depth=search_depth_q,
-            )
-        else:
-            # Fallback : Tavily
-            raw_items = _tavily_search_one(
-                text,
-                k=k,
-                timeout=timeout,
-                include_domains=include_domains_q,
-                exclude_domains=(exclude_domains_q or exclude_domains_default) or None,
-                search_depth=search_depth_q,
-            )
-
+    def _collect(raw_items: List[Dict[str, Any]], intent: str) -> None:
         for it in raw_items:
             url = _normalize_url(it.get("url") or "")
             if not url or _is_near_root(url):
@@ -217,6 +649,47 @@ def search_many(queries: List[dict], k: int = 10) -> List[Dict[str, Any]]:
                 }
             )
 
+    # --- 1) Passe normale (appels concurrents, collecte dans l'ordre des requêtes)
+    specs = [q or {} for q in queries if (q or {}).get("text")]
+    calls = []
+    for q in specs:
+        # backend SEARCH_PROVIDER (+ hedging éventuel), cf. _provider_search
+        calls.append(partial(
+            _provider_search,
+            q["text"],
+            k=k,
+            timeout=timeout,
+            include_domains=q.get("include_domains"),
+            exclude_domains=(q.get("exclude_domains") or exclude_domains_default) or None,
+            search_depth=q.get("search_depth") or "basic",
+        ))
+
+    # Requêtes de back-off : identiques mais forcées sur domaines + depth avancée
+    backoff_calls = [
+        partial(
+            _provider_search,
+            q["text"],
+            k=k,
+            timeout=timeout,
+            include_domains=backoff_domains,
+            exclude_domains=exclude_domains_default or None,
+            search_depth=backoff_depth,
+        )
+        for q in specs if q.get("intent") == "dataset"
+    ] if backoff_domains else []
+
+    budget = _speculative_budget() if backoff_calls and calls else 0
+    spec = _SpeculativeBackoff(backoff_calls[:budget]) if budget > 0 else None
+    if spec is None:
+        normal = _run_concurrently(calls)
+    else:
+        # passe normale soumise d'abord : le back-off spéculatif ne la retarde pas
+        futures = _submit_all(calls)
+        spec.start()
+        normal = [f.result() for f in futures]
+    for q, raw_items in zip(specs, normal):
+        _collect(raw_items, q.get("intent") or "dataset")
+
     # --- 2) Back-off datasets si on est trop “court”
     if backoff_domains:
         ds_count = sum(1 for r in results if (r.get("intent") or "dataset") == "dataset")
@@ -225,39 +698,11 @@ def search_many(queries: List[dict], k: int = 10) -> List[Dict[str, Any]]:
                 "search_many: back-off datasets (have=%d < min=%d) via include_domains=%s",
                 ds_count, backoff_min_ds, backoff_domains,
             )
-            for q in queries:
-                if (q or {}).get("intent") != "dataset":
-                    continue
-                text = (q or {}).get("text") or ""
-                if not text:
-                    continue
-
-                # Requête identique mais forcée sur domaines + depth avancée
-                raw_items = _tavily_search_one(
-                    text,
-                    k=k,
-                    timeout=timeout,
-                    include_domains=backoff_domains,
-                    exclude_domains=exclude_domains_default or None,
-                    search_depth=backoff_depth,
-                )
-                for it in raw_items:
-                    url = _normalize_url(it.get("url") or "")
-                    if not url or _is_near_root(url):
-                        continue
-                    if url in seen:
-                        continue
-                    seen.add(url)
-                    results.append(
-                        {
-                            "url": url,
-                            "title": it.get("title"),
-                            "snippet": it.get("snippet"),
-                            "source_domain": _source_domain(url),
-                            "intent": "dataset",
-                            "score": None,
-                        }
-                    )
+            early = spec.results() if spec is not None else []
+            for raw_items in early + _run_concurrently(backoff_calls[len(early):]):
+                _collect(raw_items, "dataset")
+        elif spec is not None:
+            spec.cancel()
 
     logger.debug("search_many: returned %d unique urls", len(results))
     return results
@@ -0,0 +1,77 @@
+import threading
+import time
+from typing import Callable, List, NamedTuple, Optional
+
+import pytest
+
+from ai_engine import search_provider
+from ai_engine.connectors import health, ratelimit
+from ai_engine.connectors.mock_portal import MockConfig, MockPortal, redirect
+
+
+@pytest.fixture
+def mock_portal(request, settings):
+    """
+    Portail factice (CKAN + data.gouv) vers lequel partent tous les connecteurs.
+    Configuration : @pytest.mark.parametrize("mock_portal", [MockConfig(...)], indirect=True).
+    """
+    settings.CONNECTOR_CACHE_ENABLED = False
+    settings.CONNECTOR_RATE_LIMITS = {"default": {"rate": 0, "burst": 1}}
+    ratelimit.reset_limiters()
+    health.reset_breakers()
+    config = getattr(request, "param", None) or MockConfig()
+    with MockPortal(config) as portal, redirect(portal.origin):
+        yield portal
+    ratelimit.reset_limiters()
+    health.reset_breakers()
+
+
+class SearchCall(NamedTuple):
+    query: str
+    k: int
+    include_domains: Optional[List[str]]
+    search_depth: str
+
+
+class FakeSearch:
+    """
+    Fournisseur de recherche factice (remplace search_provider._tavily_search_one).
+    `respond(call)` construit les résultats ; `delay` simule la latence réseau.
+    Garde la trace des appels et du pic d'appels simultanés.
+    """
+
+    def __init__(self, delay: float = 0.0, respond: Optional[Callable[[SearchCall], List[dict]]] = None):
+        self.delay = delay
+        self.respond = respond or (lambda call: [{"url": f"https://ex.org/{call.query}/0", "title": call.query}])
+        self.calls: List[SearchCall] = []
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, query, k, timeout, include_domains=None, exclude_domains=None, search_depth="basic"):
+        call = SearchCall(query, k, include_domains, search_depth)
+        with self._lock:
+            self.calls.append(call)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+            return self.respond(call)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+@pytest.fixture
+def fake_search(request, monkeypatch, settings):
+    """
+    Recherche web factice, sans cache ni hedging.
+    Configuration : @pytest.mark.parametrize("fake_search", [{"delay": 0.1}], indirect=True)
+    ou directement via les attributs `delay` / `respond`.
+    """
+    settings.SEARCH_CACHE_ENABLED = False
+    settings.SEARCH_HEDGE_PROVIDER = ""
+    fake = FakeSearch(**(getattr(request, "param", None) or {}))
+    monkeypatch.setattr(search_provider, "_tavily_search_one", fake)
+    return fake
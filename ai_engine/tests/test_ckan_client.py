@@ -0,0 +1,182 @@
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import responses
+
+from ai_engine.connectors import ckan, data_gov
+from ai_engine.connectors.data_canada import CADataset, CanadaGovClient
+from ai_engine.connectors.data_gov import DataGovClient, USDataset
+from ai_engine.connectors.data_uk import UKGovClient
+from ai_engine.connectors.hdx_climate import HDXClimateClient
+
+UK_API = "https://data.gov.uk/api/3/action/package_search"
+ONS = {"result": {"name": "ons", "title": "Office for National Statistics"}}
+
+
+def _lean(i, **extra):
+    """Document tel que renvoyé par Solr avec `fl` (pas de `resources`)."""
+    doc = {
+        "id": f"id-{i}",
+        "name": f"ds-{i}",
+        "title": f"Dataset {i}",
+        "notes": "desc",
+        "organization": "ons",
+        "license_title": "OGL",
+        "metadata_modified": "2024-01-01T00:00:00Z",
+        "res_format": ["CSV", ""],
+        "res_url": ["https://x/a.csv", "https://x/b.json"],
+    }
+    doc.update(extra)
+    return doc
+
+
+def _query(call):
+    return parse_qs(urlparse(call.request.url).query)
+
+
+def _searches():
+    return [c for c in responses.calls if "package_search" in c.request.url]
+
+
+@pytest.fixture(autouse=True)
+def _fresh_details(settings, tmp_path):
+    settings.CONNECTOR_CACHE_DIR = str(tmp_path)
+    settings.CONNECTOR_RATE_LIMITS = {"default": {"rate": 0}}
+    data_gov.clear_details()
+    ckan.clear_organization_titles()
+    yield
+    data_gov.clear_details()
+    ckan.clear_organization_titles()
+
+
+@responses.activate
+def test_lean_request_and_record():
+    responses.add(responses.GET, UK_API, json={"result": {"count": 1, "results": [_lean(1)]}})
+    responses.add(responses.GET, "https://data.gov.uk/api/3/action/organization_show", json=ONS)
+    client = UKGovClient()
+    [ds] = list(client.search("Énergie verte", page_size=5))
+
+    qs = _query(responses.calls[0])
+    assert qs["fl"] == ["id,name,title,notes,organization,license_title,metadata_modified,res_format,res_url"]
+    assert qs["facet"] == ["false"]
+    assert qs["q"] == ["energie+verte"] and qs["rows"] == ["5"]
+
+    assert ds.formats == ["csv", "json"]  # format déduit de l'URL si res_format vide
+    assert ds.organization == "Office for National Statistics"  # slug (fl) → titre
+    assert _query(responses.calls[1])["id"] == ["ons"]
+    assert ds.url == "https://data.gov.uk/dataset/ds-1"
+    assert client.uk_to_suggestion(ds).source_name == "data.gov.uk"
+
+    # titre résolu une fois : partagé par le processus, puis le cache disque
+    list(client.search("autre", page_size=5))
+    ckan.clear_organization_titles()
+    list(client.search("encore", page_size=5))
+    assert len(responses.calls) - len(_searches()) == 1
+
+
+@responses.activate
+def test_full_documents_still_supported_and_pagination_stops_on_count():
+    full = {
+        "id": "id-1", "name": "ds-1", "title": "Full", "notes": None,
+        "organization": {"title": "Office"}, "license_title": "OGL",
+        "metadata_modified": "2024-01-01", "resources": [{"format": "XLSX"}],
+    }
+    responses.add(responses.GET, UK_API, json={"result": {"count": 2, "results": [full]}})
+    responses.add(responses.GET, UK_API, json={"result": {"count": 2, "results": [_lean(2, res_format=["DOCX"], res_url=[])]}})
+    client = UKGovClient()
+    results = list(client.search("x", page_size=1))
+    assert [r.organization for r in results] == ["Office"]  # 2e jeu sans format exploitable
+    assert len(_searches()) == 2                            # start=2 ≥ count=2 → fin
+    assert _query(_searches()[1])["start"] == ["1"]
+
+
+@responses.activate
+def test_canada_translated_title_and_query_suffix():
+    responses.add(
+        responses.GET, "https://open.canada.ca/data/api/3/action/package_search",
+        json={"result": {"count": 1, "results": [_lean(1, title_translated={"en": "Energy", "fr": "Énergie"})]}},
+    )
+    [ds] = list(CanadaGovClient().search("energie"))
+    assert isinstance(ds, CADataset)
+    assert ds.title == "Energy"
+    assert ds.url == "https://open.canada.ca/data/en/dataset/id-1"
+    assert "title_translated" in _query(responses.calls[0])["fl"][0]
+
+    responses.add(
+        responses.GET, "https://data.humdata.org/api/3/action/package_search",
+        json={"result": {"count": 0, "results": []}},
+    )
+    assert list(HDXClimateClient().search("flood")) == []
+    assert _query(_searches()[1])["q"] == ["flood climate"]
+
+
+@responses.activate
+def test_data_gov_completes_missing_metadata_with_package_show():
+    responses.add(
+        responses.GET, "https://catalog.data.gov/api/3/action/package_search",
+        json={"result": {"count": 5, "results": [_lean(1, organization=None, license_title=None)]}},
+    )
+    responses.add(
+        responses.GET, "https://catalog.data.gov/api/3/action/package_show",
+        json={"result": {"id": "id-1", "organization": {"title": "CDC"}, "license_title": "Public Domain",
+                         "resources": [{"format": "CSV"}]}},
+    )
+    [ds] = list(DataGovClient().search("covid", max_results=1))
+    assert isinstance(ds, USDataset)
+    assert (ds.organization, ds.license) == ("CDC", "Public Domain")
+    assert ds.url == "https://catalog.data.gov/dataset/ds-1"
+
+
+@responses.activate
+def test_data_gov_prefetches_page_details_concurrently(settings):
+    settings.CONNECTORS_MAX_PER_HOST = 4
+    page = [_lean(i, organization=None) for i in range(4)] + [_lean(9)]
+    responses.add(
+        responses.GET, "https://catalog.data.gov/api/3/action/package_search",
+        json={"result": {"count": 5, "results": page}},
+    )
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def _show(request):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        time.sleep(0.05)
+        with lock:
+            active[0] -= 1
+        pkg_id = parse_qs(urlparse(request.url).query)["id"][0]
+        return 200, {}, '{"result": {"id": "%s", "organization": {"title": "Org %s"}}}' % (pkg_id, pkg_id)
+
+    responses.add_callback(
+        responses.GET, "https://catalog.data.gov/api/3/action/package_show", callback=_show,
+    )
+    responses.add(responses.GET, "https://catalog.data.gov/api/3/action/organization_show", json=ONS)
+    out = list(DataGovClient().search("covid", page_size=5, max_results=5))
+    assert [ds.organization for ds in out] == [
+        "Org id-0", "Org id-1", "Org id-2", "Org id-3", "Office for National Statistics",
+    ]
+    shows = [c for c in responses.calls if "package_show" in c.request.url]
+    assert len(shows) == 4 and peak[0] > 1          # une rafale parallèle, pas 4 appels en série
+
+    # nouvelle instance, autre run : détails servis par le cache partagé (id du package)
+    data_gov.clear_details()                         # LRU vidé → cache disque
+    list(DataGovClient().search("covid", page_size=5, max_results=5))
+    assert len([c for c in responses.calls if "package_show" in c.request.url]) == 4
+
+
+@responses.activate
+def test_data_gov_failed_package_show_is_not_refetched(settings):
+    settings.RETRY_POLICY = {"attempts": 1}
+    responses.add(
+        responses.GET, "https://catalog.data.gov/api/3/action/package_search",
+        json={"result": {"count": 2, "results": [_lean(1, organization=None), _lean(2, organization=None)]}},
+    )
+    responses.add(responses.GET, "https://catalog.data.gov/api/3/action/package_show", status=404)
+
+    out = list(DataGovClient().search("covid", page_size=2, max_results=2))
+
+    assert [ds.organization for ds in out] == [None, None]
+    shows = [c for c in responses.calls if "package_show" in c.request.url]
+    assert len(shows) == 2                           # la rafale seulement, pas de 2e essai dans build_record
@@ -0,0 +1,66 @@
+import time
+
+import pytest
+
+from ai_engine import metrics
+from ai_engine.connectors import cache_utils
+from ai_engine.connectors.fanout import search_one
+
+
+class _Counting:
+    def __init__(self):
+        self.calls = 0
+
+    def search(self, keyword, page_size=10):
+        self.calls += 1
+        return iter([{"kw": keyword, "n": i, "call": self.calls} for i in range(page_size)])
+
+
+@pytest.fixture(autouse=True)
+def _tmp_cache(settings, tmp_path):
+    settings.CONNECTOR_CACHE_ENABLED = True
+    settings.CONNECTOR_CACHE_DIR = str(tmp_path)
+    settings.CONNECTOR_CACHE = {"default": {"ttl": 3600, "stale_ttl": 3600}}
+    metrics.reset(cache_utils.METRICS_GROUP)
+    yield
+
+
+def test_hit_after_miss_with_sanitized_key():
+    conn = _Counting()
+    first = search_one(conn, "Énergie  renouvelable", 2, 5)
+    again = search_one(conn, "energie renouvelable", 2, 5)
+    assert conn.calls == 1
+    assert again == first
+    # page_size fait partie de la clé
+    search_one(conn, "energie renouvelable", 3, 5)
+    assert conn.calls == 2
+
+    stats = cache_utils.cache_stats()["_Counting"]
+    assert stats["hits"] == 1 and stats["misses"] == 2
+    assert stats["entries"] == 2 and stats["size_bytes"] > 0
+
+
+def test_stale_entry_served_then_refreshed_in_background(settings):
+    settings.CONNECTOR_CACHE = {"_Counting": {"ttl": 0, "stale_ttl": 3600}}
+    conn = _Counting()
+    search_one(conn, "climat", 1, 5)
+
+    stale = search_one(conn, "climat", 1, 5)
+    assert stale[0]["call"] == 1          # servi immédiatement, version périmée
+
+    deadline = time.time() + 2
+    while conn.calls < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    deadline = time.time() + 2
+    while not cache_utils.cache_stats()["_Counting"].get("refreshes") and time.time() < deadline:
+        time.sleep(0.01)
+    assert conn.calls == 2
+    assert cache_utils.store("_Counting").get(cache_utils.make_key("climat", 1, None, 5)) is not None
+
+
+def test_disabled_cache_always_fetches(settings):
+    settings.CONNECTOR_CACHE_ENABLED = False
+    conn = _Counting()
+    search_one(conn, "x", 1, 5)
+    search_one(conn, "x", 1, 5)
+    assert conn.calls == 2
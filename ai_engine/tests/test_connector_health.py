@@ -0,0 +1,118 @@
+import time
+
+import pytest
+import responses
+
+from ai_engine.connectors import health, http, ratelimit
+from ai_engine.connectors.fanout import SearchJob, fan_out, search_one
+from ai_engine.connectors.health import CircuitOpenError, breaker, guarded, health_snapshot
+
+
+@pytest.fixture(autouse=True)
+def _fresh(settings):
+    settings.CONNECTOR_CACHE_ENABLED = False
+    settings.CONNECTOR_BREAKER = {"default": {"min_calls": 3, "error_rate": 0.5, "cooldown_s": 60}}
+    health.reset_breakers()
+    yield
+    health.reset_breakers()
+
+
+class _Flaky:
+    def __init__(self, fail=True):
+        self.fail = fail
+        self.calls = 0
+
+    def search(self, keyword, page_size=10):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("down")
+        return [{"kw": keyword}]
+
+
+def test_opens_on_error_rate_and_skips_calls():
+    conn = _Flaky()
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            search_one(conn, "k", 2, 5)
+    assert breaker("_Flaky").state == health.OPEN
+
+    with pytest.raises(CircuitOpenError):
+        search_one(conn, "k", 2, 5)
+    assert conn.calls == 3                      # plus aucun appel réseau
+    snap = health_snapshot()["_Flaky"]
+    assert snap["skipped"] == 1 and snap["failures"] == 3
+
+
+def test_half_open_probe_closes_or_reopens(settings):
+    settings.CONNECTOR_BREAKER = {"default": {"min_calls": 1, "cooldown_s": 0}}
+    health.reset_breakers()
+    b = breaker("svc")
+    with pytest.raises(ZeroDivisionError):
+        guarded("svc", lambda: 1 / 0)
+    assert b.state == health.OPEN
+
+    # cooldown écoulé → une sonde ; échec → réouverture
+    with pytest.raises(ZeroDivisionError):
+        guarded("svc", lambda: 1 / 0)
+    assert b.state == health.OPEN
+
+    assert guarded("svc", lambda: "ok") == "ok"
+    assert b.state == health.CLOSED
+
+
+def test_opens_on_latency_ewma(settings):
+    settings.CONNECTOR_BREAKER = {"default": {"slow_ms": 50, "ewma_alpha": 1.0, "min_calls": 2}}
+    health.reset_breakers()
+    b = breaker("slow")
+    b.record(True, 0.01)
+    assert b.state == health.CLOSED
+    b.record(True, 0.2)
+    assert b.state == health.OPEN
+    assert health_snapshot()["slow"]["latency_ewma_ms"] == 200
+
+
+def test_slow_first_call_does_not_open(settings):
+    settings.CONNECTOR_BREAKER = {"default": {"slow_ms": 50, "ewma_alpha": 0.9, "min_calls": 3}}
+    health.reset_breakers()
+    b = breaker("cold")
+    b.record(True, 2.0)                 # poignée de main TLS à froid
+    assert b.state == health.CLOSED
+    b.record(True, 0.01)
+    b.record(True, 0.01)
+    assert b.state == health.CLOSED and b.ewma_ms < 50
+
+
+def test_latency_counts_http_attempts_not_waits(settings):
+    settings.CONNECTOR_BREAKER = {"default": {"slow_ms": 50, "ewma_alpha": 1.0}}
+    health.reset_breakers()
+
+    def throttled_call():
+        time.sleep(0.2)                 # jeton du limiteur, back-off de retry…
+        health.record_attempt(0.01)
+        health.record_attempt(0.03)
+        return "ok"
+
+    assert guarded("throttled", throttled_call) == "ok"
+    snap = health_snapshot()["throttled"]
+    assert snap["state"] == health.CLOSED and snap["latency_ewma_ms"] == 20
+
+
+@responses.activate
+def test_http_attempts_feed_the_breaker_without_rate_limit_wait(monkeypatch, settings):
+    settings.CONNECTOR_BREAKER = {"default": {"slow_ms": 50, "ewma_alpha": 1.0}}
+    health.reset_breakers()
+    responses.add(responses.GET, "https://portal.example/api", json={})
+    monkeypatch.setattr(ratelimit.limiter("portal.example"), "acquire", lambda: time.sleep(0.2))
+
+    guarded("portal", lambda: http.get("https://portal.example/api"))
+
+    assert health_snapshot()["portal"]["latency_ewma_ms"] < 50
+
+
+def test_fan_out_reports_open_circuit_as_skipped():
+    conn = _Flaky()
+    breaker("_Flaky")._open("test")
+    seen = []
+    fan_out([[SearchJob(0, "k", conn)]], lambda j, o: seen.append(o) or False, max_per_keyword=2, limit=5)
+    assert isinstance(seen[0], CircuitOpenError)
+    assert conn.calls == 0
@@ -0,0 +1,154 @@
+import threading
+import time
+
+import pytest
+
+from ai_engine import metrics, pipeline
+from ai_engine.connectors import prefetch, registry
+from ai_engine.schemas import DatasetSuggestion, ExtractionResult, KeywordSet, KeywordsResult, NumberEntity
+
+
+class FakePortal:
+    host = "www.data.gouv.fr"
+
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def search(self, keyword, page_size=10):
+        with self.lock:
+            self.calls.append(keyword)
+        return []
+
+
+@pytest.fixture(autouse=True)
+def _fresh(settings):
+    settings.CONNECTOR_CACHE_ENABLED = False
+    metrics.reset(prefetch.METRICS_GROUP)
+    yield
+    metrics.reset(prefetch.METRICS_GROUP)
+
+
+def _extraction(**kw):
+    base = dict(language="fr", persons=[], organizations=[], locations=[], dates=[], numbers=[])
+    base.update(kw)
+    return ExtractionResult(**base)
+
+
+def test_speculative_terms_by_frequency():
+    extr = _extraction(
+        locations=["Lyon", "Paris", "Lyon", "lyon "],
+        organizations=["INSEE", "Paris"],
+        numbers=[NumberEntity(raw="3 M habitants", unit="habitants"), NumberEntity(raw="5 %", unit="%")],
+    )
+    assert prefetch.speculative_terms(extr, limit=10) == ["Lyon", "Paris", "INSEE", "habitants"]
+    assert prefetch.speculative_terms(extr, limit=2) == ["Lyon", "Paris"]
+
+
+def test_take_matches_keyword_and_parameters():
+    portal = FakePortal()
+    pf = prefetch.Prefetch.start([portal], ["Île-de-France"], max_per_keyword=2, limit=5)
+
+    assert pf.take(portal, "ile-de-france", 3, 5) is None          # paramètres différents
+    future = pf.take(portal, "  ILE-DE-FRANCE ", 2, 5)
+    assert future is not None and future.result(timeout=5) == []
+    assert pf.take(portal, "autre", 2, 5) is None
+    assert pf.finish() == {"speculated": 1, "hits": 1, "waste": 0, "hit_ratio": 1.0}
+
+
+def test_run_connectors_reuses_prefetched_searches(monkeypatch, settings):
+    portal = FakePortal()
+    monkeypatch.setitem(registry.BUILTIN, "data_gouv", lambda: portal)
+    settings.CONNECTORS_ACTIVE = ["data_gouv"]
+    settings.CONNECTOR_PREFETCH_MAX_TERMS = 3
+    extr = _extraction(locations=["Lyon"], organizations=["INSEE"])
+
+    pf = pipeline.start_prefetch(extr)
+    kws = [KeywordsResult(language="fr", sets=[KeywordSet(angle_title="A", keywords=["lyon", "emploi"])])]
+    pipeline.run_connectors(kws, extraction=extr, prefetch=pf)
+    report = pf.finish()
+
+    assert sorted(portal.calls) == ["INSEE", "Lyon", "emploi"]      # "lyon" servi par la spéculation
+    assert report == {"speculated": 2, "hits": 1, "waste": 1, "hit_ratio": 0.5}
+    assert prefetch.prefetch_stats()["FakePortal"] == {"speculated": 2, "hits": 1, "waste": 1}
+
+
+def test_prefetch_disabled(settings):
+    settings.CONNECTOR_PREFETCH_ENABLED = False
+    assert pipeline.start_prefetch(_extraction(locations=["Lyon"])) is None
+
+
+class SlowPortal(FakePortal):
+    """Résultats DatasetSuggestion (comme LocalCatalogClient), pic de concurrence mesuré."""
+
+    def __init__(self, delay=0.05):
+        super().__init__()
+        self.delay, self.active, self.peak = delay, 0, 0
+
+    def search(self, keyword, page_size=10):
+        with self.lock:
+            self.calls.append(keyword)
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active -= 1
+        return [DatasetSuggestion(title=keyword, description="", source_name="Local",
+                                  source_url=f"https://www.data.gouv.fr/{keyword}")]
+
+
+def test_prefetched_results_are_copied_per_angle(monkeypatch, settings):
+    portal = SlowPortal(delay=0)
+    monkeypatch.setitem(registry.BUILTIN, "data_gouv", lambda: portal)
+    settings.CONNECTORS_ACTIVE = ["data_gouv"]
+    extr = _extraction(locations=["Paris"])
+
+    pf = pipeline.start_prefetch(extr)
+    kws = [KeywordsResult(language="fr", sets=[KeywordSet(angle_title=t, keywords=["Paris"])]) for t in "AB"]
+    out = pipeline.run_connectors(kws, extraction=extr, prefetch=pf)
+    pf.finish()
+
+    assert portal.calls == ["Paris"]
+    assert out[0][0] is not out[1][0]
+    assert [out[0][0].angle_idx, out[1][0].angle_idx] == [0, 1]
+
+
+def test_prefetch_respects_per_host_cap(monkeypatch, settings):
+    portal = SlowPortal()
+    monkeypatch.setitem(registry.BUILTIN, "data_gouv", lambda: portal)
+    settings.CONNECTORS_ACTIVE = ["data_gouv"]
+    settings.CONNECTORS_MAX_PER_HOST = 2
+    settings.CONNECTOR_PREFETCH_MAX_TERMS = 4
+    extr = _extraction(locations=["Lyon", "Nice", "Metz", "Caen"])
+
+    pf = pipeline.start_prefetch(extr)
+    kws = [KeywordsResult(language="fr", sets=[KeywordSet(angle_title="A", keywords=["Lyon", "Brest", "Nantes"])])]
+    pipeline.run_connectors(kws, extraction=extr, prefetch=pf)
+    report = pf.finish()
+
+    assert portal.peak <= 2                                          # spéculation + fan-out confondus
+    assert report["speculated"] == 2 and report["hits"] == 1       # file annulée au passage de relais
+    assert sorted(portal.calls) == ["Brest", "Lyon", "Nantes", "Nice"]
+
+
+def test_finish_runs_when_angles_fail(monkeypatch, settings):
+    settings.CONNECTORS_ENABLED = True
+    finished = []
+
+    class _Prefetch:
+        def finish(self):
+            finished.append(True)
+            return {}
+
+    def _boom(text):
+        raise RuntimeError("LLM indisponible")
+
+    monkeypatch.setattr(pipeline, "_validate_length", lambda text: None)
+    monkeypatch.setattr(pipeline.extraction, "run", lambda text: _extraction(locations=["Lyon"]))
+    monkeypatch.setattr(pipeline, "compute_score", lambda *a, **kw: 0.0)
+    monkeypatch.setattr(pipeline, "start_prefetch", lambda extr: _Prefetch())
+    monkeypatch.setattr(pipeline.angles, "run", _boom)
+
+    with pytest.raises(RuntimeError):
+        pipeline.run("Un article.")
+    assert finished == [True]
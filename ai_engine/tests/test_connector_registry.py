@@ -0,0 +1,59 @@
+import subprocess
+import sys
+from importlib.metadata import EntryPoint
+
+import pytest
+
+from ai_engine.connectors import registry
+from ai_engine.connectors.data_uk import UKGovClient
+from ai_engine.connectors.data_gouv import DataGouvClient
+
+
+@pytest.fixture(autouse=True)
+def _fresh():
+    registry.reset()
+    yield
+    registry.reset()
+
+
+class PluginClient:
+    host = "plugin.example"
+
+    def search(self, keyword, page_size=10):
+        return []
+
+
+def test_active_connectors_follow_settings_order(settings):
+    settings.CONNECTORS_ACTIVE = ["data_uk", "data_gouv"]
+    assert [type(c) for c in registry.enabled_connectors()] == [UKGovClient, DataGouvClient]
+
+
+def test_entry_point_plugin_is_loaded(monkeypatch, settings):
+    ep = EntryPoint(name="plugin", value=f"{__name__}:PluginClient", group=registry.ENTRY_POINT_GROUP)
+    monkeypatch.setattr(registry, "entry_points", lambda group: [ep] if group == ep.group else [])
+    settings.CONNECTORS_ACTIVE = ["plugin", "missing"]
+
+    assert "plugin" in registry.available()
+    conns = registry.enabled_connectors()          # "missing" ignoré (log)
+    assert [type(c).__name__ for c in conns] == ["PluginClient"]
+    with pytest.raises(KeyError):
+        registry.factory("missing")
+
+
+def test_converter_resolved_once_per_class():
+    assert registry.converter(UKGovClient) == "to_suggestion"
+    assert registry.converter(DataGouvClient) == "fr_to_suggestion"
+    assert registry.converter(PluginClient) is None
+    assert registry.converter.cache_info().currsize == 3
+
+
+def test_pipeline_import_does_not_load_connector_modules():
+    code = (
+        "import os, sys, django;"
+        "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'datascope_backend.settings');"
+        "django.setup();"
+        "import ai_engine.pipeline;"
+        "print(any(m.startswith('ai_engine.connectors.data_') for m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip().splitlines()[-1] == "False"
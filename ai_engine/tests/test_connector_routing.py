@@ -0,0 +1,106 @@
+import pytest
+
+from ai_engine import pipeline
+from ai_engine.connectors import registry
+from ai_engine.connectors.routing import PRIMARY, SECONDARY, resolve_countries, route
+from ai_engine.schemas import ExtractionResult, KeywordSet, KeywordsResult
+
+
+class _Portal:
+    def __init__(self, host):
+        self.host = host
+        self.calls = []
+
+    def search(self, keyword, page_size=10):
+        self.calls.append(keyword)
+        return []
+
+
+HOSTS = {
+    "FR": "www.data.gouv.fr",
+    "US": "catalog.data.gov",
+    "CA": "open.canada.ca",
+    "GB": "data.gov.uk",
+    "HDX": "data.humdata.org",
+}
+
+
+@pytest.fixture
+def portals():
+    return {code: _Portal(host) for code, host in HOSTS.items()}
+
+
+def _levels(routes, portals):
+    names = {id(p): code for code, p in portals.items()}
+    return [(names[id(r.connector)], r.level) for r in routes]
+
+
+def test_resolve_countries_from_gazetteer(settings):
+    assert resolve_countries(["Alençon", "Orne", "Houston, Texas"]) == ["FR", "US"]
+    assert resolve_countries(["Île-de-France", "New York City"]) == ["FR", "US"]
+    assert resolve_countries(["Atlantide"]) == []
+    assert resolve_countries(["Houston, TX", "Paris.", "(U.S.)"]) == ["US", "FR"]
+    settings.CONNECTOR_GAZETTEER = {"Atlantide": "FR", "Berlin": "DE"}
+    # pays sans portail national branché → international (HDX)
+    assert resolve_countries(["Atlantide", "Berlin", "Berlin"]) == ["*", "FR"]
+
+
+def test_route_by_location(portals):
+    routes = route(list(portals.values()), language="fr", locations=["Houston"])
+    assert _levels(routes, portals) == [("US", PRIMARY)]
+
+    routes = route(list(portals.values()), language="en", locations=["Londres", "Soudan", "Soudan"])
+    assert _levels(routes, portals) == [("HDX", PRIMARY), ("GB", PRIMARY)]
+
+
+def test_route_by_language_when_no_location(portals):
+    routes = route(list(portals.values()), language="fr", locations=[])
+    assert _levels(routes, portals) == [("FR", PRIMARY), ("CA", SECONDARY), ("HDX", SECONDARY)]
+
+    routes = route(list(portals.values()), language="en", locations=["nowhere"])
+    assert _levels(routes, portals) == [
+        ("US", PRIMARY), ("GB", PRIMARY), ("CA", SECONDARY), ("HDX", SECONDARY),
+    ]
+
+
+def test_unknown_connector_stays_primary(portals):
+    local = _Portal("local-catalog")
+    routes = route([portals["US"], local], language="fr", locations=["Alençon"])
+    assert [r.connector for r in routes] == [local]
+
+
+def test_run_connectors_applies_routing(monkeypatch, settings, portals):
+    settings.CONNECTOR_CACHE_ENABLED = False
+    settings.CONNECTOR_ROUTING_SECONDARY_KEYWORDS = 1
+    for name, code in [("data_gouv", "FR"), ("data_gov", "US"), ("data_canada", "CA"),
+                       ("data_uk", "GB"), ("hdx", "HDX")]:
+        monkeypatch.setitem(registry.BUILTIN, name, lambda p=portals[code]: p)
+    kws = [KeywordsResult(language="fr", sets=[KeywordSet(angle_title="A", keywords=["k1", "k2", "k3"])])]
+    extraction = ExtractionResult(language="fr", persons=[], organizations=[], locations=[],
+                                  dates=[], numbers=[])
+
+    pipeline.run_connectors(kws, extraction=extraction)
+
+    assert portals["FR"].calls == ["k1", "k2", "k3"]
+    assert portals["CA"].calls == ["k1"] and portals["HDX"].calls == ["k1"]
+    assert portals["US"].calls == [] and portals["GB"].calls == []
+
+
+def test_local_catalog_only_covers_routed_portals(monkeypatch, settings, portals):
+    from ai_engine.connectors import local_catalog
+
+    settings.LOCAL_CATALOG_ENABLED = True
+    settings.CONNECTORS_ACTIVE = ["data_gouv", "data_gov", "data_canada", "data_uk"]
+    for name, code in [("data_gouv", "FR"), ("data_gov", "US"), ("data_canada", "CA"), ("data_uk", "GB")]:
+        monkeypatch.setitem(registry.BUILTIN, name, lambda p=portals[code]: p)
+    monkeypatch.setattr(local_catalog, "harvested_portals", lambda: [HOSTS["US"], HOSTS["CA"], HOSTS["GB"]])
+    extraction = ExtractionResult(language="fr", persons=[], organizations=[], locations=[],
+                                  dates=[], numbers=[])
+
+    routes = pipeline.connector_routes(extraction)
+
+    assert [(type(r.connector).__name__, r.level) for r in routes] == [
+        ("_Portal", PRIMARY), ("LocalCatalogClient", SECONDARY),
+    ]
+    assert routes[0].connector is portals["FR"]
+    assert routes[1].connector.portals == [HOSTS["CA"]]      # US et GB écartés par le routage
@@ -0,0 +1,126 @@
+import re
+
+import pytest
+import responses
+
+from ai_engine.connectors import batching, cache_utils
+from ai_engine.connectors.data_gouv import BASE_URL as FR_URL, DataGouvClient
+from ai_engine.connectors.data_uk import UKGovClient
+from ai_engine.connectors.fanout import SearchJob, fan_out
+
+
+@pytest.fixture(autouse=True)
+def _batch(settings, tmp_path):
+    settings.CONNECTORS_BATCH_MODE = True
+    settings.CONNECTORS_BATCH_MAX_KEYWORDS = 5
+    settings.CONNECTOR_CACHE_DIR = str(tmp_path)
+    settings.CONNECTOR_RATE_LIMITS = {"default": {"rate": 0}}
+
+
+def _pkg(i, title, fmt="CSV"):
+    return {"id": f"id{i}", "name": f"ds-{i}", "title": title, "notes": "",
+            "res_format": [fmt], "res_url": [f"https://x/{i}.{fmt.lower()}"]}
+
+
+def test_attribute_matches_all_terms_with_plural_and_accents():
+    rec = {"title": "Émissions de CO2 des régions", "description": "", "organization": "ADEME"}
+    assert batching.attribute(rec, ["émission co2", "population", "régions"]) == ["émission co2", "régions"]
+    # aucun mot-clé entièrement couvert → non attribué
+    assert batching.attribute(rec, ["population", "émission méthane"]) == []
+    assert batching.attribute(rec, ["population", "chômage"]) == []
+
+
+@responses.activate
+def test_ckan_search_batch_one_request_for_all_keywords():
+    responses.add(
+        responses.GET,
+        re.compile(r"https://data\.gov\.uk/api/3/action/package_search.*"),
+        json={"result": {"count": 3, "results": [
+            _pkg(1, "Air quality London"), _pkg(2, "Road traffic counts"), _pkg(3, "Air quality Leeds"),
+        ]}},
+    )
+    out = UKGovClient().search_batch(["air quality", "traffic", "housing"], per_keyword=5)
+
+    assert len(responses.calls) == 1
+    params = responses.calls[0].request.params
+    assert params["q"] == "text:(air quality) OR text:(traffic) OR text:(housing)"
+    assert int(params["rows"]) == 12            # 3 mots-clés × 2 (MAX_RESULTS) × 2
+    assert [d.title for d in out["air quality"]] == ["Air quality London", "Air quality Leeds"]
+    assert [d.title for d in out["traffic"]] == ["Road traffic counts"]
+    assert out["housing"] == []
+
+
+@responses.activate
+def test_data_gouv_search_batch_or_query():
+    responses.add(responses.GET, f"{FR_URL}/datasets", json={"data": [{
+        "id": "a", "title": "Qualité de l'air", "slug": "qualite-air", "page": "https://fr/a",
+        "resources": [{"format": "csv", "url": "https://fr/a.csv"}],
+    }]})
+    out = DataGouvClient().search_batch(["qualité air", "bruit"], per_keyword=2)
+    assert responses.calls[0].request.params["q"] == "(qualite air) OR (bruit)"
+    assert [d.url for d in out["qualité air"]] == ["https://fr/a"] and out["bruit"] == []
+
+
+class _Batchable:
+    host = "batch.example"
+
+    def __init__(self):
+        self.batches, self.singles = [], []
+
+    def search(self, keyword, page_size=10):
+        self.singles.append(keyword)
+        return [f"{keyword}-single"]
+
+    def search_batch(self, keywords, *, per_keyword):
+        self.batches.append(list(keywords))
+        return {kw: [f"{kw}-batch"] for kw in keywords}
+
+
+def test_fan_out_shares_one_batch_per_angle_and_reuses_cache():
+    conn = _Batchable()
+    jobs = [SearchJob(0, kw, conn) for kw in ("k1", "k2", "k3")]
+    seen = []
+    fan_out([jobs], lambda j, o: seen.append((j.keyword, o)) or False, max_per_keyword=2, limit=5)
+
+    assert conn.batches == [["k1", "k2", "k3"]] and conn.singles == []
+    assert seen == [("k1", ["k1-batch"]), ("k2", ["k2-batch"]), ("k3", ["k3-batch"])]
+
+    # second passage : tout vient du cache, seul le mot-clé nouveau part en requête
+    seen.clear()
+    jobs.append(SearchJob(0, "k4", conn))
+    fan_out([jobs], lambda j, o: seen.append(o) or False, max_per_keyword=2, limit=5)
+    assert conn.batches[-1] == ["k4"]
+    assert cache_utils.cache_stats()["_Batchable"]["hits"] == 3
+
+
+def test_fan_out_chunks_keywords_and_stops_early(settings):
+    settings.CONNECTORS_BATCH_MAX_KEYWORDS = 2
+    settings.CONNECTOR_CACHE_ENABLED = False
+    conn = _Batchable()
+    jobs = [SearchJob(0, f"k{i}", conn) for i in range(5)]
+    fan_out([jobs], lambda j, o: False, max_per_keyword=2, limit=5)
+    assert conn.batches == [["k0", "k1"], ["k2", "k3"], ["k4"]]
+
+    settings.CONNECTORS_BATCH_MODE = False
+    fan_out([jobs[:2]], lambda j, o: False, max_per_keyword=2, limit=5)
+    assert conn.singles == ["k0", "k1"]
+
+
+
+def test_batch_slices_are_cached_apart_and_only_when_non_empty(settings):
+    conn = _Batchable()
+    jobs = [SearchJob(0, kw, conn) for kw in ("k1", "k2")]
+    conn.search_batch = lambda keywords, *, per_keyword: {"k1": ["k1-batch"], "k2": []}
+    fan_out([jobs], lambda j, o: False, max_per_keyword=2, limit=5)
+
+    # tranche non vide resservie, tranche vide redemandée
+    batches = []
+    conn.search_batch = lambda keywords, *, per_keyword: batches.append(list(keywords)) or {}
+    fan_out([jobs], lambda j, o: False, max_per_keyword=2, limit=5)
+    assert batches == [["k2"]]
+
+    # mode non groupé : la tranche OR n'est pas servie à la place de search()
+    settings.CONNECTORS_BATCH_MODE = False
+    seen = []
+    fan_out([jobs], lambda j, o: seen.append(o) or False, max_per_keyword=2, limit=5)
+    assert seen == [["k1-single"], ["k2-single"]]
@@ -0,0 +1,137 @@
+import threading
+import time
+
+import pytest
+
+from ai_engine import pipeline
+from ai_engine.connectors import registry
+from ai_engine.connectors.fanout import SearchJob, connector_host, fan_out
+from ai_engine.schemas import DatasetSuggestion, KeywordSet, KeywordsResult
+
+
+@pytest.fixture(autouse=True)
+def _no_cache(settings):
+    settings.CONNECTOR_CACHE_ENABLED = False
+
+
+def _ds(url):
+    return DatasetSuggestion(title=url, source_name="stub", source_url=url)
+
+
+class _Stub:
+    """Connecteur factice : latence fixe, suivi de la concurrence par hôte."""
+
+    active = {}
+    peak = {}
+    lock = threading.Lock()
+
+    def __init__(self, host, delay=0.05, urls=None):
+        self.host = host
+        self.delay = delay
+        self.urls = urls
+        self.calls = []
+
+    def search(self, keyword, page_size=10):
+        with self.lock:
+            self.calls.append(keyword)
+            n = self.active.get(self.host, 0) + 1
+            self.active[self.host] = n
+            self.peak[self.host] = max(self.peak.get(self.host, 0), n)
+        time.sleep(self.delay)
+        with self.lock:
+            self.active[self.host] -= 1
+        urls = self.urls if self.urls is not None else [f"https://{self.host}/{keyword}"]
+        return [_ds(u) for u in urls]
+
+
+def _keywords(*kws):
+    return [KeywordsResult(language="fr", sets=[KeywordSet(angle_title="A", keywords=list(kws))])]
+
+
+def test_run_connectors_keeps_serial_order_and_dedupes(monkeypatch):
+    shared = _Stub("a.example", delay=0.05, urls=["https://same/1"])
+    slow = _Stub("b.example", delay=0.15)
+    fast = _Stub("c.example", delay=0.0)
+    monkeypatch.setitem(registry.BUILTIN, "data_gouv", lambda: shared)
+    monkeypatch.setitem(registry.BUILTIN, "data_gov", lambda: slow)
+    monkeypatch.setitem(registry.BUILTIN, "data_canada", lambda: fast)
+    monkeypatch.setitem(registry.BUILTIN, "data_uk", lambda: _Stub("d.example"))
+    monkeypatch.setitem(registry.BUILTIN, "hdx", lambda: _Stub("e.example"))
+
+    out = pipeline.run_connectors(_keywords("k1", "k2"), max_total_per_angle=6)
+    urls = [s.source_url for s in out[0]]
+    # ordre historique : k1 × (a, b, c, d, e) puis k2 ; doublon "same/1" écarté
+    assert urls == [
+        "https://same/1", "https://b.example/k1", "https://c.example/k1",
+        "https://d.example/k1", "https://e.example/k1", "https://b.example/k2",
+    ]
+    assert all(s.found_by == "CONNECTOR" and s.angle_idx == 0 for s in out[0])
+
+
+def test_fan_out_caps_per_host_and_cancels_when_angle_full(settings):
+    settings.CONNECTORS_MAX_CONCURRENCY = 4
+    settings.CONNECTORS_MAX_PER_HOST = 1
+    _Stub.peak.clear()
+    conn = _Stub("one.example", delay=0.03)
+    jobs = [[SearchJob(0, f"k{i}", conn) for i in range(10)]]
+    consumed = []
+
+    def consume(job, outcome):
+        consumed.append(job.keyword)
+        return len(consumed) == 2
+
+    fan_out(jobs, consume, max_per_keyword=2, limit=5)
+    assert consumed == ["k0", "k1"]
+    assert _Stub.peak["one.example"] == 1
+    assert len(conn.calls) < 10          # appels restants annulés
+
+
+def test_cancelled_call_keeps_its_host_slot_until_done(settings):
+    settings.CONNECTORS_MAX_CONCURRENCY = 4
+    settings.CONNECTORS_MAX_PER_HOST = 1
+    _Stub.peak.clear()
+    fast, shared = _Stub("fast.example", delay=0.0), _Stub("shared.example", delay=0.1)
+    # l'angle 0 est plein dès son premier résultat : son appel à shared.example,
+    # déjà parti, est annulé côté asyncio mais son thread continue
+    jobs = [[SearchJob(0, "k0", fast), SearchJob(0, "orphan", shared)],
+            [SearchJob(1, "a1", shared), SearchJob(1, "a2", shared)]]
+
+    fan_out(jobs, lambda job, outcome: job.angle_idx == 0, max_per_keyword=2, limit=5)
+    time.sleep(0.15)                       # l'appel orphelin se termine en arrière-plan
+    assert "orphan" in shared.calls
+    assert _Stub.peak["shared.example"] == 1
+
+
+def test_busy_host_does_not_hold_global_slots(settings):
+    settings.CONNECTORS_MAX_CONCURRENCY = 2
+    settings.CONNECTORS_MAX_PER_HOST = 1
+    busy, idle = _Stub("busy.example", delay=0.1), _Stub("idle.example", delay=0.0)
+    done = {}
+    t0 = time.perf_counter()
+
+    def consume(job, outcome):
+        done[job.keyword] = time.perf_counter() - t0
+        return False
+
+    jobs = [[SearchJob(0, f"k{i}", busy) for i in range(4)], [SearchJob(1, "idle", idle)]]
+    fan_out(jobs, consume, max_per_keyword=2, limit=5)
+    assert done["idle"] < 0.08             # pas derrière la file de busy.example
+
+
+def test_fan_out_reports_connector_errors():
+    class _Broken:
+        host = "x.example"
+
+        def search(self, keyword, page_size=10):
+            raise ConnectionError("down")
+
+    seen = []
+    fan_out([[SearchJob(0, "k", _Broken())]], lambda j, o: seen.append(o) or False,
+            max_per_keyword=2, limit=5)
+    assert isinstance(seen[0], ConnectionError)
+
+
+def test_connector_host_falls_back_to_module_base_url():
+    from ai_engine.connectors.data_gouv import DataGouvClient
+
+    assert connector_host(DataGouvClient()) == "www.data.gouv.fr"
@@ -0,0 +1,43 @@
+import pytest
+import responses
+
+from ai_engine.connectors import http
+from ai_engine.connectors.data_gouv import DataGouvClient
+
+
+@pytest.fixture(autouse=True)
+def _fresh_sessions():
+    http.close_all()
+    yield
+    http.close_all()
+
+
+def test_one_pooled_session_per_host(settings):
+    settings.HTTP_POOL_MAXSIZE = {"default": 2, "big.example": 8}
+    a = http.session_for("big.example")
+    assert http.session_for("big.example") is a
+    assert http.session_for("small.example") is not a
+    assert a.get_adapter("https://big.example/")._pool_maxsize == 8
+    assert http.session_for("small.example").get_adapter("https://small.example/")._pool_maxsize == 2
+
+
+def test_timeouts_per_host(settings):
+    settings.CONNECTOR_DEFAULT_TIMEOUT = (3, 7)
+    settings.CONNECTOR_TIMEOUTS = {"catalog.data.gov": [5, 8]}
+    assert http.timeout_for("catalog.data.gov") == (5, 8)
+    assert http.timeout_for("www.data.gouv.fr") == (3, 7)
+
+
+@responses.activate
+def test_connector_goes_through_shared_session_with_gzip():
+    responses.add(
+        responses.GET,
+        "https://www.data.gouv.fr/api/1/datasets",
+        json={"data": []},
+        status=200,
+    )
+    assert list(DataGouvClient().search("climat")) == []
+    sent = responses.calls[0].request
+    assert "gzip" in sent.headers["Accept-Encoding"]
+    assert sent.headers["User-Agent"].startswith("DatascopeBot")
+    assert "www.data.gouv.fr" in http._sessions
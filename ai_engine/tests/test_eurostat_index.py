@@ -0,0 +1,99 @@
+import time
+
+import pytest
+import responses
+
+from ai_engine.connectors import eurostat
+from ai_engine.connectors.eurostat import CatalogueIndex, EurostatClient, parse_toc
+from ai_engine.schemas import DatasetSuggestion
+
+TOC_URL = f"{eurostat.BASE_URL}{eurostat.TOC_PATH}"
+TOC = "\n".join([
+    '"title"\t"code"\t"type"\t"last update of data"\t"last table structure change"',
+    '"Database by themes"\t"data"\t"folder"\t" "\t" "',
+    '"    Economy and finance"\t"economy"\t"folder"\t" "\t" "',
+    '"        GDP and main components (output, expenditure and income)"\t"nama_10_gdp"\t"dataset"\t"19.04.2024"\t"08.02.2024"',
+    '"        Real GDP growth rate"\t"tec00115"\t"table"\t"22.04.2024"\t" "',
+    '"        Population on 1 January by age and sex"\t"demo_pjan"\t"dataset"\t"15.03.2024"\t" "',
+    '"    Main tables"\t"main"\t"folder"\t" "\t" "',
+    '"        Real GDP growth rate"\t"tec00115"\t"table"\t"22.04.2024"\t" "',
+])
+
+
+@pytest.fixture(autouse=True)
+def _fresh(settings, tmp_path):
+    settings.CONNECTOR_CACHE_DIR = str(tmp_path)
+    settings.CONNECTOR_RATE_LIMITS = {"default": {"rate": 0}}
+    eurostat.reset_catalogues()
+    yield
+    eurostat.reset_catalogues()
+
+
+def test_parse_toc_skips_folders_and_duplicates():
+    entries = parse_toc(TOC)
+    assert [e[0] for e in entries] == ["nama_10_gdp", "tec00115", "demo_pjan"]
+    assert entries[0][1].startswith("GDP and main components") and entries[0][2] == "2024-04-19"
+
+
+def test_index_matches_titles_and_codes():
+    index = CatalogueIndex(parse_toc(TOC))
+    assert [e[0] for e in index.search("GDP")] == ["tec00115", "nama_10_gdp"]   # titre court d'abord
+    assert [e[0] for e in index.search("growth rates gdp")] == ["tec00115"]
+    assert [e[0] for e in index.search("demo_pjan")] == ["demo_pjan"]
+    assert [e[0] for e in index.search("pjan")] == ["demo_pjan"]
+    assert index.search("unknown gdp") == [] and index.search("the") == []
+
+
+@responses.activate
+def test_client_downloads_once_per_language_and_converts():
+    responses.add(responses.GET, TOC_URL, body=TOC)
+    eurostat.warm_async("en").join(5)
+    client = EurostatClient()
+    [ds] = list(client.search("population", page_size=5))
+    list(client.search("gdp"))
+    assert len(responses.calls) == 1
+    assert responses.calls[0].request.params["lang"] == "en"
+
+    sugg = client.to_suggestion(ds)
+    assert isinstance(sugg, DatasetSuggestion)
+    assert sugg.source_url.endswith("/demo_pjan/default/table")
+    assert sugg.last_modified == "2024-03-15"
+
+    eurostat.warm_async("fr").join(5)
+    list(EurostatClient(lang="fr").search("gdp"))
+    assert responses.calls[1].request.params["lang"] == "fr"
+
+
+def _join_warm_up(lang):
+    thread = eurostat._warming.get(lang)
+    if thread is not None:
+        thread.join(5)
+
+
+@responses.activate
+def test_client_search_never_loads_the_catalogue_itself(settings):
+    responses.add(responses.GET, TOC_URL, body=TOC)
+    client = EurostatClient()
+
+    assert list(client.search("gdp")) == []                  # pas prêt : rien, sans attendre
+    _join_warm_up("en")
+    assert [d.code for d in client.search("gdp")] == ["tec00115", "nama_10_gdp"]
+
+    settings.EUROSTAT_CATALOGUE_TTL = 0.01
+    time.sleep(0.02)
+    responses.replace(responses.GET, TOC_URL, body=TOC.replace("demo_pjan", "demo_new"))
+    assert [d.code for d in client.search("population")] == ["demo_pjan"]   # périmé, servi
+    _join_warm_up("en")
+    assert eurostat.catalogue().search("population")[0][0] == "demo_new"
+
+
+@responses.activate
+def test_refresh_after_ttl_keeps_index_on_failure(settings):
+    settings.EUROSTAT_CATALOGUE_TTL = 0.05
+    responses.add(responses.GET, TOC_URL, body=TOC)
+    assert len(eurostat.catalogue()) == 3
+
+    time.sleep(0.06)
+    responses.replace(responses.GET, TOC_URL, status=500)
+    settings.RETRY_POLICIES = {"ec.europa.eu": {"attempts": 1}}
+    assert len(eurostat.catalogue()) == 3          # échec → cache disque / index précédent
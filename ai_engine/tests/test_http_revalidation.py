@@ -0,0 +1,106 @@
+import json
+import time
+
+import pytest
+import responses
+
+from ai_engine import metrics
+from ai_engine.connectors import cache_utils, eurostat, http, streaming
+from ai_engine.connectors.data_uk import UKGovClient
+
+UK_API = "https://data.gov.uk/api/3/action/package_search"
+PAGE = {"result": {"count": 1, "results": [{
+    "id": "id-1", "name": "ds-1", "title": "Air", "res_format": ["CSV"], "res_url": ["https://x/a.csv"],
+}]}}
+
+
+@pytest.fixture(autouse=True)
+def _fresh(settings, tmp_path):
+    settings.CONNECTOR_CACHE_DIR = str(tmp_path)
+    settings.CONNECTOR_RATE_LIMITS = {"default": {"rate": 0}}
+    metrics.reset(http.METRICS_GROUP)
+    eurostat.reset_catalogues()
+    yield
+    eurostat.reset_catalogues()
+
+
+def _etag_server(body, etag='"v1"'):
+    def _cb(request):
+        if request.headers.get("If-None-Match") == etag:
+            return 304, {"ETag": etag}, ""
+        return 200, {"ETag": etag, "Content-Type": "application/json"}, body
+    return _cb
+
+
+@responses.activate
+def test_304_replays_stored_body_and_counts_saved_bytes():
+    body = json.dumps(PAGE)
+    responses.add_callback(responses.GET, UK_API, callback=_etag_server(body))
+    first = [d.title for d in UKGovClient().search("air")]
+    second = [d.title for d in UKGovClient().search("air")]
+
+    assert first == second == ["Air"]
+    assert "If-None-Match" not in responses.calls[0].request.headers
+    assert responses.calls[1].request.headers["If-None-Match"] == '"v1"'
+    assert http.revalidation_stats()["data.gov.uk"] == {
+        "conditional": 1, "not_modified": 1, "bytes_saved": len(body),
+    }
+
+
+@responses.activate
+def test_streamed_page_with_validator_is_not_read_in_full():
+    metrics.reset(streaming.METRICS_GROUP)
+    page = {"result": {"count": 300, "results": [{
+        "id": f"id-{i}", "name": f"ds-{i}", "title": f"Air {i}", "notes": "x" * 8000,
+        "res_format": ["CSV"], "res_url": ["https://x/a.csv"],
+    } for i in range(300)]}}
+    body = json.dumps(page)
+    responses.add_callback(responses.GET, UK_API, callback=_etag_server(body))
+
+    assert len(list(UKGovClient().search("air"))) == 2
+    assert streaming.streaming_stats()["data.gov.uk"]["bytes_read"] <= 2 * streaming.CHUNK_SIZE < len(body) // 10
+
+    assert len(cache_utils.store(http.VALIDATOR_CACHE)) == 0     # lecture arrêtée tôt : rien stocké
+
+
+@responses.activate
+def test_streamed_page_read_to_the_end_is_stored():
+    responses.add_callback(responses.GET, UK_API, callback=_etag_server(json.dumps(PAGE)))
+    assert len(list(UKGovClient().search("air"))) == 1
+    assert len(cache_utils.store(http.VALIDATOR_CACHE)) == 1
+
+
+@responses.activate
+def test_last_modified_validator_and_changed_content():
+    responses.add(responses.GET, "https://p.example/x", body="old",
+                  headers={"Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"})
+    assert http.get("https://p.example/x", conditional=True).text == "old"
+
+    responses.replace(responses.GET, "https://p.example/x", body="new", headers={"ETag": '"v2"'})
+    r = http.get("https://p.example/x", conditional=True)
+    assert responses.calls[1].request.headers["If-Modified-Since"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert r.text == "new"                       # 200 : nouveau corps stocké
+    assert "not_modified" not in http.revalidation_stats()["p.example"]
+
+
+@responses.activate
+def test_disabled_sends_plain_requests(settings):
+    settings.CONNECTOR_CONDITIONAL_REQUESTS = False
+    responses.add(responses.GET, "https://p.example/y", body="a", headers={"ETag": '"e"'})
+    http.get("https://p.example/y", conditional=True)
+    http.get("https://p.example/y", conditional=True)
+    assert "If-None-Match" not in responses.calls[1].request.headers
+
+
+@responses.activate
+def test_eurostat_catalogue_refresh_revalidates(settings):
+    settings.EUROSTAT_CATALOGUE_TTL = 0.01
+    toc = '"title"\t"code"\t"type"\n"GDP"\t"nama_10_gdp"\t"dataset"\n'
+    responses.add_callback(
+        responses.GET, f"{eurostat.BASE_URL}{eurostat.TOC_PATH}",
+        callback=_etag_server(toc, etag='"toc1"'),
+    )
+    assert len(eurostat.catalogue()) == 1
+    time.sleep(0.02)
+    assert len(eurostat.catalogue()) == 1          # TTL écoulé → 304
+    assert http.revalidation_stats()["ec.europa.eu"]["not_modified"] == 1
@@ -0,0 +1,107 @@
+import json
+
+import pytest
+import responses
+
+from ai_engine import metrics
+from ai_engine.connectors import streaming
+from ai_engine.connectors.data_uk import UKGovClient
+
+UK_API = "https://data.gov.uk/api/3/action/package_search"
+
+
+@pytest.fixture(autouse=True)
+def _fresh(settings):
+    settings.CONNECTOR_CACHE_ENABLED = False
+    settings.CONNECTOR_RATE_LIMITS = {"default": {"rate": 0}}
+    metrics.reset(streaming.METRICS_GROUP)
+
+
+def _chunks(data: bytes, size: int):
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+def _package(i, formats=("CSV",)):
+    return {"id": f"id-{i}", "name": f"ds-{i}", "title": f"Données n°{i} — été",
+            "notes": "x" * 2000, "res_format": list(formats), "res_url": [f"https://x/{i}.csv"] * len(formats)}
+
+
+@pytest.mark.parametrize("size", [1, 3, 7, 4096])
+def test_iter_array_any_chunking(size):
+    doc = {"help": "h", "success": True, "result": {
+        "count": 12345, "facets": {"a": [1, {"b": "]}"}]}, "results": [_package(i) for i in range(3)],
+        "sort": "score desc", "ratio": -1.5e3,
+    }}
+    meta = {}
+    items = list(streaming.iter_array(_chunks(json.dumps(doc, ensure_ascii=False).encode(), size),
+                                      ("result", "results"), meta))
+    assert items == doc["result"]["results"]
+    assert meta == {"count": 12345, "sort": "score desc", "ratio": -1500.0}
+
+
+def test_iter_array_stops_reading_early():
+    body = json.dumps({"result": {"count": 500, "results": [_package(i) for i in range(500)]}}).encode()
+    read = []
+
+    def chunks():
+        for c in _chunks(body, 1024):
+            read.append(len(c))
+            yield c
+
+    items = streaming.iter_array(chunks(), ("result", "results"))
+    first = [next(items) for _ in range(2)]
+    items.close()
+    assert [p["id"] for p in first] == ["id-0", "id-1"]
+    assert sum(read) < len(body) // 50
+
+
+def test_iter_array_missing_path_and_malformed():
+    assert list(streaming.iter_array([b'{"success": false, "error": {"message": "x"}}'], ("result", "results"))) == []
+    with pytest.raises(ValueError):
+        list(streaming.iter_array([b'{"result": {"results": [{"id": 1} {"id": 2}]}}'], ("result", "results")))
+
+
+@responses.activate
+def test_ckan_search_stops_after_max_results():
+    page = {"result": {"count": 300, "results": [_package(0, formats=())] + [_package(i) for i in range(1, 300)]}}
+    responses.add(responses.GET, UK_API, json=page)
+
+    titles = [d.title for d in UKGovClient().search("air")]
+
+    assert titles == ["Données n°1 — été", "Données n°2 — été"]      # id-0 sans format ignoré
+    stats = streaming.streaming_stats()["data.gov.uk"]
+    assert stats["streamed"] == stats["stopped_early"] == 1
+    assert stats["bytes_read"] <= streaming.CHUNK_SIZE < len(json.dumps(page)) // 5
+
+
+@responses.activate
+def test_disabled_reads_whole_page(settings):
+    settings.CONNECTOR_STREAMING_JSON = False
+    responses.add(responses.GET, UK_API, json={"result": {"count": 3, "results": [_package(i) for i in range(3)]}})
+    assert len(list(UKGovClient().search("air"))) == 2
+    assert streaming.streaming_stats() == {}
+
+
+@responses.activate
+def test_body_read_error_rereads_the_page():
+    page = {"result": {"count": 3, "results": [_package(i) for i in range(3)]}}
+    body = json.dumps(page)
+    cut = body.index('{"id": "id-1"')
+    responses.add(responses.GET, UK_API, body=body[:cut + 20])      # corps tronqué après id-0
+    responses.add(responses.GET, UK_API, json=page)                 # relecture classique
+
+    ids = [d.id for d in UKGovClient().search("air")]
+
+    assert ids == ["id-0", "id-1"]                                   # id-0 gardé, pas produit deux fois
+    assert len(responses.calls) == 2
+    assert streaming.streaming_stats()["data.gov.uk"]["read_errors"] == 1
+
+
+@responses.activate
+def test_body_read_error_keeps_items_when_reread_fails():
+    body = json.dumps({"result": {"count": 3, "results": [_package(i) for i in range(3)]}})
+    cut = body.index('{"id": "id-1"')
+    responses.add(responses.GET, UK_API, body=body[:cut + 20])
+    responses.add(responses.GET, UK_API, status=500)
+
+    assert [d.id for d in UKGovClient().search("air")] == ["id-0"]
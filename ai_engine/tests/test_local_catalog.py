@@ -0,0 +1,105 @@
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import responses
+from django.core.management import call_command
+
+from ai_engine.connectors import ckan, local_catalog
+from ai_engine.connectors.local_catalog import LocalCatalogClient, harvest, harvested_portals
+
+API = "https://data.gov.uk/api/3/action/package_search"
+
+
+def _pkg(i, title, modified, notes="", fmt="CSV"):
+    return {
+        "id": f"id-{i}",
+        "name": f"ds-{i}",
+        "title": title,
+        "notes": notes,
+        "organization": {"title": "Office for National Statistics"},
+        "license_title": "OGL",
+        "metadata_modified": modified,
+        "resources": [{"format": fmt, "url": f"https://example.org/{i}.{fmt.lower()}"}],
+    }
+
+
+@pytest.fixture
+def db(tmp_path, settings):
+    settings.LOCAL_CATALOG_PATH = str(tmp_path / "catalog.sqlite3")
+    return settings.LOCAL_CATALOG_PATH
+
+
+@responses.activate
+def test_incremental_harvest_uses_metadata_modified_cursor(db):
+    page1 = [
+        _pkg(1, "Air quality monitoring", "2024-01-01T00:00:00", "Nitrogen dioxide levels"),
+        _pkg(2, "Road traffic counts", "2024-01-02T00:00:00"),
+    ]
+    responses.add(responses.GET, API, json={"result": {"count": 2, "results": page1}})
+    responses.add(responses.GET, API, json={"result": {"count": 0, "results": []}})
+
+    assert harvest("data.gov.uk", rows=2) == 2
+    assert harvested_portals() == ["data.gov.uk"]
+
+    # 2e moisson : repart du curseur
+    responses.add(responses.GET, API, json={"result": {"count": 1, "results": [
+        _pkg(2, "Road traffic counts (revised)", "2024-02-01T00:00:00"),
+    ]}})
+    harvest("data.gov.uk", rows=2)
+    qs = parse_qs(urlparse(responses.calls[-1].request.url).query)
+    assert qs["fq"] == ["metadata_modified:[2024-01-02T00:00:00Z TO *]"]
+    assert qs["sort"] == ["metadata_modified asc"]
+
+    titles = [s.title for s in LocalCatalogClient().search("traffic")]
+    assert titles == ["Road traffic counts (revised)"]  # upsert, pas de doublon
+
+
+@responses.activate
+def test_harvest_resolves_organization_slugs(db, settings, tmp_path):
+    settings.CONNECTOR_CACHE_DIR = str(tmp_path / "cache")
+    ckan.clear_organization_titles()
+    responses.add(responses.GET, API, json={"result": {"count": 1, "results": [
+        {**_pkg(1, "Census", "2024-01-01T00:00:00"), "organization": "ons"},   # fl : slug seul
+    ]}})
+    responses.add(responses.GET, API, json={"result": {"count": 0, "results": []}})
+    responses.add(responses.GET, "https://data.gov.uk/api/3/action/organization_show",
+                  json={"result": {"name": "ons", "title": "Office for National Statistics"}})
+
+    harvest("data.gov.uk", rows=1)
+    [ds] = LocalCatalogClient().search("census")
+    assert ds.organization == "Office for National Statistics"
+    ckan.clear_organization_titles()
+
+
+def test_bm25_ranks_title_matches_first(db):
+    rows = [
+        local_catalog._row("data.gov.uk", _pkg(1, "Hospital beds", "2024-01-01T00:00:00",
+                                              "Mentions air pollution once")),
+        local_catalog._row("data.gov.uk", _pkg(2, "Air pollution by borough", "2024-01-01T00:00:00")),
+        local_catalog._row("data.gov.uk", _pkg(3, "Air pollution memo", "2024-01-01T00:00:00", fmt="DOCX")),
+    ]
+    assert rows[2] is None  # pas de format exploitable → non indexé
+    conn = local_catalog.connect(db)
+    with conn:
+        conn.executemany(local_catalog._UPSERT, rows[:2])
+    conn.close()
+
+    results = list(LocalCatalogClient().search("Pollution de l'air", page_size=5))
+    assert [r.title for r in results][0] == "Air pollution by borough"
+    assert results[0].source_name == "data.gov.uk"
+    assert results[0].source_url == "https://data.gov.uk/dataset/ds-2"
+    assert results[0].formats == ["csv"]
+    assert [r.title for r in results] == ["Air pollution by borough", "Hospital beds"]
+
+
+def test_missing_index_returns_nothing(tmp_path):
+    assert list(LocalCatalogClient(path=str(tmp_path / "absent.sqlite3")).search("air")) == []
+
+
+@responses.activate
+def test_harvest_command(db):
+    responses.add(responses.GET, API, json={"result": {"count": 1, "results": [
+        _pkg(1, "Air quality", "2024-01-01T00:00:00"),
+    ]}})
+    call_command("harvest_catalog", "--portal", "data.gov.uk", "--rows", "5")
+    assert [s.title for s in LocalCatalogClient().search("air")] == ["Air quality"]
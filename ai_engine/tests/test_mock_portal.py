@@ -0,0 +1,65 @@
+import pytest
+from django.test import override_settings
+
+from ai_engine import pipeline
+from ai_engine.connectors import cache_utils, http
+from ai_engine.connectors.fanout import search_one
+from ai_engine.connectors.data_gouv import DataGouvClient
+from ai_engine.connectors.data_uk import UKGovClient
+from ai_engine.connectors.mock_portal import MockConfig
+from ai_engine.management.commands.bench_connectors import percentile
+from ai_engine.schemas import KeywordSet, KeywordsResult
+
+
+def test_ckan_pages_and_package_show(mock_portal):
+    client = UKGovClient()
+    client.MAX_RESULTS = None
+    records = list(client.iter_packages("air quality", rows=4))
+
+    assert len(records) == 3 * 4                     # pages × rows, puis arrêt sur `count`
+    assert records[0].id == "air-quality-0" and records[0].formats
+    assert mock_portal.stats["package_search"] == 3
+
+    shown = http.get("https://catalog.data.gov/api/3/action/package_show", params={"id": "x-1"}).json()
+    assert shown["result"]["id"] == "x-1"
+
+
+def test_data_gouv_datasets(mock_portal):
+    results = list(DataGouvClient().search("qualité air", page_size=1))
+    assert [ds.id for ds in results] == ["qualite-air-0", "qualite-air-1"]   # suit next_page
+    assert mock_portal.stats["datasets"] == 2
+
+
+@pytest.mark.parametrize("mock_portal", [MockConfig(error_rate=1.0, seed=1)], indirect=True)
+def test_errors_are_injected(mock_portal):
+    r = http.get("https://data.gov.uk/api/3/action/package_search", params={"q": "x"})
+    assert r.status_code == 503
+    assert mock_portal.stats["errors"] == 1
+
+
+def test_run_connectors_against_mock(mock_portal, settings):
+    settings.CONNECTORS_ACTIVE = ["data_gouv", "data_uk"]
+    kws = [KeywordsResult(language="en", sets=[KeywordSet(angle_title="A", keywords=["rainfall"])])]
+
+    [suggestions] = pipeline.run_connectors(kws, max_total_per_angle=10)
+
+    assert {s.source_name for s in suggestions} == {"data.gouv.fr", "data.gov.uk"}
+    assert len(suggestions) == 4
+
+
+def test_redirected_results_do_not_reach_real_cache(mock_portal, settings, tmp_path):
+    settings.CONNECTOR_CACHE_DIR = str(tmp_path)
+    settings.CONNECTOR_CACHE_ENABLED = True
+    client = DataGouvClient()
+    assert len(search_one(client, "rainfall", 2, 5)) == 2
+
+    redirected = cache_utils._cache_dir()
+    with override_settings(CONNECTOR_ORIGIN_OVERRIDES={}):
+        assert cache_utils._cache_dir() == str(tmp_path) != redirected
+        assert len(cache_utils.store("DataGouvClient")) == 0      # rien sous les clés du vrai portail
+    assert len(cache_utils.store("DataGouvClient")) == 1
+
+
+def test_percentile():
+    assert percentile([5, 1, 3, 2, 4], 50) == 3
+    assert percentile([5, 1, 3, 2, 4], 99) == 5
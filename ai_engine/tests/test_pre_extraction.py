@@ -0,0 +1,61 @@
+from ai_engine.pre_extraction import detect_language, extract_dates, extract_numbers, pre_extract
+from ai_engine.schemas import NamedEntitiesResult
+import ai_engine.chains.extraction as extraction
+
+FR = (
+    "L'INSEE a publié un rapport le 4 janvier 2023 révélant que 32 % des ménages "
+    "vivent à moins de 15 km de leur travail. Le projet coûte 1,5 million d'euros, "
+    "soit 12 000 euros par an depuis 2010. Le 12/03/2024, 2000 personnes manifestaient."
+)
+EN = (
+    "On March 12, 2024, officials said 45% of adults were affected, up from 2019. "
+    "The $3.5 billion plan covers 1,200 people between 2010-2020."
+)
+
+
+def _by_raw(numbers):
+    return {n.raw: n for n in numbers}
+
+
+def test_detect_language():
+    assert detect_language(FR) == "fr"
+    assert detect_language(EN) == "en"
+
+
+def test_french_numbers():
+    nums = _by_raw(extract_numbers(FR, "fr"))
+    assert nums["32 %"].value == 32 and nums["32 %"].unit == "%"
+    assert nums["15 km"].unit == "km"
+    assert nums["1,5 million d'euros"].value == 1_500_000
+    assert nums["1,5 million d'euros"].unit == "€"
+    assert nums["12 000 euros"].value == 12_000
+    assert nums["2000 personnes"].unit == "personnes"
+    # années et composantes de dates ne sont pas des nombres
+    assert "2010" not in nums and "2023" not in nums
+
+
+def test_english_numbers():
+    nums = _by_raw(extract_numbers(EN, "en"))
+    assert nums["45%"].value == 45
+    assert nums["$3.5 billion"].value == 3.5e9 and nums["$3.5 billion"].unit == "$"
+    assert nums["1,200 people"].value == 1200
+
+
+def test_dates_fr_and_en():
+    assert extract_dates(FR, "fr") == ["2023-01-04", "2010", "2024-03-12"]
+    assert extract_dates(EN, "en") == ["2024-03-12", "2019", "2010", "2020"]
+    assert extract_dates("Publié le 2024-07-04, révisé en mars 2025.") == ["2024-07-04", "2025-03"]
+
+
+def test_extraction_run_merges_llm_entities_with_regex(monkeypatch):
+    class _Chain:
+        def invoke(self, _):
+            return NamedEntitiesResult(
+                language="fr", persons=[], organizations=["INSEE"], locations=["Alençon"]
+            )
+
+    monkeypatch.setattr(extraction, "_build_chain", lambda *_a, **_k: _Chain())
+    res = extraction.run(FR)
+    assert res.organizations == ["INSEE"]
+    assert res.dates == pre_extract(FR).dates
+    assert any(n.unit == "%" for n in res.numbers)
@@ -0,0 +1,64 @@
+import asyncio
+import time
+
+import pytest
+import responses
+
+from ai_engine import metrics
+from ai_engine.connectors import eurostat, ratelimit
+from ai_engine.connectors.ratelimit import TokenBucket, limiter, reset_limiters
+
+
+@pytest.fixture(autouse=True)
+def _fresh(settings):
+    settings.CONNECTOR_RATE_LIMITS = {"default": {"rate": 0}}
+    reset_limiters()
+    metrics.reset(ratelimit.METRICS_GROUP)
+    yield
+    reset_limiters()
+
+
+def test_no_delay_within_burst():
+    bucket = TokenBucket("h", rate=10, burst=3)
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    # 4e et 5e jetons : réservés à la suite (0.1 s, puis 0.2 s)
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.02)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.02)
+
+
+def test_sync_and_async_acquire_wait_only_when_exhausted():
+    bucket = TokenBucket("h", rate=20, burst=1)
+    t0 = time.monotonic()
+    bucket.acquire()
+    bucket.acquire()
+    assert 0.03 <= time.monotonic() - t0 < 0.2
+
+    async def _two():
+        await bucket.acquire_async()
+        await bucket.acquire_async()
+
+    t0 = time.monotonic()
+    asyncio.run(_two())
+    assert time.monotonic() - t0 >= 0.04
+    assert metrics.snapshot(ratelimit.METRICS_GROUP)["h"]["delayed"] >= 3
+
+
+def test_per_host_configuration(settings):
+    settings.CONNECTOR_RATE_LIMITS = {"default": {"rate": 5, "burst": 5}, "slow.example": {"rate": 1}}
+    assert limiter("slow.example").rate == 1 and limiter("slow.example").burst == 5
+    assert limiter("other.example").rate == 5
+    assert limiter("slow.example") is limiter("slow.example")
+
+
+@responses.activate
+def test_eurostat_answers_locally_without_artificial_delay(settings):
+    settings.CONNECTOR_CACHE_ENABLED = False
+    eurostat.reset_catalogues()
+    toc = '"title"\t"code"\t"type"\n' + "".join(f'"GDP flow {i}"\t"DS{i}"\t"dataset"\n' for i in range(20))
+    responses.add(responses.GET, f"{eurostat.BASE_URL}{eurostat.TOC_PATH}", body=toc)
+    t0 = time.monotonic()
+    assert len(list(eurostat.search("gdp"))) == 20
+    assert len(list(eurostat.search("flow"))) == 20
+    assert time.monotonic() - t0 < 0.5
+    assert len(responses.calls) == 1             # catalogue téléchargé une fois
+    eurostat.reset_catalogues()
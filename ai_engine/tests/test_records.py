@@ -0,0 +1,35 @@
+import pickle
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from pydantic import ValidationError
+
+from ai_engine.connectors.data_gouv import FRDataset
+from ai_engine.connectors.data_uk import UKDataset, UKGovClient
+from ai_engine.connectors.records import RawDataset, to_suggestion
+
+
+def test_records_are_slotted_and_picklable():
+    ds = UKDataset(id="1", title="Air", url="https://x/1", formats=["csv"])
+    assert isinstance(ds, RawDataset)
+    assert not hasattr(ds, "__dict__")
+    with pytest.raises(AttributeError):
+        ds.extra = 1
+    assert pickle.loads(pickle.dumps(ds)) == ds         # cache des connecteurs
+    assert FRDataset(id="2", title="t", url="u").formats == []
+
+
+def test_validation_happens_at_suggestion_boundary():
+    sugg = UKGovClient().to_suggestion(UKDataset(id="1", title="Air", url="https://x/1", formats=["csv"]))
+    assert (sugg.source_name, sugg.source, sugg.link) == ("data.gov.uk", "data.gov.uk", "https://x/1")
+    with pytest.raises(ValidationError):
+        to_suggestion(RawDataset(id="1", title=None, url="https://x/1"), "src")
+
+
+def test_bench_records_command_reports_both_paths():
+    out = StringIO()
+    call_command("bench_records", rows=20, repeat=1, stdout=out)
+    text = out.getvalue()
+    assert "pydantic raw" in text and "slots + suggestion" in text
+    assert "slots vs pydantic (raw)" in text
@@ -0,0 +1,86 @@
+import pytest
+from urllib3.exceptions import MaxRetryError
+
+from ai_engine import metrics
+from ai_engine import retries
+from ai_engine.retries import (
+    RetryBudget,
+    RetryPolicy,
+    budgeted_retry,
+    get_policy,
+    reset_budgets,
+    urllib3_retry,
+)
+
+
+@pytest.fixture(autouse=True)
+def _fresh(settings):
+    # pas d'attente réelle dans les tests
+    settings.RETRY_POLICY = {"attempts": 3, "backoff_base": 0.0, "budget_min_retries": 2}
+    settings.RETRY_POLICIES = {}
+    reset_budgets()
+    metrics.reset("retry_budget")
+    yield
+    reset_budgets()
+
+
+def test_budget_floor_then_ratio():
+    b = RetryBudget("x", ratio=0.5, min_retries=1, window_s=60)
+    assert b.try_acquire() is True       # plancher
+    assert b.try_acquire() is False
+    for _ in range(4):
+        b.record_request()
+    assert b.try_acquire() is True       # 0.5 × 4 = 2 retries autorisés
+    assert b.try_acquire() is False
+
+
+def test_full_jitter_bounds():
+    p = RetryPolicy(backoff_base=1.0, backoff_cap=4.0)
+    for attempt in (1, 2, 3, 6):
+        ceiling = min(4.0, 2 ** (attempt - 1))
+        assert all(0 <= p.backoff(attempt) <= ceiling for _ in range(50))
+
+
+def test_policy_override_per_dependency(settings):
+    settings.RETRY_POLICIES = {"slow.example": {"attempts": 5, "unknown": 1}}
+    assert get_policy("slow.example").attempts == 5
+    assert get_policy("other").attempts == 3
+
+
+def test_budgeted_retry_fails_fast_once_budget_is_spent():
+    calls = {"n": 0}
+
+    @budgeted_retry("flaky.example")
+    def flaky():
+        calls["n"] += 1
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        flaky()
+    assert calls["n"] == 3               # 1 appel + 2 retries (plancher du budget)
+
+    calls["n"] = 0
+    with pytest.raises(ConnectionError):
+        flaky()
+    assert calls["n"] == 1               # budget épuisé → plus de retry
+
+    stats = metrics.snapshot("retry_budget")["flaky.example"]
+    assert stats == {"requests": 2, "retries": 2, "denied": 1}
+
+
+def test_urllib3_retry_denied_by_budget():
+    retries.retry_budget("tavily").try_acquire()
+    retries.retry_budget("tavily").try_acquire()  # plancher (2) consommé
+
+    r = urllib3_retry("tavily", total=2)
+    with pytest.raises(MaxRetryError):
+        r.increment(method="GET", url="/search", error=ConnectionError("reset"))
+
+
+def test_urllib3_final_attempt_does_not_spend_budget():
+    r = urllib3_retry("tavily", total=1)
+    r = r.increment(method="GET", url="/search", error=ConnectionError("reset"))
+    with pytest.raises(MaxRetryError):
+        r.increment(method="GET", url="/search", error=ConnectionError("reset"))
+    assert metrics.snapshot("retry_budget")["tavily"] == {"retries": 1}
+
@@ -0,0 +1,107 @@
+import time
+
+import pytest
+
+from ai_engine import metrics, search_provider
+from ai_engine.connectors.mock_portal import MockConfig
+
+
+@pytest.fixture(autouse=True)
+def _fresh(settings):
+    settings.SEARCH_CACHE_ENABLED = False
+    settings.SEARCH_HEDGE_PROVIDER = ""
+    search_provider.reset_latencies()
+    metrics.reset(search_provider.HEDGE_METRICS_GROUP)
+    yield
+    search_provider.reset_latencies()
+
+
+@pytest.fixture
+def searxng(mock_portal, settings):
+    settings.SEARXNG_URL = mock_portal.origin
+    return mock_portal
+
+
+@pytest.fixture
+def slow_tavily(fake_search):
+    fake_search.delay = 0.5
+    fake_search.respond = lambda call: [{"url": "https://open-data.example.org/air/0/", "title": "tavily 0"},
+                                        {"url": "https://tavily.example.org/air/1", "title": "tavily 1"}]
+    return fake_search
+
+
+def test_searxng_backend_against_stand_in(searxng):
+    backend = search_provider.get_backend("searxng")
+    items = backend.search("air quality", k=3, timeout=5)
+    assert [it["url"] for it in items] == [f"https://open-data.example.org/air-quality/{i}" for i in range(3)]
+    assert items[0]["snippet"]
+
+    scoped = backend.search("air", k=2, timeout=5, include_domains=["data.gouv.fr"], exclude_domains=["x.org"])
+    assert all(it["url"].startswith("https://data.gouv.fr/air/") for it in scoped)
+    assert searxng.stats["search"] == 2
+
+
+def test_search_many_uses_configured_provider(searxng, settings):
+    settings.SEARCH_PROVIDER = "searxng"
+    results = search_provider.search_many([{"text": "rainfall", "intent": "dataset"}], k=2)
+    assert [r["source_domain"] for r in results] == ["open-data.example.org"] * 2
+
+
+def test_unknown_provider_falls_back_to_tavily(slow_tavily, settings):
+    slow_tavily.delay = 0
+    settings.SEARCH_PROVIDER = "bing"
+    assert search_provider.get_backend("bing").name == "tavily"
+    assert len(search_provider.search_many([{"text": "air", "intent": "dataset"}])) == 2
+
+
+def test_hedge_delay_follows_latency_percentile(settings):
+    settings.SEARCH_HEDGE = {"percentile": 90, "min_samples": 10, "initial_delay_s": 1.5}
+    assert search_provider.hedge_delay("tavily") == 1.5
+    for ms in range(1, 11):
+        search_provider._record_latency("tavily", ms / 10)
+    assert search_provider.hedge_delay("tavily") == pytest.approx(0.9)
+
+
+def test_slow_primary_is_hedged_to_secondary(searxng, slow_tavily, settings):
+    settings.SEARCH_HEDGE_PROVIDER = "searxng"
+    settings.SEARCH_HEDGE = {"initial_delay_s": 0.05, "grace_s": 0.0}
+
+    t0 = time.perf_counter()
+    results = search_provider._provider_search("air", k=3, timeout=5)
+    assert time.perf_counter() - t0 < 0.4
+    assert [r["url"] for r in results] == [f"https://open-data.example.org/air/{i}" for i in range(3)]
+    assert search_provider.hedge_stats()["tavily"] == {"hedged": 1, "secondary_won": 1}
+
+
+def test_hedged_results_are_merged_by_normalized_url(searxng, slow_tavily, settings):
+    slow_tavily.delay = 0.15
+    settings.SEARCH_HEDGE_PROVIDER = "searxng"
+    settings.SEARCH_HEDGE = {"initial_delay_s": 0.05, "grace_s": 1.0}
+
+    urls = [r["url"] for r in search_provider._provider_search("air", k=2, timeout=5)]
+
+    # principal d'abord ; ".../air/0/" et ".../air/0" ne font qu'un
+    assert urls == ["https://open-data.example.org/air/0/", "https://tavily.example.org/air/1",
+                    "https://open-data.example.org/air/1"]
+    assert search_provider.hedge_stats()["tavily"]["merged"] == 1
+
+
+@pytest.mark.parametrize("mock_portal", [MockConfig(latency=0.3)], indirect=True)
+def test_fast_primary_is_not_hedged(searxng, slow_tavily, settings):
+    slow_tavily.delay = 0
+    settings.SEARCH_HEDGE_PROVIDER = "searxng"
+    settings.SEARCH_HEDGE = {"initial_delay_s": 0.2}
+    assert len(search_provider._provider_search("air", k=2, timeout=5)) == 2
+    assert searxng.stats["search"] == 0 and search_provider.hedge_stats() == {}
+
+
+def test_fast_empty_primary_fails_over_to_secondary(searxng, fake_search, settings):
+    fake_search.respond = lambda call: []                   # 401 / 429 → []
+    settings.SEARCH_HEDGE_PROVIDER = "searxng"
+    settings.SEARCH_HEDGE = {"initial_delay_s": 1.0}
+
+    t0 = time.perf_counter()
+    results = search_provider._provider_search("air", k=2, timeout=5)
+    assert time.perf_counter() - t0 < 0.5                    # sans attendre le délai de hedging
+    assert [r["url"] for r in results] == [f"https://open-data.example.org/air/{i}" for i in range(2)]
+    assert search_provider.hedge_stats()["tavily"] == {"failover": 1}
@@ -0,0 +1,85 @@
+import time
+
+import pytest
+
+from ai_engine import metrics, search_provider
+
+QUERIES = [
+    {"text": "d1", "intent": "dataset"},
+    {"text": "s1", "intent": "source"},
+    {"text": "d2", "intent": "dataset"},
+    {"text": "d3", "intent": "dataset"},
+]
+
+
+@pytest.fixture
+def provider(fake_search, settings):
+    settings.SEARCH_MAX_CONCURRENCY = 8
+    settings.SEARCH_BACKOFF_INCLUDE_DOMAINS = ["data.gouv.fr"]
+    settings.SEARCH_BACKOFF_SPECULATIVE_BUDGET = 2
+    metrics.reset(search_provider.BACKOFF_METRICS_GROUP)
+    fake_search.delay = 0.1
+    fake_search.normal_hits = 1
+
+    def _respond(call):
+        backoff = _is_backoff(call)
+        host = "data.gouv.fr" if backoff else "ex.org"
+        n = 2 if backoff else fake_search.normal_hits
+        return [{"url": f"https://{host}/{call.query}/{i}", "title": call.query} for i in range(n)]
+
+    fake_search.respond = _respond
+    return fake_search
+
+
+def _is_backoff(call):
+    return call.include_domains == ["data.gouv.fr"]
+
+
+def _backoff_calls(fake):
+    return sorted(c.query for c in fake.calls if _is_backoff(c))
+
+
+def test_speculative_results_equal_sequential_back_off(provider, settings):
+    settings.SEARCH_BACKOFF_MIN_DATASETS = 10
+    settings.SEARCH_BACKOFF_SPECULATIVE = False
+    t0 = time.perf_counter()
+    sequential = search_provider.search_many(QUERIES)
+    serial_time = time.perf_counter() - t0
+
+    settings.SEARCH_BACKOFF_SPECULATIVE = True
+    settings.SEARCH_BACKOFF_SPECULATIVE_BUDGET = 3          # tout le back-off part avec la passe normale
+    t0 = time.perf_counter()
+    speculative = search_provider.search_many(QUERIES)
+    spec_time = time.perf_counter() - t0
+
+    assert speculative == sequential
+    assert [r["url"] for r in speculative][-6:] == [
+        f"https://data.gouv.fr/{q}/{i}" for q in ("d1", "d2", "d3") for i in range(2)
+    ]
+    assert serial_time >= 0.2 and spec_time < 0.18           # un aller-retour au lieu de deux
+    assert search_provider.backoff_stats()["speculative"] == {"speculated": 3, "used": 3}
+
+
+def test_speculation_cancelled_when_threshold_met(provider, settings):
+    settings.SEARCH_BACKOFF_MIN_DATASETS = 3
+    settings.SEARCH_BACKOFF_SPECULATIVE = True
+    provider.normal_hits = 2
+
+    results = search_provider.search_many(QUERIES)
+
+    assert all("data.gouv.fr" not in r["url"] for r in results)
+    assert _backoff_calls(provider) == ["d1", "d2"]          # budget : 2 requêtes spéculatives
+    stats = search_provider.backoff_stats()["speculative"]
+    assert stats["speculated"] == 2 and stats.get("cancelled", 0) + stats.get("wasted", 0) == 2
+
+
+
+def test_default_path_does_not_speculate(provider, settings):
+    settings.SEARCH_BACKOFF_MIN_DATASETS = 3
+    settings.SEARCH_BACKOFF_SPECULATIVE = False
+    provider.normal_hits = 2
+
+    search_provider.search_many(QUERIES)
+
+    assert _backoff_calls(provider) == []
+    assert search_provider.backoff_stats() == {}
@@ -0,0 +1,60 @@
+import pytest
+
+from ai_engine import metrics, search_provider
+
+
+@pytest.fixture
+def calls(fake_search, settings, tmp_path):
+    settings.SEARCH_CACHE_ENABLED = True
+    settings.SEARCH_CACHE_DIR = str(tmp_path)
+    settings.SEARCH_MAX_CONCURRENCY = 1
+    metrics.reset(search_provider.CACHE_METRICS_GROUP)
+
+    def _respond(call):
+        if call.query == "nothing":
+            return []
+        return [
+            {"url": "https://data.example.org/", "title": "root", "snippet": None},
+            {"url": f"https://data.example.org/datasets/{len(fake_search.calls)}", "title": call.query, "snippet": "s"},
+        ]
+
+    fake_search.respond = _respond
+    return fake_search.calls
+
+
+def test_identical_queries_hit_cache(calls):
+    first = search_provider.search_many([{"text": "Chômage  Lyon", "intent": "dataset"}])
+    again = search_provider.search_many([{"text": "chômage lyon ", "intent": "dataset"}])
+
+    assert again == first and len(calls) == 1
+    stats = search_provider.search_cache_stats()
+    assert stats["providers"]["tavily"] == {"misses": 1, "stores": 1, "hits": 1}
+    assert stats["entries"] == 1 and stats["size_bytes"] > 0
+
+
+def test_key_includes_domains_depth_and_k(calls):
+    q = {"text": "air", "intent": "dataset"}
+    search_provider.search_many([q], k=5)
+    search_provider.search_many([q], k=10)
+    search_provider.search_many([{**q, "include_domains": ["B.org", "a.org"]}], k=5)
+    search_provider.search_many([{**q, "include_domains": ["a.org", "b.org"]}], k=5)
+    search_provider.search_many([{**q, "search_depth": "advanced"}], k=5)
+    assert len(calls) == 4
+
+
+def test_raw_results_cached_before_filtering(calls, monkeypatch):
+    search_provider.search_many([{"text": "air", "intent": "dataset"}])
+    # le filtre near-root change : les données en cache le subissent aussi
+    monkeypatch.setattr(search_provider, "_is_near_root", lambda u: False)
+    urls = [r["url"] for r in search_provider.search_many([{"text": "air", "intent": "dataset"}])]
+    assert urls == ["https://data.example.org/", "https://data.example.org/datasets/1"]
+    assert len(calls) == 1
+
+
+def test_empty_results_and_disabled_are_not_cached(calls, settings):
+    search_provider.search_many([{"text": "nothing", "intent": "dataset"}])
+    search_provider.search_many([{"text": "nothing", "intent": "dataset"}])
+    settings.SEARCH_CACHE_ENABLED = False
+    search_provider.search_many([{"text": "air", "intent": "dataset"}])
+    search_provider.search_many([{"text": "air", "intent": "dataset"}])
+    assert len(calls) == 4
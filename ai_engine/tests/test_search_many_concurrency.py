@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+from ai_engine import search_provider
+from ai_engine.chains import llm_sources_collect
+
+
+def _results(call):
+    # "shared" revient dans toutes les requêtes : gardé pour la première seulement
+    return [{"url": f"https://ex.org/{call.query}/a/", "title": call.query}, {"url": "https://ex.org/shared/x"}]
+
+
+@pytest.fixture
+def fake_provider(fake_search):
+    fake_search.delay = 0.05
+    fake_search.respond = _results
+    return fake_search
+
+
+QUERIES = [{"text": f"q{i}", "intent": "dataset" if i % 2 else "source"} for i in range(6)]
+
+
+def test_concurrent_results_match_sequential(fake_provider, settings):
+    settings.SEARCH_MAX_CONCURRENCY = 1
+    sequential = search_provider.search_many(QUERIES)
+    assert fake_provider.peak == 1
+
+    settings.SEARCH_MAX_CONCURRENCY = 6
+    t0 = time.perf_counter()
+    concurrent = search_provider.search_many(QUERIES)
+    elapsed = time.perf_counter() - t0
+
+    assert concurrent == sequential
+    assert [r["url"] for r in concurrent][:3] == [
+        "https://ex.org/q0/a", "https://ex.org/shared/x", "https://ex.org/q1/a",
+    ]
+    assert concurrent[1]["intent"] == "source"
+    assert fake_provider.peak == 6 and elapsed < 0.2
+
+
+def test_concurrency_cap_and_backoff(fake_provider, settings):
+    settings.SEARCH_MAX_CONCURRENCY = 2
+    settings.SEARCH_BACKOFF_INCLUDE_DOMAINS = ["data.gouv.fr"]
+    settings.SEARCH_BACKOFF_MIN_DATASETS = 50
+
+    search_provider.search_many(QUERIES)
+
+    assert fake_provider.peak == 2
+    backoff = [c.query for c in fake_provider.calls if c.include_domains == ["data.gouv.fr"]]
+    assert sorted(backoff) == ["q1", "q3", "q5"]
+
+
+def test_collect_runs_angles_in_parallel(monkeypatch, settings):
+    settings.SEARCH_MAX_CONCURRENCY = 6
+
+    class Q:
+        def __init__(self, text, intent):
+            self.text, self.intent = text, intent
+
+        def model_dump(self):
+            return {"text": self.text, "intent": self.intent}
+
+    class Angles:
+        angles = [object(), object(), object()]
+
+    def _search(specs, k=10):
+        time.sleep(0.05)
+        return [{"url": f"https://ex.org/{s['intent']}/{s['text']}", "title": s["text"]} for s in specs]
+
+    monkeypatch.setattr(llm_sources_collect, "run_llm_queries",
+                        lambda ar: [[Q(f"d{i}", "dataset"), Q(f"s{i}", "source")] for i in range(3)])
+    monkeypatch.setattr(llm_sources_collect, "search_many", _search)
+
+    t0 = time.perf_counter()
+    res = llm_sources_collect.run(Angles())
+    assert time.perf_counter() - t0 < 0.2                      # 6 lots, un seul aller-retour
+    assert [[s.link for s in angle] for angle in res][1] == [
+        "https://ex.org/dataset/d1", "https://ex.org/source/s1",
+    ]
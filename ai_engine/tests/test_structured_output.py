@@ -0,0 +1,72 @@
+import pytest
+from langchain_core.exceptions import OutputParserException
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableLambda
+
+from ai_engine import metrics
+from ai_engine.chains import structured
+from ai_engine.schemas import AngleResult, LLMSourceSuggestionList
+
+GOOD = '{"language": "fr", "angles": [{"title": "T", "rationale": "R"}]}'
+
+
+@pytest.fixture(autouse=True)
+def _reset_metrics():
+    metrics.reset(structured.METRICS_GROUP)
+    yield
+    metrics.reset(structured.METRICS_GROUP)
+
+
+def _chat(text):
+    return RunnableLambda(lambda _msgs: AIMessage(content=text))
+
+
+def test_repair_json_strips_fences_prose_and_trailing_commas():
+    raw = 'Voici le JSON :\n```json\n{"language": "fr", "angles": [{"title": "T", "rationale": "R",},],}\n```'
+    assert AngleResult.model_validate_json(structured.repair_json(raw)).angles[0].title == "T"
+
+
+def test_parser_mode_counts_clean_call(settings):
+    settings.LLM_OUTPUT_MODE = "parser"
+    out = structured.structured_output(_chat(GOOD), AngleResult, name="angles").invoke("x")
+    assert out.language == "fr"
+    assert structured.parse_stats()["angles"] == {"calls": 1}
+
+
+def test_parser_mode_repairs_instead_of_retrying(settings):
+    settings.LLM_OUTPUT_MODE = "parser"
+    runnable = structured.structured_output(_chat("```json\n" + GOOD[:-1] + ",}\n```"), AngleResult, name="angles")
+    assert runnable.invoke("x").angles[0].rationale == "R"
+    stats = structured.parse_stats()["angles"]
+    assert stats["parse_failures"] == 1 and stats["repairs"] == 1
+
+
+def test_bare_array_is_wrapped_into_list_field(settings):
+    settings.LLM_OUTPUT_MODE = "parser"
+    payload = '[{"title": "t", "description": "d", "link": "https://x", "source": "s", "angle_idx": 0}]'
+    out = structured.structured_output(_chat(payload), LLMSourceSuggestionList, name="llm_sources").invoke("x")
+    assert out.datasets[0].link == "https://x"
+
+
+def test_unrepairable_output_raises_parser_exception(settings):
+    settings.LLM_OUTPUT_MODE = "parser"
+    with pytest.raises(OutputParserException):
+        structured.structured_output(_chat("désolé, pas de JSON"), AngleResult, name="angles").invoke("x")
+    assert structured.parse_stats()["angles"]["parse_failures"] == 1
+
+
+def test_structured_mode_repairs_raw_message(settings):
+    settings.LLM_OUTPUT_MODE = "json_schema"
+
+    class _Chat:
+        def with_structured_output(self, schema, method, include_raw):
+            assert method == "json_schema" and include_raw
+            return RunnableLambda(lambda _m: {
+                "raw": AIMessage(content=GOOD + " trailing prose"),
+                "parsed": None,
+                "parsing_error": ValueError("Extra data"),
+            })
+
+    out = structured.structured_output(_Chat(), AngleResult, name="angles").invoke("x")
+    assert out.angles[0].title == "T"
+    assert structured.parse_stats()["angles"]["repairs"] == 1
@@ -0,0 +1,146 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from ai_engine import retries
+from ai_engine.retries import DeadlineExceeded
+from ai_engine.schemas import Angle, AngleResult, ExtractionResult, NumberEntity, VizResult, VizSuggestion
+from ai_engine import viz_rules
+import ai_engine.chains.viz as vz
+
+
+def _extr(**kw):
+    base = dict(language="fr", persons=[], organizations=[], locations=[], dates=[], numbers=[])
+    base.update(kw)
+    return ExtractionResult(**base)
+
+
+def test_time_series_gives_line_chart():
+    angle = Angle(title="Évolution du chômage des jeunes 2000-2024", rationale="Depuis 2000, hausse.")
+    extr = _extr(numbers=[NumberEntity(raw="18 %", value=18, unit="%")])
+    out = viz_rules.suggest(angle, extr)
+    assert out[0].chart_type == "line"
+    assert out[0].x == "Année"
+    assert out[0].y == "Taux (%)"
+    assert "2000-2024" in out[0].title
+
+
+def test_regions_give_choropleth():
+    angle = Angle(title="Sécheresse par département", rationale="Comparer les départements touchés.")
+    out = viz_rules.suggest(angle, _extr(locations=["Orne", "Sarthe"]))
+    assert "choropleth" in [s.chart_type for s in out]
+
+
+def test_shares_give_bar_in_english():
+    angle = Angle(title="Share of renewable energy", rationale="Breakdown by source")
+    out = viz_rules.suggest(angle, _extr(language="en"), language="en")
+    bar = [s for s in out if s.chart_type == "bar"]
+    assert bar and bar[0].y == "Rate (%)"
+
+
+def test_fallback_table_and_currency_unit():
+    angle = Angle(title="Le budget du nouveau stade", rationale="Qui paie ?")
+    extr = _extr(numbers=[NumberEntity(raw="100 millions €", value=1e8, unit="€")])
+    out = viz_rules.suggest(angle, extr)
+    assert len(out) == 1
+    assert out[0].chart_type == "table"
+    assert out[0].y == "Montant (€)"
+
+
+def test_run_rules_profile_skips_llm(monkeypatch):
+    monkeypatch.setattr(vz, "_run_llm", lambda *_a, **_k: (_ for _ in ()).throw(AssertionError("LLM called")))
+    ar = AngleResult(language="fr", angles=[Angle(title="Évolution des prix", rationale="…")])
+    res = vz.run(ar, profile="rules")
+    assert len(res) == 1 and isinstance(res[0][0], VizSuggestion)
+
+
+def test_run_falls_back_when_budget_exceeded(monkeypatch):
+    def _slow(_ar, deadline=None):
+        time.sleep(0.5)
+        return [[VizSuggestion(title="LLM", chart_type="line", x="x", y="y")]]
+
+    monkeypatch.setattr(vz, "_run_llm", _slow)
+    ar = AngleResult(language="en", angles=[Angle(title="Population by state", rationale="…")])
+    res = vz.run(ar, profile="llm", time_budget=0.05)
+    assert res[0][0].title != "LLM"
+    assert res[0][0].chart_type == "choropleth"
+
+
+def _wait_no_abandoned(timeout=2.0):
+    end = time.monotonic() + timeout
+    while vz._abandoned and time.monotonic() < end:
+        time.sleep(0.01)
+    return vz._abandoned == 0
+
+
+def test_run_skips_llm_only_when_abandoned_chains_fill_the_pool(monkeypatch):
+    assert _wait_no_abandoned()             # chaîne abandonnée par le test précédent
+    release = threading.Event()
+    started = []
+
+    def _stuck(_ar, deadline=None):
+        started.append(deadline)
+        release.wait(2)
+        return [[VizSuggestion(title="LLM", chart_type="line", x="x", y="y")]]
+
+    monkeypatch.setattr(vz, "_run_llm", _stuck)
+    ar = AngleResult(language="en", angles=[Angle(title="Population by state", rationale="…")])
+    try:
+        for _ in range(3):
+            res = vz.run(ar, profile="llm", time_budget=0.05)
+            assert res[0][0].chart_type == "choropleth"
+        # deux chaînes abandonnées occupent le pool : la troisième n'est pas soumise
+        assert len(started) == 2 and all(d is not None for d in started)
+    finally:
+        release.set()
+    assert _wait_no_abandoned()
+
+
+def test_concurrent_runs_within_budget_all_use_llm(monkeypatch):
+    assert _wait_no_abandoned()
+
+    def _quick(_ar, deadline=None):
+        time.sleep(0.05)
+        return [[VizSuggestion(title="LLM", chart_type="line", x="x", y="y")]]
+
+    monkeypatch.setattr(vz, "_run_llm", _quick)
+    ar = AngleResult(language="en", angles=[Angle(title="Population by state", rationale="…")])
+    out = []
+    threads = [threading.Thread(target=lambda: out.append(vz.run(ar, profile="llm", time_budget=2)))
+               for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    # trois analyses pour deux workers : la troisième attend, rien n'est abandonné
+    assert [res[0][0].title for res in out] == ["LLM"] * 3
+
+
+def test_deadline_between_angles_falls_back_for_every_angle(monkeypatch):
+    invoked = []
+    clock = {"now": 0.0}
+
+    def _slow_chain(prompt):
+        invoked.append("Population by state" in prompt.to_string())
+        clock["now"] += 10                  # le premier angle consomme tout le budget
+        return VizResult(language="en", suggestions=[
+            VizSuggestion(title="LLM", chart_type="line", x="x", y="y"),
+        ])
+
+    monkeypatch.setattr(vz, "structured_output", lambda *_a, **_k: RunnableLambda(_slow_chain))
+    monkeypatch.setattr(vz, "time", SimpleNamespace(monotonic=lambda: clock["now"]))
+    monkeypatch.setattr(retries, "MAX_ATTEMPTS", 3)
+    ar = AngleResult(language="en", angles=[
+        Angle(title="Population by state", rationale="…"), Angle(title="Évolution des prix", rationale="…"),
+    ])
+    with pytest.raises(DeadlineExceeded):
+        vz._run_llm(ar, deadline=5.0)
+    assert invoked == [True]                         # pas de retry, pas de liste partielle
+
+    monkeypatch.undo()
+    monkeypatch.setattr(vz, "_run_llm", lambda *_a, **_k: (_ for _ in ()).throw(DeadlineExceeded("viz")))
+    res = vz.run(ar, profile="llm", time_budget=1)
+    assert len(res) == 2 and all(r and r[0].title != "LLM" for r in res)
@@ -0,0 +1,234 @@
+# ai_engine/viz_rules.py
+"""
+Moteur de règles local pour les suggestions de visualisation.
+
+Les suggestions produites par le LLM suivent des patrons très prévisibles :
+  - série temporelle (années, « évolution », « since »…) → line
+  - dimension géographique (régions, départements, pays…) → choropleth
+  - parts / répartitions (%, « part de », « share »…)      → bar (ou pie)
+Ce module reproduit ces patrons sans appel réseau, à partir du texte de
+l'angle et de l'`ExtractionResult` (dates, lieux, nombres + unités).
+Il sert de profil « rapide » et de repli quand la chaîne viz dépasse son budget.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, Iterable, List, Optional
+
+from ai_engine.schemas import VizSuggestion
+
+# ---------------------------------------------------------------------------
+# Signaux lexicaux (FR/EN)
+# ---------------------------------------------------------------------------
+
+_YEAR_RE = re.compile(r"\b(1[89]\d{2}|20\d{2})\b")
+
+TIME_TOKENS = {
+    "évolution", "evolution", "depuis", "tendance", "hausse", "baisse", "progression",
+    "croissance", "recul", "historique", "annuel", "annuelle", "mensuel", "mensuelle",
+    "trend", "since", "growth", "rise", "decline", "over time", "annual", "monthly", "yearly",
+}
+
+GEO_TOKENS = {
+    "région", "régions", "region", "regions", "département", "départements", "commune",
+    "communes", "territoire", "territoires", "carte", "pays", "ville", "villes",
+    "state", "states", "county", "counties", "country", "countries", "city", "cities",
+    "map", "regional", "régional", "régionale", "local", "locale",
+}
+
+SHARE_TOKENS = {
+    "part", "parts", "répartition", "proportion", "pourcentage", "taux", "ratio",
+    "share", "shares", "breakdown", "percentage", "rate", "distribution",
+}
+
+COMPARE_TOKENS = {
+    "comparaison", "comparer", "classement", "versus", "écart", "inégalités",
+    "comparison", "compare", "ranking", "gap", "vs",
+}
+
+_LABELS = {
+    "fr": {
+        "year": "Année",
+        "region": "Zone géographique",
+        "category": "Catégorie",
+        "value": "Valeur",
+        "rate": "Taux (%)",
+        "amount": "Montant ({unit})",
+        "quantity": "Valeur ({unit})",
+        "note_time": "Série temporelle : vérifier la granularité (annuelle, mensuelle).",
+        "note_geo": "Carte choroplèthe : normaliser par habitant si possible.",
+        "note_share": "Parts d'un total : un camembert convient si ≤ 5 catégories.",
+        "note_table": "Tableau récapitulatif des chiffres clés de l'article.",
+        "title_time": "Évolution — {topic}",
+        "title_geo": "Répartition géographique — {topic}",
+        "title_share": "Répartition — {topic}",
+        "title_table": "Chiffres clés — {topic}",
+    },
+    "en": {
+        "year": "Year",
+        "region": "Geographic area",
+        "category": "Category",
+        "value": "Value",
+        "rate": "Rate (%)",
+        "amount": "Amount ({unit})",
+        "quantity": "Value ({unit})",
+        "note_time": "Time series: check the granularity (yearly, monthly).",
+        "note_geo": "Choropleth map: normalise per capita where possible.",
+        "note_share": "Shares of a total: a pie chart works for ≤ 5 categories.",
+        "note_table": "Summary table of the article's key figures.",
+        "title_time": "Trend — {topic}",
+        "title_geo": "Geographic breakdown — {topic}",
+        "title_share": "Breakdown — {topic}",
+        "title_table": "Key figures — {topic}",
+    },
+}
+
+_CURRENCY_UNITS = {"€", "eur", "euro", "euros", "$", "usd", "dollar", "dollars", "£", "gbp"}
+
+
+# ---------------------------------------------------------------------------
+# Helpers
+# ---------------------------------------------------------------------------
+
+def _labels(language: Optional[str]) -> dict:
+    return _LABELS.get((language or "fr").lower()[:2], _LABELS["en"])
+
+
+def _has_token(text: str, tokens: Iterable[str]) -> bool:
+    low = f" {text.lower()} "
+    for tok in tokens:
+        if " " in tok:
+            if tok in low:
+                return True
+        elif re.search(rf"(?<!\w){re.escape(tok)}(?!\w)", low):
+            return True
+    return False
+
+
+def _years(values: Iterable[str]) -> set[str]:
+    out: set[str] = set()
+    for v in values or []:
+        out.update(_YEAR_RE.findall(str(v)))
+    return out
+
+
+def _units(extraction: Any) -> List[str]:
+    units: List[str] = []
+    for n in getattr(extraction, "numbers", None) or []:
+        u = (getattr(n, "unit", None) or "").strip()
+        if u:
+            units.append(u)
+    return units
+
+
+def _measure_label(units: List[str], labels: dict) -> str:
+    """Choisit l'axe Y à partir des unités dominantes de l'article."""
+    if not units:
+        return labels["value"]
+    lowered = [u.lower() for u in units]
+    if "%" in lowered:
+        return labels["rate"]
+    for u in units:
+        if u.lower() in _CURRENCY_UNITS:
+            return labels["amount"].format(unit=u)
+    return labels["quantity"].format(unit=units[0])
+
+
+def _topic(title: str) -> str:
+    topic = (title or "").strip().rstrip(".")
+    return topic[:60] if len(topic) > 60 else topic
+
+
+# ---------------------------------------------------------------------------
+# API publique
+# ---------------------------------------------------------------------------
+
+def suggest(
+    angle: Any,
+    extraction: Any = None,
+    *,
+    language: Optional[str] = None,
+    max_items: int = 3,
+) -> List[VizSuggestion]:
+    """
+    Retourne 1..max_items VizSuggestion pour un angle, sans appel LLM.
+    `angle` expose `title`/`rationale` ; `extraction` est un ExtractionResult (optionnel).
+    """
+    title = getattr(angle, "title", "") or ""
+    rationale = getattr(angle, "rationale", "") or ""
+    text = f"{title} {rationale}"
+    lang = language or getattr(extraction, "language", None) or "fr"
+    labels = _labels(lang)
+    topic = _topic(title)
+
+    units = _units(extraction)
+    measure = _measure_label(units, labels)
+    angle_years = _years([text])
+    article_years = _years(getattr(extraction, "dates", None) or [])
+    locations = list(getattr(extraction, "locations", None) or [])
+
+    out: List[VizSuggestion] = []
+
+    # 1) Série temporelle
+    if len(angle_years) >= 2 or _has_token(text, TIME_TOKENS) or (
+        len(article_years) >= 2 and not angle_years
+    ):
+        years = sorted(angle_years or article_years)
+        span = f" ({years[0]}-{years[-1]})" if len(years) >= 2 else ""
+        out.append(
+            VizSuggestion(
+                title=labels["title_time"].format(topic=topic) + span,
+                chart_type="line",
+                x=labels["year"],
+                y=measure,
+                note=labels["note_time"],
+            )
+        )
+
+    # 2) Dimension géographique
+    if _has_token(text, GEO_TOKENS) or len(locations) >= 2:
+        out.append(
+            VizSuggestion(
+                title=labels["title_geo"].format(topic=topic),
+                chart_type="choropleth",
+                x=labels["region"],
+                y=measure,
+                note=labels["note_geo"],
+            )
+        )
+
+    # 3) Parts / comparaisons
+    has_share = _has_token(text, SHARE_TOKENS) or "%" in text or "%" in units
+    if has_share or _has_token(text, COMPARE_TOKENS):
+        out.append(
+            VizSuggestion(
+                title=labels["title_share"].format(topic=topic),
+                chart_type="bar",
+                x=labels["category"],
+                y=labels["rate"] if has_share else measure,
+                note=labels["note_share"] if has_share else None,
+            )
+        )
+
+    # 4) Repli : tableau des chiffres clés
+    if not out:
+        out.append(
+            VizSuggestion(
+                title=labels["title_table"].format(topic=topic),
+                chart_type="table",
+                x=labels["category"],
+                y=measure,
+                note=labels["note_table"],
+            )
+        )
+
+    return out[: max(1, int(max_items))]
+
+
+def suggest_all(angle_result: Any, extraction: Any = None) -> List[List[VizSuggestion]]:
+    """Une liste de VizSuggestion par angle, alignée sur `angle_result.angles`."""
+    language = getattr(angle_result, "language", None)
+    return [
+        suggest(angle, extraction, language=language)
+        for angle in getattr(angle_result, "angles", None) or []
+    ]
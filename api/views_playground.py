@@ -11,6 +11,9 @@ from analysis.views import ArticleViewSet, AnalysisViewSet, HistoryAPIView
 from users.views import FeedbackViewSet
 
 from ai_engine.pipeline import run as run_pipeline
+from ai_engine.connectors.health import health_snapshot
+from ai_engine.connectors.http import revalidation_stats
+from ai_engine.search_provider import search_cache_stats
 from analysis.serializers import AnalysisDetailSerializer, AngleResourcesSerializer
 
 from django.contrib.auth import get_user_model
@@ -80,6 +83,9 @@ class PlaygroundDebugMixin:
                     "user": user_id,
                     "duration_ms": dur_ms,
                     **counts,
+                    "connectors_health": health_snapshot(),
+                    "connectors_revalidation": revalidation_stats(),
+                    "search_cache": search_cache_stats(),
                 }
                 response.data = d
         except Exception:
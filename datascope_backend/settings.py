@@ -31,9 +31,19 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY", "")
 
 SEARCH_ENABLED = True
-SEARCH_PROVIDER = os.getenv("SEARCH_PROVIDER", "tavily")  # tavily | serper | bing | searxng
+SEARCH_PROVIDER = os.getenv("SEARCH_PROVIDER", "tavily")  # tavily | searxng (serper, bing → repli Tavily)
+SEARXNG_URL = os.getenv("SEARXNG_URL", "")  # instance SearxNG (API JSON), ex. http://127.0.0.1:8888
+# Hedging : si le backend principal dépasse son percentile de latence, la requête
+# part aussi sur ce backend secondaire (vide = désactivé) ; résultats fusionnés par URL
+SEARCH_HEDGE_PROVIDER = os.getenv("SEARCH_HEDGE_PROVIDER", "")
+SEARCH_HEDGE = {"percentile": 95, "min_samples": 20, "initial_delay_s": 2.0, "grace_s": 0.3}
 SEARCH_MAX_RESULTS = int(os.getenv("SEARCH_MAX_RESULTS", "10"))
 SEARCH_TIMEOUT = int(os.getenv("SEARCH_TIMEOUT", "8"))
+SEARCH_MAX_CONCURRENCY = int(os.getenv("SEARCH_MAX_CONCURRENCY", "6"))  # appels provider simultanés (1 = séquentiel)
+# Cache persistant des résultats bruts du provider (ai_engine.search_provider) :
+# clé (provider, requête normalisée, domaines, depth, k), TTL et plafond disque
+SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "true").lower() == "true"
+SEARCH_CACHE = {"ttl": 24 * 3600, "max_bytes": 32 * 2**20}
 
 
 # Quick-start development settings - unsuitable for production
@@ -244,8 +254,94 @@ THEME_FILTER_STRICT_DEFAULT = False # strict = drop hors-thème
 THEME_FILTER_MIN_UNIGRAM_HITS = 2   # seuil pragmatique
 
 CONNECTORS_ENABLED = False  # ← par défaut OFF pour cette version
+# Connecteurs interrogés, dans l'ordre (ai_engine.connectors.registry) : noms
+# intégrés ou plugins déclarés dans le groupe d'entry points "datascope.connectors"
+CONNECTORS_ACTIVE = ["data_gouv", "data_gov", "data_canada", "data_uk", "hdx"]
+# Eurostat ("eurostat" dans CONNECTORS_ACTIVE) : catalogue complet téléchargé
+# et indexé en mémoire en arrière-plan (début d'analyse, ou
+# `harvest_catalog --eurostat en`), rafraîchi toutes les N secondes
+EUROSTAT_CATALOGUE_TTL = 24 * 3600
+CONNECTORS_MAX_CONCURRENCY = int(os.getenv("CONNECTORS_MAX_CONCURRENCY", "8"))  # appels simultanés (tous hôtes)
+CONNECTORS_MAX_PER_HOST = int(os.getenv("CONNECTORS_MAX_PER_HOST", "2"))        # par portail
+# Recherche groupée (ai_engine.connectors.batching) : les mots-clés d'un angle
+# partent en une requête OR par portail (CKAN, data.gouv.fr), par tranches de N
+CONNECTORS_BATCH_MODE = os.getenv("CONNECTORS_BATCH_MODE", "false").lower() == "true"
+CONNECTORS_BATCH_MAX_KEYWORDS = int(os.getenv("CONNECTORS_BATCH_MAX_KEYWORDS", "5"))
+# Routage géo/langue (ai_engine.connectors.routing) : portails des pays cités en
+# priorité, les autres ignorés ; sans lieu reconnu, la langue de l'article décide.
+# Portails « secondary » : seulement les N premiers mots-clés de chaque angle
+CONNECTOR_ROUTING_ENABLED = os.getenv("CONNECTOR_ROUTING_ENABLED", "true").lower() == "true"
+CONNECTOR_ROUTING_SECONDARY_KEYWORDS = 1
+CONNECTOR_GAZETTEER = {}  # alias supplémentaires : {"alias": "CODE pays"}
+# Préchargement spéculatif (ai_engine.connectors.prefetch) : dès l'extraction,
+# recherches sur les N lieux / organisations / unités les plus cités
+CONNECTOR_PREFETCH_ENABLED = os.getenv("CONNECTOR_PREFETCH_ENABLED", "true").lower() == "true"
+CONNECTOR_PREFETCH_MAX_TERMS = 4
+CONNECTOR_PREFETCH_WORKERS = 4
+# Sessions HTTP partagées (ai_engine.connectors.http) : pool keep-alive par hôte,
+# timeouts (connexion, lecture) par hôte
+HTTP_POOL_MAXSIZE = {"default": CONNECTORS_MAX_PER_HOST}
+CONNECTOR_DEFAULT_TIMEOUT = (5, 10)
+CONNECTOR_TIMEOUTS = {
+    "catalog.data.gov": (5, 8),
+}
+# Redirection des portails (tests de charge : manage.py mock_portals) :
+# {hôte | "*": origine}, ex. CONNECTOR_MOCK_ORIGIN=http://127.0.0.1:8765
+# (caches connecteurs / http alors isolés dans CONNECTOR_CACHE_DIR/redirected/)
+CONNECTOR_ORIGIN_OVERRIDES = (
+    {"*": os.environ["CONNECTOR_MOCK_ORIGIN"]} if os.getenv("CONNECTOR_MOCK_ORIGIN") else {}
+)
+# Miroir local des catalogues CKAN (manage.py harvest_catalog) : si activé,
+# les portails moissonnés sont interrogés via l'index FTS5 local
+LOCAL_CATALOG_ENABLED = os.getenv("LOCAL_CATALOG_ENABLED", "false").lower() == "true"
+LOCAL_CATALOG_PATH = os.getenv("LOCAL_CATALOG_PATH", str(BASE_DIR / ".cache" / "catalog.sqlite3"))
+# Débit par portail (token bucket, ai_engine.connectors.ratelimit) :
+# `rate` requêtes/s, rafales de `burst` ; rate <= 0 → pas de limite
+CONNECTOR_RATE_LIMITS = {
+    "default": {"rate": 5, "burst": 5},
+}
+# Disjoncteurs par connecteur (ai_engine.connectors.health) : ouverture sur taux
+# d'erreur ou EWMA de latence, sonde half-open après cooldown_s
+CONNECTOR_BREAKER = {
+    "default": {"error_rate": 0.5, "min_calls": 5, "slow_ms": 8000, "cooldown_s": 30},
+}
+# Cache persistant des recherches connecteurs (ai_engine.connectors.cache_utils) :
+# TTL de fraîcheur, fenêtre stale-while-revalidate et plafond disque par connecteur
+CONNECTOR_CACHE_ENABLED = os.getenv("CONNECTOR_CACHE_ENABLED", "true").lower() == "true"
+CONNECTOR_CACHE = {
+    "default": {"ttl": 6 * 3600, "stale_ttl": 24 * 3600, "max_bytes": 64 * 2**20},
+    "DataGovClient": {"max_bytes": 128 * 2**20},
+}
+# Revalidation ETag / Last-Modified des réponses portails (store "http" du cache
+# ci-dessus) : un 304 resert le corps stocké
+CONNECTOR_CONDITIONAL_REQUESTS = os.getenv("CONNECTOR_CONDITIONAL_REQUESTS", "true").lower() == "true"
+# Pages de recherche des portails lues au fil de l'eau (ai_engine.connectors.streaming) :
+# arrêt de la lecture dès que les résultats utiles sont trouvés
+CONNECTOR_STREAMING_JSON = os.getenv("CONNECTOR_STREAMING_JSON", "true").lower() == "true"
 DATASCOPE_LOG_LEVEL = "WARNING"  # "DEBUG" pour activer les traces locales
 
+# Sortie des chaînes LLM : "parser" (texte + PydanticOutputParser),
+# "json_schema" ou "function_calling" (sortie structurée côté modèle)
+LLM_OUTPUT_MODE = os.getenv("LLM_OUTPUT_MODE", "parser")
+
+# Visualisations : "llm" (chaîne LLM) ou "rules" (moteur de règles local, zéro latence)
+VIZ_PROFILE = os.getenv("VIZ_PROFILE", "llm")
+VIZ_TIME_BUDGET_SECONDS = float(os.getenv("VIZ_TIME_BUDGET_SECONDS", "20"))  # au-delà → règles
+
+# Retries (LLM, connecteurs, Tavily) : back-off à full jitter + budget par dépendance.
+# RETRY_POLICIES[dep] surcharge RETRY_POLICY (dep = hôte du connecteur, "openai", "tavily").
+RETRY_POLICY = {
+    "attempts": 3,
+    "backoff_base": 0.5,      # s
+    "backoff_cap": 4.0,       # s
+    "budget_ratio": 0.2,      # retries ≤ 20 % des requêtes de la fenêtre…
+    "budget_min_retries": 5,  # …avec un plancher
+    "budget_window_s": 60,
+}
+RETRY_POLICIES = {
+    "openai": {"backoff_cap": 10.0},
+}
+
 HOMEPAGE_SOFT_PENALTY = 0.20  # 0.25–0.30 si tu veux appuyer l'effet
 
 SOURCE_MIN_PER_ANGLE = 3
@@ -258,6 +354,10 @@ THEME_FILTER_STRICT_FOR_DATASETS = True  # stricte sur la passe datasets
 # back-off (utilisé seulement si datasets<3)
 
 SEARCH_BACKOFF_DEPTH = "advanced"
+# Back-off spéculatif (ai_engine.search_provider) : les N premières requêtes de
+# back-off partent avec la passe normale, annulées si le seuil est atteint
+SEARCH_BACKOFF_SPECULATIVE = os.getenv("SEARCH_BACKOFF_SPECULATIVE", "false").lower() == "true"
+SEARCH_BACKOFF_SPECULATIVE_BUDGET = 2
 SEARCH_RESULTS_PER_ANGLE = 7  # donner un peu plus de matière puis couper au reranking
 
 # ranking weights (safe defaults)